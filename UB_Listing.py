@@ -1,224 +1,364 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import (
-    TimeoutException, StaleElementReferenceException,
-    ElementClickInterceptedException, ElementNotInteractableException, NoSuchElementException
-)
 from urllib.parse import urlparse, parse_qs
-import time, csv, os, pandas as pd, re
-from datetime import datetime
-from datetime import datetime
-import time, get_Brgy_City, statistics, get_LatLong, get_Folium
-# import get_Brgy_City, statistics, get_LatLong
+import argparse, os, pandas as pd
+from datetime import date, datetime
+from typing import Optional
+from listing_cards import FIELDNAMES
+from cleaning import clean_real_estate_data
+import checkpoint
+import run_metrics
+from stage_io import read_stage, write_stage
+# Stage modules (and selenium/geopy/folium/matplotlib behind them) are imported
+# inside the stage that needs them, so importing this module has no side effects.
 
-now = datetime.now()
-print(f"Execution starts: {now}")
+START_URL = "https://www.unionbankph.com/foreclosed-properties?page=1&min_bid_price=0&max_bid_price=0&type_of_property=Residential&type_of_residential=House%20and%20Lot&location=&city=&lot_area=0&floor_area=0&sort_by_price="
 
-# Keep Chrome Browser Open
-chrome_options = webdriver.ChromeOptions()
-chrome_options.add_experimental_option("detach", True)
+# "url": build ?page=N URLs from START_URL and fetch them concurrently until a page has no cards
+# "click": drive the Next button in a visible Chrome window
+PAGINATION = "url"
 
-driver = webdriver.Chrome(options=chrome_options)
+# Only visit detail pages / geocode listings that are new or whose price/specs changed
+INCREMENTAL = True
 
-driver.set_page_load_timeout(30)
-driver.get("https://www.unionbankph.com/foreclosed-properties?page=1&min_bid_price=0&max_bid_price=0&type_of_property=Residential&type_of_residential=House%20and%20Lot&location=&city=&lot_area=0&floor_area=0&sort_by_price=")
+ROOT = r"D:\Desktop\Python\Web_Scraping"
+PATH = "UnionBank_Listing_Automation"
+LISTINGS_CSV = os.path.join(ROOT, PATH, "listings.csv")
+CLEAN_CSV = os.path.join(ROOT, PATH, "clean_real_estate.csv")
 
-wait = WebDriverWait(driver, 15)
+# Pipeline order; any subset can be run from the command line
+STAGES = ["scrape", "clean", "enrich", "images", "geocode", "score", "archive", "map"]
 
-clicks = 0
-max_clicks = 12  # safety cap
-per_click_timeout = 10
+def crawl_by_clicking(start_url: str) -> list:
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import (
+        TimeoutException, StaleElementReferenceException,
+        ElementClickInterceptedException, ElementNotInteractableException, NoSuchElementException
+    )
+    from listing_cards import iter_listing_cards
 
+    # Keep Chrome Browser Open
+    chrome_options = webdriver.ChromeOptions()
+    chrome_options.add_experimental_option("detach", True)
 
+    driver = webdriver.Chrome(options=chrome_options)
 
-price_collections = []
-address_collections = []
-lot_collections = []
-link_collections = []
-img_collections = []
-listings = {}
+    driver.set_page_load_timeout(30)
+    driver.get(start_url)
+
+    wait = WebDriverWait(driver, 15)
+
+    clicks = 0
+    max_clicks = 12  # safety cap
+    per_click_timeout = 10
 
-def current_page_number():
-    # Parse the ?page=N from current URL; default to 1 if missing
-    parsed = urlparse(driver.current_url)
-    qs = parse_qs(parsed.query)
-    try:
-        return int(qs.get("page", ["1"])[0])
-    except Exception:
-        return 1
 
-while clicks < max_clicks:
-    try:
 
-        lot_field = driver.find_elements(By.CSS_SELECTOR, "p.specs")
-        address_field = driver.find_elements(By.CSS_SELECTOR, "p.city-arg")
-        price_field = driver.find_elements(By.CSS_SELECTOR,"p.price")
-       # link_field = driver.find_elements(By.CSS_SELECTOR,value='a ')
-        link_field = driver.find_elements(By.XPATH, "//a[contains(@href, 'foreclosed-properties')]")
-     
-
-        # Print the href values
-        for link in link_field:
-            href=link.get_attribute("href")
-            link_collections.append(href)
-            img = link.find_element(By.TAG_NAME, "img") 
-            src = img.get_attribute("src") 
-            img_collections.append(src)
-            
-        for address in address_field:
-            address_collections.append(address.text)
-
-        for lot in lot_field:
-            lot_collections.append(lot.text)
-
-        for price in price_field:
-            price_collections.append(price.text)
-
-        for i in range(len(address_collections)):
-            listings[i] = {
-                "Address":address_collections[i],
-                "Lot":lot_collections[i],
-                "Price":price_collections[i],
-                "Image_Link":img_collections[i],
-                "Link":link_collections[i]
-            }
-            
+    listings = []
+    seen_links = set()
 
+    def current_page_number():
+        # Parse the ?page=N from current URL; default to 1 if missing
+        parsed = urlparse(driver.current_url)
+        qs = parse_qs(parsed.query)
         try:
-            target = wait.until(EC.presence_of_element_located(
-                (By.XPATH, "//*[name()='svg' and @data-icon='right']/ancestor::a[1]")
-            ))
-        except TimeoutException:
-            # Fallback to button ancestor
-            target = wait.until(EC.presence_of_element_located(
-                (By.XPATH, "//*[name()='svg' and @data-icon='right']/ancestor::button[1]")
+            return int(qs.get("page", ["1"])[0])
+        except Exception:
+            return 1
+
+    while clicks < max_clicks:
+        try:
+
+            # One record per listing card, appended once; a stale-element retry
+            # re-reads the same page, so skip links we already have
+            for record in iter_listing_cards(driver):
+                if record["Link"] not in seen_links:
+                    seen_links.add(record["Link"])
+                    listings.append(record)
+            run_metrics.count("pages_crawled")
+
+            try:
+                target = wait.until(EC.presence_of_element_located(
+                    (By.XPATH, "//*[name()='svg' and @data-icon='right']/ancestor::a[1]")
+                ))
+            except TimeoutException:
+                # Fallback to button ancestor
+                target = wait.until(EC.presence_of_element_located(
+                    (By.XPATH, "//*[name()='svg' and @data-icon='right']/ancestor::button[1]")
+                ))
+
+            # If it is disabled or hidden, stop
+            aria_disabled = target.get_attribute("aria-disabled")
+            disabled_attr = target.get_attribute("disabled")
+            if (aria_disabled and aria_disabled.strip().lower() == "true") or (disabled_attr is not None) or (not target.is_displayed()):
+                print(f"Stopped: Next control disabled/hidden. Total clicks: {clicks}")
+                break
+
+            # 2) Wait until clickable & scroll into view
+            target = WebDriverWait(driver, per_click_timeout).until(EC.element_to_be_clickable(
+                (By.XPATH, "//*[name()='svg' and @data-icon='right']/ancestor::*[self::a or self::button][1]")
             ))
+            driver.execute_script("arguments[0].scrollIntoView({block:'center'});", target)
 
-        # If it is disabled or hidden, stop
-        aria_disabled = target.get_attribute("aria-disabled")
-        disabled_attr = target.get_attribute("disabled")
-        if (aria_disabled and aria_disabled.strip().lower() == "true") or (disabled_attr is not None) or (not target.is_displayed()):
-            print(f"Stopped: Next control disabled/hidden. Total clicks: {clicks}")
-            break
+            # Record current page before clicking
+            before_page = current_page_number()
 
-        # 2) Wait until clickable & scroll into view
-        target = WebDriverWait(driver, per_click_timeout).until(EC.element_to_be_clickable(
-            (By.XPATH, "//*[name()='svg' and @data-icon='right']/ancestor::*[self::a or self::button][1]")
-        ))
-        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", target)
+            # 3) Click (prefer native click; fallback to synthetic click for stubborn components)
+            try:
+                target.click()
+            except (ElementClickInterceptedException, ElementNotInteractableException):
+                # Dispatch a synthetic click (works for SVG-heavy UIs)
+                driver.execute_script("""
+                    const el = arguments[0];
+                    el.dispatchEvent(new MouseEvent('click', {bubbles:true, cancelable:true, view:window}));
+                """, target)
 
-        # Record current page before clicking
-        before_page = current_page_number()
+            # 4) Wait for "page changed" — either URL `page` increments OR content updates
+            #    Here we wait for URL ?page to increase
+            with run_metrics.timer("browser_page_load"):
+                WebDriverWait(driver, 15).until(lambda d: current_page_number() > before_page)
 
-        # 3) Click (prefer native click; fallback to synthetic click for stubborn components)
+            clicks += 1
+            print(f"Moved from page {before_page} to {current_page_number()} (click {clicks})")
+
+            # Optional: small sleep to let heavy content settle (avoid race with re-enabling Next)
+            run_metrics.sleep(0.5)
+
+        except TimeoutException:
+            print(f"Stopped: Next not clickable / page did not change in time. Total clicks: {clicks}")
+            break
+        except StaleElementReferenceException:
+            # DOM refreshed while clicking; just retry next iteration
+            continue
+        except NoSuchElementException:
+            print(f"Stopped: Next control not found. Total clicks: {clicks}")
+            break
+    return listings
+
+def scrape(start_url: Optional[str] = None, pagination: str = PAGINATION) -> list:
+    """
+    Crawl the index pages and write the raw cards to listings.parquet (+ listings.csv).
+    A crawl that skipped pages (page_crawler.IncompleteCrawlError) is raised before
+    anything is written, so the run stops here and a partial snapshot never reaches
+    the later stages or the warehouse archive.
+    """
+    start_url = start_url or START_URL
+    if pagination == "url":
+        import page_crawler
         try:
-            target.click()
-        except (ElementClickInterceptedException, ElementNotInteractableException):
-            # Dispatch a synthetic click (works for SVG-heavy UIs)
-            driver.execute_script("""
-                const el = arguments[0];
-                el.dispatchEvent(new MouseEvent('click', {bubbles:true, cancelable:true, view:window}));
-            """, target)
-
-        # 4) Wait for "page changed" — either URL `page` increments OR content updates
-        #    Here we wait for URL ?page to increase
-        WebDriverWait(driver, 15).until(lambda d: current_page_number() > before_page)
-
-        clicks += 1
-        print(f"Moved from page {before_page} to {current_page_number()} (click {clicks})")
-
-        # Optional: small sleep to let heavy content settle (avoid race with re-enabling Next)
-        time.sleep(0.5)
-
-    except TimeoutException:
-        print(f"Stopped: Next not clickable / page did not change in time. Total clicks: {clicks}")
-        break
-    except StaleElementReferenceException:
-        # DOM refreshed while clicking; just retry next iteration
-        continue
-    except NoSuchElementException:
-        print(f"Stopped: Next control not found. Total clicks: {clicks}")
-        break
-print(f"There are {len(listings)} records")
-list_collection = list(listings.values())
-
-root = r"D:\Desktop\Python\Web_Scraping"
-path = "UnionBank_Listing_Automation"
-filename = "listings.csv"
-
-# Construct the full path
-file_path = os.path.join(root, path, filename)
-
-# Open the file for writing
-with open(file_path, "w", newline="", encoding="utf-8") as file:
-    writer = csv.DictWriter(file, fieldnames=["Address", "Lot", "Price","Image_Link","Link"])
-    writer.writeheader()
-    writer.writerows(list_collection)
-
-file_path = os.path.join(root, path, filename)
-
-df = pd.read_csv(file_path, encoding="utf-8")
-
-
-def clean_real_estate_data():
+            listings = page_crawler.crawl_pages(start_url)
+        except page_crawler.EmptyCrawlError as exc:
+            # Cards rendered by JavaScript only exist in a browser
+            print(f"{exc}; falling back to the Selenium paginator")
+            listings = crawl_by_clicking(start_url)
+    else:
+        listings = crawl_by_clicking(start_url)
+    if not listings:
+        raise RuntimeError(f"No listings scraped from {start_url}; {LISTINGS_CSV} left as it was")
+    print(f"There are {len(listings)} records")
+    run_metrics.count("listings_scraped", len(listings))
+
+    write_stage(pd.DataFrame(listings, columns=FIELDNAMES), "listings", LISTINGS_CSV)
+    return listings
+
+def clean() -> pd.DataFrame:
+    """listings -> clean_real_estate"""
+    df = read_stage("listings", LISTINGS_CSV)
+
+    #Save Clean Data
+    df = clean_real_estate_data(df)
+    df = df.drop_duplicates(subset=["Address", "Price"])
+    return write_stage(df, "clean", CLEAN_CSV)
+
+def enrich(incremental: bool = INCREMENTAL):
+    """clean_real_estate -> titles (Title + Lot Description from each detail page, plus
+    the Subdivision / Barangay / City / Province parsed from the Title)"""
+    import get_Brgy_City
+    if not incremental:
+        get_Brgy_City.main(input_csv=CLEAN_CSV)
+        return
+
+    import listing_store
+    df = read_stage("clean", CLEAN_CSV)
+    conn = listing_store.open_store()
+    try:
+        pending, known = listing_store.split_new_or_changed(conn, df)
+    finally:
+        conn.close()
+    print(f"Incremental enrich: {len(pending)} new/changed, {len(known)} unchanged listings")
+    run_metrics.count("enrich_unchanged_skipped", len(known))
+
+    progress = checkpoint.Checkpoint("enrich")
+    try:
+        pending = get_Brgy_City.extract_titles_and_lot_descriptions(pending, checkpoint=progress)
+        titles = pd.concat([pending, known.drop(columns=listing_store.GEOCODE_COLUMNS)]).sort_index()
+        titles = get_Brgy_City.add_address_fields(titles)
+        write_stage(titles, "titles", get_Brgy_City.OUTPUT_CSV)
+        print(f"Saved {get_Brgy_City.OUTPUT_CSV} with {len(titles)} rows.")
+        progress.clear()
+    finally:
+        progress.close()
+
+def images():
+    """clean_real_estate -> thumbnails/ (local thumbnail of every Image_Link, see image_cache)"""
+    import image_cache
+    df = read_stage("clean", CLEAN_CSV)
+    conn = image_cache.open_cache()
+    try:
+        thumbs = image_cache.cache_images(conn, df["Image_Link"])
+    finally:
+        conn.close()
+    print(f"Thumbnails: {sum(p is not None for p in thumbs.values())} of {len(thumbs)} images cached")
+
+def score():
+    """listings_geocoded -> analysis_output.xlsx + top10_scores.png"""
+    import listing_statistics
+    listing_statistics.main()
+
+def geocode(incremental: bool = INCREMENTAL):
+    """titles -> listings_geocoded (and the listing store's lat/long)"""
+    import get_LatLong, listing_store
+    conn = listing_store.open_store()
+    try:
+        if not incremental:
+            get_LatLong.main()
+            geocoded = read_stage("geocoded", get_LatLong.OUTPUT_CSV)
+        else:
+            from geocode_async import get_provider
+            df = read_stage("titles", get_LatLong.INPUT_CSV)
+            # Unchanged listings come back with their stored lat/long; listings whose
+            # geocode failed last time, or that only got a coarse gazetteer centroid in
+            # place of an upstream answer, are pending again
+            coarse = [level for level, rank in get_LatLong.LEVELS.items()
+                      if rank < get_LatLong.LEVELS[get_LatLong.OFFLINE_MIN_LEVEL]]
+            pending, known = listing_store.split_new_or_changed(
+                conn, df, required=("title", "lat", "long"), retry_levels=coarse)
+            print(f"Incremental geocode: {len(pending)} new/changed/unplaced, {len(known)} unchanged listings")
+            run_metrics.count("geocode_unchanged_skipped", len(known))
+
+            geo_cache = get_LatLong.GeocodeCache()
+            try:
+                pending = get_LatLong.geocode_addresses_no_hint_with_nulls(
+                    pending,
+                    min_delay_seconds=get_LatLong.MIN_DELAY_SECONDS,
+                    max_retries=get_LatLong.MAX_RETRIES,
+                    persistent_cache=geo_cache,
+                    gazetteer=get_LatLong.Gazetteer.load(),
+                    provider=get_provider(get_LatLong.PROVIDER)
+                )
+            finally:
+                print(geo_cache.report())
+                geo_cache.close()
+            geocoded = pd.concat([pending, known]).sort_index()
+            geocoded = write_stage(geocoded, "geocoded", get_LatLong.OUTPUT_CSV)
+            print(f"Saved geocoded CSV: {get_LatLong.OUTPUT_CSV} ({len(geocoded)} rows; "
+                  f"placed at: {get_LatLong.placement_summary(geocoded['geocode_level'])})")
+
+        stored = listing_store.upsert_listings(conn, geocoded)
+        print(f"Listing store updated: {stored} listings")
+    finally:
+        conn.close()
+
+def archive():
+    """listings_geocoded -> today's snapshot in the history warehouse"""
+    import get_LatLong, warehouse
+    df = read_stage("geocoded", get_LatLong.OUTPUT_CSV)
+    conn = warehouse.open_warehouse()
+    try:
+        stored = warehouse.append_snapshot(conn, df)
+        print(f"Warehouse snapshot stored: {stored} listings")
+    finally:
+        conn.close()
+
+def make_map():
+    """listings_geocoded -> index.html"""
+    import get_Folium
+    get_Folium.main()
+
+def run(stages=STAGES, pagination: str = PAGINATION, incremental: bool = INCREMENTAL,
+        resume: bool = False, run_id: Optional[str] = None,
+        profiler: Optional[str] = run_metrics.PROFILER) -> str:
     """
-    Cleans Address, Lot, and Price columns:
-    - Address: extracts Province only
-    - Lot: extracts LA if present, else FA, converts to numeric
-    - Price: removes Php/₱, commas, converts to numeric
+    Run the given stages in pipeline order.
+    Finished stages are recorded in the checkpoint database under run_id (default:
+    today's date, i.e. one run per scrape date). Only with resume=True does a rerun
+    of the same run_id skip the stages the crashed run already finished, and the
+    interrupted stage skip the records it already completed; any other run starts
+    over. The checkpoint is cleared once every stage has finished.
+    Timings and counters of every stage (see run_metrics) go to a JSON run report,
+    also when a stage fails; profiler ("cprofile"/"pyinstrument") profiles each stage.
+    Returns the report's path.
     """
-    # --- Clean Address (Province only) ---
-    
-    df['Address'] = df['Address'].str.split(",").str[-1].str.strip()
-    # --- Clean Lot ---
-    def extract_area(text):
-        la_match = re.search(r'LA:\s*(\d+)', str(text))
-        if la_match:
-            return la_match.group(1)
-        fa_match = re.search(r'FA:\s*(\d+)', str(text))
-        if fa_match:
-            return fa_match.group(1)
-        return None
-    
-    df['Lot'] = df['Lot'].apply(extract_area)
-    df['Lot'] = df['Lot'].str.replace("sqm","",regex=False)  # remove unit
-    df['Lot'] = df['Lot'].str.replace(",","")                # remove commas
-    df['Lot'] = pd.to_numeric(df['Lot'], errors='coerce')    # convert to number
-    
-    # --- Clean Price ---
-    df['Price'] = df['Price'].str.replace("Php","",regex=False)
-    df['Price'] = df['Price'].str.replace("₱","",regex=False)
-    df['Price'] = df['Price'].str.replace(",","")            # remove commas
-    df['Price'] = df['Price'].str.strip()                    # remove spaces
-    df['Price'] = pd.to_numeric(df['Price'], errors='coerce') # convert to number
-    
-    return df
-
-#Save Clean Data
-df = clean_real_estate_data()
-df = df.drop_duplicates(subset=["Address", "Price"])
-
-clean_data_fname = "clean_real_estate.csv"
-# Construct the full path
-file_path = os.path.join(root, path, clean_data_fname)
-
-df.to_csv(file_path,index=False)
-
-after = datetime.now()
-
-print(f"Time Completed: {after-now}")
-
-print(f"Get Barangay City Started: {now}")
-get_Brgy_City.main()
-print(f"Get Barangay City Time Completed: {after-now}")
-print(f"Statistics Execution Process Started {now}")
-statistics.main()
-print(f"Statistics Process Completed: {after-now}")
-print(f"Getting Lat Long Started {now}")
-get_LatLong.main()
-print(f"Lat Long Process Completed: {after-now}")
-print(f"Creating MAPPING Started {now}")
-get_Folium.main()
-print(f"MAP Creation Completed: {after-now}")
\ No newline at end of file
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {sorted(unknown)}. Choose from: {', '.join(STAGES)}")
+
+    steps = {
+        "scrape": lambda: scrape(pagination=pagination),
+        "clean": clean,
+        "enrich": lambda: enrich(incremental=incremental),
+        "images": images,
+        "geocode": lambda: geocode(incremental=incremental),
+        "score": score,
+        "archive": archive,
+        "map": make_map,
+    }
+    run_id = run_id or date.today().isoformat()
+    metrics = run_metrics.start_run()
+    conn = checkpoint.open_run()
+    try:
+        interrupted = checkpoint.interrupted_run(conn)
+        if not resume or interrupted != run_id:
+            if interrupted is not None:
+                print(f"Discarding the checkpoint of interrupted run {interrupted}"
+                      + ("" if resume else " (pass --resume to continue it)"))
+            checkpoint.reset_run(conn)
+        else:
+            print(f"Resuming interrupted run {run_id}")
+        finished = set(checkpoint.finished_stages(conn, run_id))
+
+        now = datetime.now()
+        print(f"Execution starts: {now}")
+        for stage in [s for s in STAGES if s in stages]:
+            if stage in finished:
+                print(f"{stage} skipped: already finished by the interrupted run")
+                metrics.skip(stage, "finished by the interrupted run")
+                continue
+            print(f"{stage} started: {datetime.now()}")
+            with metrics.stage(stage, profiler=profiler) as entry:
+                steps[stage]()
+            checkpoint.mark_finished(conn, run_id, stage)
+            print(f"{stage} completed in {entry['seconds']:.1f}s"
+                  + (f" (profile: {entry['profile']})" if "profile" in entry else ""))
+        checkpoint.reset_run(conn)
+        print(f"Time Completed: {datetime.now() - now}")
+    finally:
+        conn.close()
+        report = metrics.write_report()
+        print(f"Run report: {report}")
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="UnionBank foreclosed-listing pipeline")
+    parser.add_argument("stages", nargs="*", metavar="stage",
+                        help=f"stages to run, any of: {', '.join(STAGES)} (default: all, in order)")
+    parser.add_argument("--pagination", choices=["url", "click"], default=PAGINATION)
+    parser.add_argument("--full", action="store_true",
+                        help="re-enrich and re-geocode every listing instead of only new/changed ones")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the interrupted run with the same run id, skipping its finished stages")
+    parser.add_argument("--run-id", default=None,
+                        help="checkpoint key of this run (default: today's date)")
+    parser.add_argument("--profile", choices=run_metrics.PROFILERS, default=run_metrics.PROFILER,
+                        help="profile every stage; output goes to run_metrics.PROFILE_DIR")
+    args = parser.parse_args(argv)
+    unknown = [s for s in args.stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+    run(args.stages or STAGES, pagination=args.pagination,
+        incremental=INCREMENTAL and not args.full, resume=args.resume, run_id=args.run_id,
+        profiler=args.profile)
+
+if __name__ == "__main__":
+    main()
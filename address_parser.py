@@ -0,0 +1,188 @@
+# address_parser.py
+# Structured address fields from listing titles:
+#   "Subdivision, Phase 1, Barangay San Antonio, San Pedro, Laguna"
+#   -> Subdivision "Phase 1", Barangay "San Antonio", City "San Pedro", Province "Laguna"
+# Everything runs over a whole Series: titles are normalized (query_normalize),
+# fields are cut out with patterns built once from the gazetteer's locality table
+# (one name alternation per level), and each distinct title is parsed once.
+import re
+from typing import Optional
+import numpy as np
+import pandas as pd
+# Arrow's RE2 kernels run the patterns below in C++ over a whole column when pyarrow
+# is installed; otherwise pandas runs the same patterns (see arrow_text)
+from arrow_text import extract as _extract, reverse as _reverse
+from gazetteer import GAZETTEER_CSV
+from query_normalize import address_keys
+
+FIELDS = ["Subdivision", "Barangay", "City", "Province"]
+
+# All patterns are plain strings that RE2 and Python re read the same way (so no
+# look-arounds); pandas hands string patterns on Arrow columns to RE2.
+# The site name after the first '|' ("... | UnionBank Foreclosed Properties")
+PIPE_TAIL_PATTERN = r"(?s)\s*\|.*$"
+# Where the location part of a title starts: the first barangay, building or
+# subdivision keyword
+LOCATION_PATTERN = (r"(?is)(?P<location>\b(?:barangays?|brgys?|bgy|barnagy|building|subdivision"
+                    r"|mansions?|executive)\b.*$)")
+LOCATION_RE = re.compile(LOCATION_PATTERN)
+
+
+def clean_title(title: Optional[str]) -> Optional[str]:
+    """
+    Location part of one detail-page title: the text before the first '|', from the
+    first barangay / building / subdivision keyword on (all of it when there is none).
+    """
+    if not isinstance(title, str):
+        return None
+    text = title.split("|", 1)[0].strip()
+    match = LOCATION_RE.search(text)
+    return (match.group("location").strip() if match else text) or None
+
+
+def clean_titles(titles: pd.Series) -> pd.Series:
+    """Vectorized clean_title."""
+    text = titles.astype("string").str.replace(PIPE_TAIL_PATTERN, "", regex=True).str.strip()
+    location = _extract(text, LOCATION_PATTERN)["location"].str.strip()
+    location = location.fillna(text)
+    return location.where(location != "")
+
+
+def _alternation(keys) -> str:
+    # Longest names first so "san jose del monte" wins over "san jose"
+    return "|".join(re.escape(k) for k in sorted(set(keys), key=len, reverse=True) if k)
+
+
+def _title_case(s: pd.Series) -> pd.Series:
+    s = s.str.strip(" ,-")
+    return s.where(s != "").str.title()
+
+
+class AddressParser:
+    """
+    Patterns over the gazetteer's provinces and cities/municipalities, built once.
+    Load it once (load()) and reuse it: parse() only runs whole-Series operations.
+    """
+
+    def __init__(self, localities: pd.DataFrame):
+        localities = localities.fillna("")
+        names = localities.assign(name=(localities["name"] + "|" + localities["aliases"]).str.split("|"))
+        names = names.explode("name")
+        names = names[names["name"].str.strip() != ""]
+        names = names.assign(key=address_keys(names["name"]).to_numpy(dtype=object),
+                             province_key=address_keys(names["province"]).to_numpy(dtype=object))
+
+        provinces = names[names["level"] == "province"]
+        # Any province name or alias -> canonical province key / display name
+        self.province_keys = dict(zip(provinces["key"], provinces["province_key"]))
+        self.province_names = dict(zip(provinces["province_key"], provinces["province"]))
+
+        cities = names[names["level"] == "city"].drop_duplicates(["province_key", "key"])
+        # (province key, city name or alias key) -> the city's own name
+        self.city_names = cities.set_index(["province_key", "key"])["name"].astype("string")
+        # City key -> province key, for cities whose name is unique across provinces
+        unique = cities.drop_duplicates("key", keep=False)
+        self.city_province = dict(zip(unique["key"], unique["province_key"]))
+        # Cities named after a province (Iloilo City, Quezon City) rank below other names
+        province_named = {c for c in cities["key"] for p in self.province_keys
+                          if c == p or c.startswith(p + " ")}
+
+        city_alt = _alternation(cities["key"])
+        province_alt = _alternation(provinces["key"])
+        # A trailing province mention
+        self.province_pattern = rf"\b(?P<province>{province_alt})$"
+        self.province_tail_pattern = rf"[\s,]*\b(?:{province_alt})$"
+        # The last city named in the title, and the last one not named after a province.
+        # Matched in the reversed text: the first match there is the title's last city,
+        # and RE2 only tracks groups over the matched span ("^.*(...)" would cost a
+        # full-string submatch search per title).
+        reversed_keys = [k[::-1] for k in cities["key"]]
+        strong_keys = [k[::-1] for k in cities["key"] if k not in province_named]
+        self.last_city_pattern = rf"\b(?P<city>{_alternation(reversed_keys)})\b"
+        self.last_strong_city_pattern = rf"\b(?P<city>{_alternation(strong_keys)})\b"
+        # ... and the same for the last comma-separated part that is a city name on its own
+        # (optionally "<name> city"): these beat a name inside a longer part ("new manila
+        # district, quezon city")
+        segment = r"(?:^|,)(?:ytic )?(?P<city>{})(?: ,|$)"
+        self.last_segment_city_pattern = segment.format(_alternation(reversed_keys))
+        self.last_strong_segment_city_pattern = segment.format(_alternation(strong_keys))
+        # Cities missing from the table, written out as "..., <name> city"
+        self.named_city_pattern = r"^(?:.*, )?(?P<city>[a-z][a-z\- ]*? city)(?:,.*)?$"
+        # Barangay: what follows the last "barangay", up to the next comma, minus a
+        # city named right after it ("barangay ugong pasig city")
+        self.barangay_start_pattern = r"^.*\bbarangay "
+        self.barangay_city_pattern = rf" (?:{city_alt})(?: city)?$"
+        # Subdivision: after a leading "Subdivision" / "Building", up to the barangay or city
+        self.subdivision_start_pattern = r"^(?:subdivision|building)\b[\s,]*"
+        self.subdivision_end_pattern = rf"[\s,]*\b(?:barangay|{city_alt})\b.*$"
+
+    @classmethod
+    def load(cls, path: str = GAZETTEER_CSV) -> "AddressParser":
+        return cls(pd.read_csv(path, dtype=str))
+
+    def _province_key(self, keys: pd.Series) -> pd.Series:
+        return keys.map(self.province_keys).astype("string")
+
+    def _parse_unique(self, titles: pd.Series, hints: pd.Series) -> pd.DataFrame:
+        key = address_keys(clean_titles(titles))
+        province = self._province_key(_extract(key, self.province_pattern)["province"])
+        head = key.str.replace(self.province_tail_pattern, "", regex=True)
+
+        # A part of the title that is just a city name wins over a name inside a longer
+        # part; at each step cities named after a province (Iloilo City) come last. A city
+        # the title's province does not have is not the listing's city.
+        city = pd.Series(pd.NA, index=head.index, dtype="string")
+        reversed_head = _reverse(head)
+        for pattern in (self.last_strong_segment_city_pattern, self.last_segment_city_pattern,
+                        self.last_strong_city_pattern, self.last_city_pattern):
+            found = _reverse(_extract(reversed_head, pattern)["city"])
+            pairs = pd.MultiIndex.from_arrays([province.fillna(""), found.fillna("")])
+            city = city.fillna(found.where(province.isna().to_numpy() | pairs.isin(self.city_names.index)))
+
+        province = (province.fillna(city.map(self.city_province).astype("string"))
+                    .fillna(self._province_key(address_keys(hints))))
+        pairs = pd.MultiIndex.from_arrays([province.fillna(""), city.fillna("")])
+        city_name = pd.Series(self.city_names.reindex(pairs).to_numpy(), index=head.index, dtype="string")
+        # A city the table does not know keeps its own wording
+        other_city = _extract(head, self.named_city_pattern)["city"]
+        other_city = other_city.where(~other_city.str.startswith("barangay ").fillna(False))
+
+        barangay = (head.str.replace(self.barangay_start_pattern, "", regex=True)
+                    .str.replace(r",.*$", "", regex=True)
+                    .str.replace(self.barangay_city_pattern, "", regex=True))
+        subdivision = (key.str.replace(self.subdivision_start_pattern, "", regex=True)
+                       .str.replace(self.subdivision_end_pattern, "", regex=True))
+
+        return pd.DataFrame({
+            "Subdivision": _title_case(subdivision.where(key.str.contains(self.subdivision_start_pattern))),
+            "Barangay": _title_case(barangay.where(head.str.contains(self.barangay_start_pattern))),
+            "City": city_name.fillna(_title_case(city)).fillna(_title_case(other_city)),
+            "Province": province.map(self.province_names).astype("string").fillna(hints.str.strip()),
+        }, dtype="string")
+
+    def parse(self, titles: pd.Series, province_hint: Optional[pd.Series] = None) -> pd.DataFrame:
+        """
+        Subdivision, Barangay, City and Province of every title (aligned with titles,
+        NA where a field is not found). City and Province are the gazetteer's names
+        where it knows the place; Barangay and Subdivision are title-cased and
+        accent-folded, so they group cleanly. province_hint (e.g. the cleaned
+        Address column) is used when neither the title nor its city names a province.
+        """
+        titles = titles.astype("string")
+        hints = (province_hint.astype("string") if province_hint is not None
+                 else pd.Series(pd.NA, index=titles.index, dtype="string"))
+        # Parse each distinct (title, hint) once
+        title_codes, title_uniques = pd.factorize(titles, use_na_sentinel=False)
+        hint_codes, hint_uniques = pd.factorize(hints, use_na_sentinel=False)
+        codes, pairs = pd.factorize(title_codes.astype(np.int64) * len(hint_uniques) + hint_codes)
+        parsed = self._parse_unique(
+            pd.Series(title_uniques.take(pairs // len(hint_uniques)), dtype="string"),
+            pd.Series(hint_uniques.take(pairs % len(hint_uniques)), dtype="string"))
+        return parsed.iloc[codes].set_axis(titles.index)
+
+
+def add_address_fields(df: pd.DataFrame, parser: Optional[AddressParser] = None) -> pd.DataFrame:
+    """Copy of df with the Subdivision, Barangay, City and Province parsed from its Title."""
+    parser = parser or AddressParser.load()
+    parsed = parser.parse(df["Title"], df["Address"] if "Address" in df.columns else None)
+    return df.assign(**{field: parsed[field] for field in FIELDS})
@@ -0,0 +1,43 @@
+# arrow_text.py
+# Whole-column string helpers shared by cleaning and address_parser.
+# With pyarrow installed, regexes run in Arrow's RE2 kernels (C++); without it the same
+# patterns go through pandas' Python re, element by element. Patterns must therefore
+# read the same in RE2 and Python re (no look-arounds or backreferences).
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pandas-only fallback
+    pa = pc = None
+
+
+def to_arrow(s: pd.Series):
+    return pa.array(s.astype("string[pyarrow]"))
+
+
+def from_arrow(arr, index) -> pd.Series:
+    return pd.Series(pd.array(arr, dtype="string[pyarrow]"), index=index)
+
+
+def group(matches, i):
+    """Field i of pc.extract_regex's result, null where the group did not take part."""
+    # RE2 reports a group that did not take part in the match as "", not null
+    field = pc.struct_field(matches, [i])
+    return pc.if_else(pc.equal(field, ""), pa.scalar(None, field.type), field)
+
+
+def extract(s: pd.Series, pattern: str) -> pd.DataFrame:
+    """s.str.extract(pattern) (named groups), NA where a group did not match."""
+    if pa is None:
+        return s.str.extract(pattern)
+    matches = pc.extract_regex(to_arrow(s), pattern)
+    return pd.DataFrame({name: from_arrow(group(matches, i), s.index)
+                         for i, name in enumerate(matches.type.names)}, index=s.index)
+
+
+def reverse(s: pd.Series) -> pd.Series:
+    """Each string backwards."""
+    if pa is None:
+        return s.str[::-1]
+    return from_arrow(pc.utf8_reverse(to_arrow(s)), s.index)
@@ -0,0 +1,668 @@
+# benchmarks.py
+# Offline micro-benchmarks for the listing pipeline.
+# Usage: python benchmarks.py [name ...]   (no names = run everything)
+import sys
+import time
+from typing import Callable, Dict, List
+
+
+def timed(fn: Callable, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+# -----------------------------------------------
+# 1) Pagination: per-card streaming vs. rebuilding
+# -----------------------------------------------
+CARDS_PER_PAGE = 12
+
+
+class FakeElement:
+    """Minimal stand-in for a Selenium WebElement."""
+
+    def __init__(self, text: str = "", attrs: Dict[str, str] = None, children: Dict[str, list] = None):
+        self.text = text
+        self.attrs = attrs or {}
+        self.children = children or {}
+
+    def get_attribute(self, name: str):
+        return self.attrs.get(name)
+
+    def find_elements(self, by, selector):
+        return self.children.get(selector, [])
+
+    def find_element(self, by, selector):
+        from selenium.common.exceptions import NoSuchElementException
+        found = self.find_elements(by, selector)
+        if not found:
+            raise NoSuchElementException(selector)
+        return found[0]
+
+
+def fake_card(n: int) -> FakeElement:
+    import listing_cards
+    img = FakeElement(attrs={"src": f"https://example.test/img/{n}.png"})
+    link = FakeElement(attrs={"href": f"https://example.test/foreclosed-properties/{n}"},
+                       children={"img": [img]})
+    return FakeElement(children={
+        listing_cards.LINK_XPATH: [link],
+        "p.city-arg": [FakeElement(f"City {n % 50}, Province {n % 7}")],
+        "p.specs": [FakeElement(f"FA: {n % 300} sqm • LA: {n % 500} sqm")],
+        "p.price": [FakeElement(f"Php {n * 1000:,}")],
+    })
+
+
+class FakePageDriver:
+    def __init__(self, cards: list):
+        self.cards = cards
+
+    def find_elements(self, by, selector):
+        return self.cards
+
+
+def paginate_rebuild(pages: List[list]) -> int:
+    # The original loop: five parallel lists, whole dict rebuilt after every page
+    from listing_cards import LINK_XPATH
+    addresses, lots, prices, links, imgs = [], [], [], [], []
+    listings = {}
+    for cards in pages:
+        for card in cards:
+            link = card.find_element(None, LINK_XPATH)
+            links.append(link.get_attribute("href"))
+            imgs.append(link.find_element(None, "img").get_attribute("src"))
+            addresses.append(card.find_element(None, "p.city-arg").text)
+            lots.append(card.find_element(None, "p.specs").text)
+            prices.append(card.find_element(None, "p.price").text)
+        for i in range(len(addresses)):
+            listings[i] = {"Address": addresses[i], "Lot": lots[i], "Price": prices[i],
+                           "Image_Link": imgs[i], "Link": links[i]}
+    return len(listings)
+
+
+def paginate_streaming(pages: List[list]) -> int:
+    from listing_cards import iter_listing_cards
+    listings, seen = [], set()
+    for cards in pages:
+        for record in iter_listing_cards(FakePageDriver(cards)):
+            if record["Link"] not in seen:
+                seen.add(record["Link"])
+                listings.append(record)
+    return len(listings)
+
+
+def bench_pagination():
+    print("pages  listings  rebuild_s  streaming_s")
+    for n_pages in (100, 200, 400, 800):
+        pages = [[fake_card(p * CARDS_PER_PAGE + c) for c in range(CARDS_PER_PAGE)]
+                 for p in range(n_pages)]
+        t_old = timed(paginate_rebuild, pages)
+        t_new = timed(paginate_streaming, pages)
+        print(f"{n_pages:5d}  {n_pages * CARDS_PER_PAGE:8d}  {t_old:9.3f}  {t_new:11.3f}")
+
+
+# ---------------------------------------------
+# 2) Cleaning: vectorized engine vs. per-row apply
+# ---------------------------------------------
+def synthetic_listings(n: int, seed: int = 0):
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    fa = rng.integers(20, 400, n)
+    la = rng.integers(30, 5000, n)
+    price = rng.integers(300_000, 30_000_000, n)
+    kind = rng.integers(0, 3, n)
+    lot = np.where(kind == 0, [f"FA: {a} sqm • LA: {b:,} sqm" for a, b in zip(fa, la)],
+                   np.where(kind == 1, [f"LA: {b:,} sqm" for b in la], [f"FA: {a} sqm" for a in fa]))
+    return pd.DataFrame({
+        "Address": [f"City {i % 300}, Province {i % 80}" for i in range(n)],
+        "Lot": lot,
+        "Price": [f"Php {p:,}" if i % 2 else f"₱{p:,}" for i, p in enumerate(price)],
+    })
+
+
+def clean_per_row(df):
+    # The original UB_Listing.clean_real_estate_data: re.search twice per row + five Price passes
+    import re
+    import pandas as pd
+    df = df.copy()
+    df["Address"] = df["Address"].str.split(",").str[-1].str.strip()
+
+    def extract_area(text):
+        la_match = re.search(r"LA:\s*(\d+)", str(text))
+        if la_match:
+            return la_match.group(1)
+        fa_match = re.search(r"FA:\s*(\d+)", str(text))
+        if fa_match:
+            return fa_match.group(1)
+        return None
+
+    df["Lot"] = df["Lot"].apply(extract_area)
+    df["Lot"] = df["Lot"].str.replace("sqm", "", regex=False)
+    df["Lot"] = df["Lot"].str.replace(",", "")
+    df["Lot"] = pd.to_numeric(df["Lot"], errors="coerce")
+    df["Price"] = df["Price"].str.replace("Php", "", regex=False)
+    df["Price"] = df["Price"].str.replace("₱", "", regex=False)
+    df["Price"] = df["Price"].str.replace(",", "")
+    df["Price"] = df["Price"].str.strip()
+    df["Price"] = pd.to_numeric(df["Price"], errors="coerce")
+    return df
+
+
+def bench_cleaning():
+    from cleaning import clean_real_estate_data
+    print("rows      per_row_s  vectorized_s  speedup")
+    for n in (100_000, 300_000, 1_000_000):
+        df = synthetic_listings(n)
+        t_old = timed(clean_per_row, df)
+        t_new = timed(clean_real_estate_data, df)
+        print(f"{n:9d}  {t_old:9.3f}  {t_new:12.3f}  {t_old / t_new:6.1f}x")
+
+
+# ---------------------------------------------
+# 3) Warehouse: history queries over years of daily snapshots
+# ---------------------------------------------
+def simulated_days(n_days: int, n_listings: int, seed: int = 0):
+    """
+    Yield (scrape_date, df) for a market of ~n_listings live properties:
+    about 1% churn per day and an occasional price cut.
+    """
+    from datetime import date, timedelta
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    ids = np.arange(n_listings)
+    price = rng.integers(300_000, 30_000_000, n_listings).astype(float)
+    lot = rng.integers(30, 5000, n_listings).astype(float)
+    next_id = n_listings
+    start = date(2023, 1, 1)
+    for day in range(n_days):
+        gone = rng.random(len(ids)) < 0.01
+        n_new = int(gone.sum())
+        ids = np.concatenate([ids[~gone], np.arange(next_id, next_id + n_new)])
+        price = np.concatenate([price[~gone], rng.integers(300_000, 30_000_000, n_new)])
+        lot = np.concatenate([lot[~gone], rng.integers(30, 5000, n_new)])
+        next_id += n_new
+        cut = rng.random(len(ids)) < 0.002
+        price = np.where(cut, np.round(price * 0.9), price)
+        yield (start + timedelta(days=day)).isoformat(), pd.DataFrame({
+            "Address": [f"Province {i % 80}" for i in ids],
+            "Price": price, "Lot": lot,
+            "Link": [f"https://example.test/foreclosed-properties/{i}" for i in ids],
+        })
+
+
+def bench_warehouse():
+    import os
+    import tempfile
+    import warehouse
+    n_days, n_listings = 730, 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = warehouse.open_warehouse(os.path.join(tmp, "bench.db"))
+        start = time.perf_counter()
+        for scrape_date, df in simulated_days(n_days, n_listings):
+            warehouse.append_snapshot(conn, df, scrape_date)
+        build = time.perf_counter() - start
+        rows = conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        print(f"{rows} snapshot rows over {n_days} days (append: {build / n_days * 1000:.1f} ms/day)")
+
+        last = warehouse.scrape_dates(conn)[-1]
+        queries = {
+            "price_history(one listing)": lambda: warehouse.price_history(conn, "10"),
+            "price_changes(last 90 days)": lambda: warehouse.price_changes(conn, "2024-10-01", drops_only=True),
+            "newly_listed(latest)": lambda: warehouse.newly_listed(conn, last),
+            "delisted(latest)": lambda: warehouse.delisted(conn, last),
+            "province_trends(all)": lambda: warehouse.province_trends(conn),
+            "snapshot(latest)": lambda: warehouse.snapshot(conn),
+        }
+        print("query                          seconds")
+        for name, query in queries.items():
+            print(f"{name:30s} {timed(query):7.4f}")
+        conn.close()
+
+
+# ---------------------------------------------
+# 4) Ranking: NumPy top-k vs. copy + full sort
+# ---------------------------------------------
+def scored_listings(n: int, seed: int = 0):
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    price = rng.integers(300_000, 30_000_000, n).astype(float)
+    lot = rng.integers(30, 5000, n).astype(float)
+    return pd.DataFrame({
+        "address": [f"Barangay {i % 900}, City {i % 300}, Province {i % 80}" for i in range(n)],
+        "lot": lot, "price": price, "price_per_sqm": price / lot,
+    })
+
+
+def rank_top10_sort(df, budget=None, location_prefs=None, weights=None):
+    # The original listing_statistics.rank_top10: full copy, four full-length
+    # score columns, per-row Python loop over prefs, full sort for 10 rows
+    df = df.copy()
+    if budget is not None:
+        df = df[df["price"] <= budget]
+    weights = weights or {"value": 0.6, "size": 0.3, "location": 0.1}
+    v_min, v_max = df["price_per_sqm"].min(), df["price_per_sqm"].max()
+    df["value_score"] = 1.0 if v_max == v_min else 1 - (df["price_per_sqm"] - v_min) / (v_max - v_min)
+    s_min, s_max = df["lot"].min(), df["lot"].max()
+    df["size_score"] = 1.0 if s_max == s_min else (df["lot"] - s_min) / (s_max - s_min)
+    if location_prefs:
+        def loc_bonus(addr: str) -> float:
+            addr_l = str(addr).lower()
+            for k, v in location_prefs.items():
+                if str(k).lower() in addr_l:
+                    return float(v)
+            return 0.0
+        df["location_score"] = df["address"].map(loc_bonus)
+    else:
+        df["location_score"] = 0.0
+    df["score"] = (weights["value"] * df["value_score"] + weights["size"] * df["size_score"] +
+                   weights["location"] * df["location_score"])
+    return df.sort_values("score", ascending=False, kind="stable").head(10).copy()
+
+
+def bench_ranking():
+    from listing_statistics import rank_top_k
+    prefs = {f"Province {p}": 0.05 * (p % 10) for p in range(0, 80, 4)}
+    weights = {"value": 0.5, "size": 0.3, "location": 0.2}
+    print("rows      sort_s   top_k_s  speedup  same_top10")
+    for n in (100_000, 300_000, 1_000_000):
+        df = scored_listings(n)
+        t_old = timed(rank_top10_sort, df, budget=6_000_000, location_prefs=prefs, weights=weights)
+        t_new = timed(rank_top_k, df, k=10, budget=6_000_000, location_prefs=prefs, weights=weights)
+        same = rank_top10_sort(df, 6_000_000, prefs, weights).index.equals(
+            rank_top_k(df, 10, 6_000_000, prefs, weights).index)
+        print(f"{n:9d}  {t_old:6.3f}  {t_new:7.3f}  {t_old / t_new:6.1f}x  {same}")
+
+
+# ---------------------------------------------
+# 5) Scenarios: one batch vs. one ranking per buyer profile
+# ---------------------------------------------
+def buyer_profiles(n: int):
+    from listing_statistics import Scenario
+    budgets = [None, 3_000_000, 6_000_000, 10_000_000]
+    return [Scenario(f"profile_{i}", budget=budgets[i % 4],
+                     weights={"value": 0.3 + 0.02 * (i % 10), "size": 0.3, "location": 0.2},
+                     location_prefs={f"Province {(i * 7) % 80}": 0.8, f"City {i % 300}": 0.5} if i % 2 else None,
+                     k=10)
+            for i in range(n)]
+
+
+def bench_scenarios():
+    # Per profile: prepare + rank, as N analyze_file runs did (file/Excel/PNG I/O excluded)
+    from listing_statistics import prepare_data_with_address_lot_price, rank_top_k, score_scenarios
+    df = scored_listings(300_000)
+
+    def one_by_one(profiles):
+        for s in profiles:
+            rank_top_k(prepare_data_with_address_lot_price(df), k=s.k, budget=s.budget,
+                       location_prefs=s.location_prefs, weights=s.weights)
+
+    def batched(profiles):
+        score_scenarios(prepare_data_with_address_lot_price(df), profiles)
+
+    print("rows=300000  profiles  one_by_one_s  batch_s  speedup")
+    for n in (8, 32, 96):
+        profiles = buyer_profiles(n)
+        t_old = timed(one_by_one, profiles)
+        t_new = timed(batched, profiles)
+        print(f"{'':12s} {n:8d}  {t_old:12.3f}  {t_new:7.3f}  {t_old / t_new:6.1f}x")
+
+
+# ---------------------------------------------
+# 6) Excel export: in-memory ExcelWriter vs. streaming / offloading
+# ---------------------------------------------
+def timed_peak(fn: Callable, *args, **kwargs):
+    """(seconds, peak MiB of Python allocations) for one call; timing includes tracing overhead."""
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        seconds = timed(fn, *args, **kwargs)
+        return seconds, tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def bench_excel():
+    import os
+    import tempfile
+    import pandas as pd
+    from excel_export import write_workbook
+    from listing_statistics import prepare_data_with_address_lot_price
+
+    def excel_writer(path, sheets):
+        # The original analyze_file export
+        with pd.ExcelWriter(path, engine="openpyxl") as writer:
+            for name, df in sheets.items():
+                df.to_excel(writer, index=False, sheet_name=name)
+
+    exports = {
+        "ExcelWriter(openpyxl)": excel_writer,
+        "streaming": write_workbook,
+        "streaming+parquet": lambda path, sheets: write_workbook(
+            path, sheets, large_sheet_rows=10_000, large_sheet_mode="parquet"),
+    }
+    print("rows     export                  seconds  peak_MiB")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (20_000, 100_000):
+            df = prepare_data_with_address_lot_price(scored_listings(n))
+            sheets = {"Cleaned_Data": df, "Top10": df.head(10), "Address_Summary": df.head(20)}
+            for name, export in exports.items():
+                seconds, peak = timed_peak(export, os.path.join(tmp, "out.xlsx"), sheets)
+                print(f"{len(df):7d}  {name:22s} {seconds:8.2f}  {peak:8.1f}")
+
+
+# ---------------------------------------------
+# 7) Outliers: per-province robust bounds vs. one global IQR
+# ---------------------------------------------
+def province_listings(n: int, seed: int = 0):
+    # Cleaned-data shape: Address is the province (categorical), ₱/sqm levels differ by province
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    province = rng.integers(0, 80, n)
+    lot = rng.integers(30, 5000, n).astype(float)
+    ppsqm = (5_000 + 2_000 * province) * rng.lognormal(0, 0.4, n)
+    return pd.DataFrame({
+        "Address": pd.Categorical.from_codes(province, [f"Province {p}" for p in range(80)]),
+        "Lot": lot, "Price": np.round(ppsqm * lot),
+    })
+
+
+def prepare_global_iqr(df):
+    # The original prepare_data_with_address_lot_price (after its column mapping):
+    # a copy per filter step and one IQR over the whole country
+    import numpy as np
+    df = df.rename(columns={"Address": "address", "Lot": "lot", "Price": "price"})
+    df = df.replace([np.inf, -np.inf], np.nan)
+    df = df.dropna(subset=["price", "lot", "address"])
+    df = df[(df["price"] > 0) & (df["lot"] > 0)]
+    df["price_per_sqm"] = df["price"] / df["lot"]
+    q1, q3 = df["price_per_sqm"].quantile([0.25, 0.75])
+    iqr = q3 - q1
+    df = df[(df["price_per_sqm"] >= max(q1 - 1.5 * iqr, df["price_per_sqm"].min())) &
+            (df["price_per_sqm"] <= q3 + 1.5 * iqr)]
+    df["address"] = df["address"].astype(str).str.strip()
+    return df
+
+
+def bench_outliers():
+    from listing_statistics import prepare_data_with_address_lot_price
+    print("rows      global_iqr_s  group_iqr_s  group_mad_s  group_iqr_ns/row")
+    for n in (1_000_000, 2_000_000, 4_000_000):
+        df = province_listings(n)
+        t_old = timed(prepare_global_iqr, df)
+        t_iqr = timed(prepare_data_with_address_lot_price, df, outlier_method="iqr")
+        t_mad = timed(prepare_data_with_address_lot_price, df, outlier_method="mad")
+        print(f"{n:9d}  {t_old:12.3f}  {t_iqr:11.3f}  {t_mad:11.3f}  {t_iqr / n * 1e9:16.0f}")
+
+
+# ---------------------------------------------
+# 8) Spatial index: grid index vs. brute-force haversine
+# ---------------------------------------------
+def geocoded_listings(n: int, seed: int = 0):
+    # Listings clustered around 60 towns across the Philippines, ~5% without coordinates
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    towns = np.column_stack([rng.uniform(6, 18.5, 60), rng.uniform(118, 126, 60)])
+    town = rng.integers(0, len(towns), n)
+    lat = towns[town, 0] + rng.normal(0, 0.08, n)
+    lon = towns[town, 1] + rng.normal(0, 0.08, n)
+    missing = rng.random(n) < 0.05
+    lat[missing] = lon[missing] = np.nan
+    ppsqm = 5_000 * (1 + town % 7) * rng.lognormal(0, 0.3, n)
+    return lat, lon, ppsqm
+
+
+def neighborhood_brute(lat, lon, values, radius_km: float, queries):
+    # One full haversine scan per listing
+    import numpy as np
+    from spatial_index import haversine_km
+    out = []
+    for i in queries:
+        near = haversine_km(lat[i], lon[i], lat, lon) <= radius_km
+        near[i] = False
+        out.append(np.median(values[near]) if near.sum() >= 3 else np.nan)
+    return out
+
+
+def bench_spatial():
+    import os
+    import tempfile
+    import numpy as np
+    from spatial_index import SpatialIndex, neighborhood_median
+    print("rows     build_s  radius_1k_s  knn10_1k_s  save_load_s  nbhd_median_s  brute_est_s")
+    for n in (20_000, 100_000, 400_000):
+        lat, lon, ppsqm = geocoded_listings(n)
+        start = time.perf_counter()
+        index = SpatialIndex(lat, lon)
+        t_build = time.perf_counter() - start
+        q = np.flatnonzero(np.isfinite(lat))[:1_000]
+        t_radius = timed(index.query_radius, lat[q], lon[q], 5.0)
+        t_knn = timed(index.query_knn, lat[q], lon[q], 10)
+        path = os.path.join(tempfile.mkdtemp(), "index.npz")
+        start = time.perf_counter()
+        index.save(path)
+        SpatialIndex.load(path)
+        t_io = time.perf_counter() - start
+        t_nbhd = timed(neighborhood_median, index, ppsqm, 5.0)
+        # Brute force on 200 listings, extrapolated to all of them
+        t_brute = timed(neighborhood_brute, lat, lon, ppsqm, 5.0, q[:200]) / 200 * len(index)
+        print(f"{n:7d}  {t_build:7.3f}  {t_radius:11.3f}  {t_knn:10.3f}  {t_io:11.3f}  "
+              f"{t_nbhd:13.3f}  {t_brute:11.1f}")
+
+
+# ---------------------------------------------
+# 9) End to end: every pipeline stage against the local fixture site and geocoder
+# ---------------------------------------------
+E2E_SIZES = (100, 1_000, 10_000)
+E2E_LATENCY = 0.005             # seconds per page / geocoder answer from the fixture server
+E2E_CONCURRENCY = 8             # index and detail page workers
+E2E_TRACE_MEMORY = True         # second, traced pass for peak memory per stage
+
+
+def offline_pipeline(server, workdir: str):
+    """
+    Point every stage at the fixture server and run it inside workdir (stores, caches,
+    checkpoints and outputs land there). The politeness limits meant for the real
+    sites are lifted; everything is restored on exit.
+    """
+    import os
+    from contextlib import ExitStack, contextmanager
+    from unittest import mock
+    import UB_Listing, page_crawler, get_Brgy_City, get_LatLong, geocode_async, get_Folium, image_cache
+
+    @contextmanager
+    def cwd(path):
+        previous = os.getcwd()
+        os.chdir(path)
+        try:
+            yield
+        finally:
+            os.chdir(previous)
+
+    gazetteer = os.path.abspath("ph_gazetteer.csv")
+    stack = ExitStack()
+    stack.enter_context(cwd(workdir))
+    if os.path.exists(gazetteer) and not os.path.exists("ph_gazetteer.csv"):
+        os.symlink(gazetteer, "ph_gazetteer.csv")
+    for module, settings in [
+        (UB_Listing, {"START_URL": server.index_url, "PAGINATION": "url",
+                      "LISTINGS_CSV": "listings.csv", "CLEAN_CSV": "clean_real_estate.csv"}),
+        (page_crawler, {"PAGE_CONCURRENCY": E2E_CONCURRENCY, "REQUESTS_PER_SECOND": 10_000,
+                        "MAX_PAGES": 100_000}),
+        (get_Brgy_City, {"CONCURRENCY": E2E_CONCURRENCY, "REQUESTS_PER_SECOND": 10_000, "ENGINE": "http"}),
+        (image_cache, {"CONCURRENCY": E2E_CONCURRENCY, "REQUESTS_PER_SECOND": 10_000}),
+        (get_LatLong, {"PROVIDER": "mock", "MIN_DELAY_SECONDS": 0.01}),
+        (geocode_async, {"MOCK_URL": server.url}),
+        (get_Folium, {"FILE_PATH": "listings_geocoded.csv"}),
+    ]:
+        for name, value in settings.items():
+            stack.enter_context(mock.patch.object(module, name, value))
+    return stack
+
+
+def run_stages_offline(n: int, trace_memory: bool) -> list:
+    """
+    Run every stage once on a fresh fixture site of n listings.
+    Returns (stage, seconds, peak MiB or None, requests served, run_metrics counters) per stage.
+    """
+    import io
+    import tempfile
+    from contextlib import redirect_stdout
+    import UB_Listing, run_metrics
+    from fixture_server import FixtureServer
+
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir, \
+            FixtureServer(listings=n, latency=E2E_LATENCY, geocode_latency=E2E_LATENCY) as server, \
+            offline_pipeline(server, workdir):
+        for stage in UB_Listing.STAGES:
+            served = sum(server.requests.values())
+            with redirect_stdout(io.StringIO()):
+                if trace_memory:
+                    seconds, peak = timed_peak(UB_Listing.run, [stage])
+                else:
+                    seconds, peak = timed(UB_Listing.run, [stage]), None
+            rows.append((stage, seconds, peak, sum(server.requests.values()) - served,
+                         run_metrics.current().report()["counters"]))
+    return rows
+
+
+def bench_e2e():
+    # Throughput from an untraced run (tracemalloc slows threaded fetching several
+    # times over); peak memory from a second, traced run on a fresh site
+    print("listings  stage      seconds  listings/s  peak_MiB  requests  counters")
+    for n in E2E_SIZES:
+        timing = run_stages_offline(n, trace_memory=False)
+        memory = run_stages_offline(n, trace_memory=True) if E2E_TRACE_MEMORY else [(None,) * 5] * len(timing)
+        for (stage, seconds, _, served, counters), (_, _, peak, _, _) in zip(timing, memory):
+            peak_text = f"{peak:8.1f}" if peak is not None else f"{'-':>8s}"
+            print(f"{n:8d}  {stage:8s}  {seconds:8.2f}  {n / seconds:10.0f}  {peak_text}  {served:8d}  "
+                  + ", ".join(f"{k}={v}" for k, v in counters.items()))
+        total = sum(row[1] for row in timing)
+        print(f"{n:8d}  {'total':8s}  {total:8.2f}  {n / total:10.0f}")
+
+
+# ---------------------------------------------
+# 10) Listing photos: thumbnail cache vs. hot-linked originals
+# ---------------------------------------------
+def bench_images():
+    import os
+    import tempfile
+    import image_cache, run_metrics
+    from fixture_server import FixtureServer, IMAGE_VARIANTS, FIRST_ID, image_bytes
+    original_mb = sum(len(image_bytes(v)[0]) for v in range(IMAGE_VARIANTS)) / IMAGE_VARIANTS / 2**20
+    print(f"{IMAGE_VARIANTS} distinct photos of {original_mb:.1f} MB shared by all listings")
+    print("listings  pass        seconds  requests  downloaded_MB  thumbs  thumb_KB  popups_MB (originals -> thumbs)")
+    for n in (100, 1_000):
+        with tempfile.TemporaryDirectory() as workdir, FixtureServer(listings=n) as server:
+            urls = [f"{server.url}/images/{FIRST_ID + i}.png" for i in range(n)]
+            previous = os.getcwd()
+            os.chdir(workdir)
+            conn = image_cache.open_cache()
+            try:
+                for label, revalidate_after in (("cold", None), ("warm", None), ("revalidate", 0)):
+                    served = sum(server.requests.values())
+                    metrics = run_metrics.start_run()
+                    seconds = timed(image_cache.cache_images, conn, urls, requests_per_second=10_000,
+                                    revalidate_after=revalidate_after)
+                    downloaded = metrics.report()["counters"].get("image_bytes_downloaded", 0)
+                    sizes = [os.path.getsize(os.path.join(d, f))
+                             for d, _, files in os.walk(image_cache.THUMB_DIR) for f in files]
+                    thumb_kb = sum(sizes) / len(sizes) / 2**10
+                    # What a map visitor downloads by opening every popup
+                    print(f"{n:8d}  {label:10s}  {seconds:7.2f}  {sum(server.requests.values()) - served:8d}  "
+                          f"{downloaded / 2**20:13.1f}  {len(sizes):6d}  {thumb_kb:8.0f}  "
+                          f"{n * original_mb:.0f} -> {n * thumb_kb / 2**10:.1f}")
+            finally:
+                conn.close()
+                os.chdir(previous)
+
+
+# ---------------------------------------------
+# 11) Address parsing: vectorized parser vs. per-title Python
+# ---------------------------------------------
+# {c}: the city's name, {k}: without a trailing "City" (for "{k} City", "City of {k}")
+TITLE_FORMATS = [
+    "Barangay {b}, {k} City, Province Of {p}",
+    "Brgy. {b}, {c}, {p}",
+    "BRGY. {B}, {C}, {P}",
+    "Subdivision, Phase {n}, Barangay {b}, {c}, {p}",
+    "Subdivision, {s}, Brgy. {b}, City of {k}, {p}",
+    "Building {n}, {s}, Barangay {b}, {k} City",
+    "BGY {B} {K} CITY, {P}",
+]
+
+
+def listing_titles(n: int, distinct: int, seed: int = 0):
+    """n detail-page titles drawn from `distinct` places, with the (barangay, city) behind each."""
+    import random
+    import pandas as pd
+    rng = random.Random(seed)
+    cities = pd.read_csv("ph_gazetteer.csv").query("level == 'city'")[["name", "province"]].values.tolist()
+    pool = []
+    for i in range(distinct):
+        city, province = rng.choice(cities)
+        barangay = f"{rng.choice(['San', 'Santo', 'Bagong', 'Pulang'])} {rng.choice(['Antonio', 'Roque', 'Lupa', 'Niño'])} {i % 97}"
+        fmt = rng.choice(TITLE_FORMATS)
+        bare = city.removesuffix(" City")
+        title = fmt.format(b=barangay, c=city, k=bare, p=province, B=barangay.upper(), C=city.upper(),
+                           K=bare.upper(), P=province.upper(), n=i % 9 + 1, s=f"Villa {i % 31}")
+        pool.append((title + " | UnionBank Foreclosed Properties", barangay, city))
+    rows = [rng.choice(pool) for _ in range(n)]
+    return (pd.Series([r[0] for r in rows]), pd.Series([r[1] for r in rows]),
+            pd.Series([r[2] for r in rows]))
+
+
+def bench_address():
+    import unicodedata
+    from address_parser import AddressParser, clean_title
+    from gazetteer import Gazetteer
+
+    def fold(s):
+        return s.map(lambda x: unicodedata.normalize("NFKD", x).encode("ascii", "ignore").decode().lower())
+
+    parser, gazetteer = AddressParser.load(), Gazetteer.load()
+    print("rows       distinct  parse_s  rows/s      per_row_est_s  barangay_ok  city_ok")
+    for n, distinct in ((10_000, 10_000), (100_000, 100_000), (100_000, 5_000), (1_000_000, 20_000)):
+        titles, barangays, cities = listing_titles(n, distinct)
+        start = time.perf_counter()
+        parsed = parser.parse(titles)
+        seconds = time.perf_counter() - start
+        # Before: each title cleaned and resolved on its own; 2,000 titles extrapolated
+        sample = titles.head(2_000)
+        per_row = timed(lambda: [gazetteer.resolve(clean_title(t)) for t in sample]) / len(sample) * n
+        barangay_ok = (fold(parsed["Barangay"].fillna("")) == fold(barangays)).mean()
+        city_ok = (fold(parsed["City"].fillna("")) == fold(cities)).mean()
+        print(f"{n:9d}  {distinct:8d}  {seconds:7.2f}  {n / seconds:10.0f}  {per_row:13.1f}  "
+              f"{barangay_ok:11.1%}  {city_ok:7.1%}")
+
+
+BENCHMARKS = {
+    "pagination": bench_pagination,
+    "cleaning": bench_cleaning,
+    "warehouse": bench_warehouse,
+    "ranking": bench_ranking,
+    "scenarios": bench_scenarios,
+    "excel": bench_excel,
+    "outliers": bench_outliers,
+    "spatial": bench_spatial,
+    "e2e": bench_e2e,
+    "images": bench_images,
+    "address": bench_address,
+}
+
+
+def main(names: List[str]):
+    for name in names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            raise SystemExit(f"Unknown benchmark {name!r}. Choose from: {', '.join(BENCHMARKS)}")
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
+        print()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,3 +1,3 @@
-import Testing
+import UB_Listing
 
-Testing.main()
\ No newline at end of file
+UB_Listing.main()
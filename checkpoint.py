@@ -0,0 +1,100 @@
+# checkpoint.py
+import json
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# ---- Settings ----
+CHECKPOINT_PATH = "pipeline_checkpoint.db"
+FLUSH_EVERY = 20        # records buffered before a commit; a crash loses at most this many
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    stage   TEXT NOT NULL,
+    key     TEXT NOT NULL,
+    value   TEXT NOT NULL,
+    PRIMARY KEY (stage, key)
+);
+CREATE TABLE IF NOT EXISTS run_stages (
+    run_id      TEXT NOT NULL,      -- e.g. the scrape date
+    stage       TEXT NOT NULL,
+    finished_at REAL NOT NULL,
+    PRIMARY KEY (run_id, stage)
+);
+"""
+
+
+class Checkpoint:
+    """
+    Durable per-record progress for one pipeline stage.
+    Results are buffered and committed every `flush_every` records, so a
+    restarted run can skip every record that was already completed.
+    """
+
+    def __init__(self, stage: str, path: str = CHECKPOINT_PATH, flush_every: int = FLUSH_EVERY):
+        self.stage = stage
+        self.flush_every = flush_every
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self.buffer: List[Tuple[str, str, str]] = []
+
+    def load(self) -> Dict[str, Any]:
+        """Every record completed so far for this stage, key -> value."""
+        rows = self.conn.execute(
+            "SELECT key, value FROM records WHERE stage = ?", (self.stage,)
+        ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def put(self, key: str, value: Any):
+        self.buffer.append((self.stage, key, json.dumps(value)))
+        if len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO records (stage, key, value) VALUES (?, ?, ?)", self.buffer
+            )
+        self.buffer.clear()
+
+    def clear(self):
+        """Forget this stage's records once its output file has been written."""
+        self.buffer.clear()
+        with self.conn:
+            self.conn.execute("DELETE FROM records WHERE stage = ?", (self.stage,))
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def open_run(path: str = CHECKPOINT_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def interrupted_run(conn: sqlite3.Connection) -> Optional[str]:
+    """Run id of the run that left finished stages behind, or None."""
+    row = conn.execute("SELECT run_id FROM run_stages ORDER BY finished_at DESC LIMIT 1").fetchone()
+    return row[0] if row else None
+
+
+def finished_stages(conn: sqlite3.Connection, run_id: str) -> List[str]:
+    """Stages the interrupted run `run_id` already completed."""
+    return [stage for (stage,) in conn.execute("SELECT stage FROM run_stages WHERE run_id = ?", (run_id,))]
+
+
+def mark_finished(conn: sqlite3.Connection, run_id: str, stage: str):
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO run_stages (run_id, stage, finished_at) VALUES (?, ?, ?)",
+                     (run_id, stage, time.time()))
+
+
+def reset_run(conn: sqlite3.Connection):
+    """Start a fresh run: forget finished stages and any leftover records."""
+    with conn:
+        conn.execute("DELETE FROM run_stages")
+        conn.execute("DELETE FROM records")
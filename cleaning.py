@@ -0,0 +1,75 @@
+# cleaning.py
+import re
+import numpy as np
+import pandas as pd
+import arrow_text
+# Arrow's RE2 kernels run the regexes below in C++ over a whole column when pyarrow
+# is installed; otherwise pandas runs the same patterns (see arrow_text)
+from arrow_text import pa, pc, group, to_arrow
+
+# LA (lot area) if present anywhere, else FA (floor area): "FA: 43 sqm • LA: 2,250 sqm" -> la=2,250.
+# The first branch wins whenever the text has an LA, so one pass yields both named groups.
+# Anchored at ^ so the engine does not retry the leading .* from every position.
+LOT_PATTERN = r"^(?:.*LA:\s*(?P<la>\d[\d,]*(?:\.\d+)?)|.*?FA:\s*(?P<fa>\d[\d,]*(?:\.\d+)?))"
+# After dropping the Php/₱ prefix, commas and whitespace, a valid price is a plain decimal;
+# anything else ("Php 1,000 - 2,000", "Php 1.5M") stays NaN rather than becoming a wrong number
+PRICE_NOISE_PATTERN = r"Php|₱|[,\s]+"
+NUMBER_PATTERN = r"^(?P<value>\d+(?:\.\d+)?)$"
+# Province: the text after the last comma
+PROVINCE_PATTERN = r"(?P<province>[^,]*)$"
+
+LOT_RE = re.compile(LOT_PATTERN, flags=re.DOTALL)
+PRICE_NOISE_RE = re.compile(PRICE_NOISE_PATTERN)
+NUMBER_RE = re.compile(NUMBER_PATTERN)
+PROVINCE_RE = re.compile(PROVINCE_PATTERN)
+
+
+def _to_float(arr, index) -> pd.Series:
+    # Only strings that are plain decimals are cast; anything else becomes NaN
+    valid = pc.struct_field(pc.extract_regex(arr, NUMBER_PATTERN), [0])
+    values = pc.cast(valid, pa.float64()).to_numpy(zero_copy_only=False)
+    return pd.Series(values, index=index, dtype="float64")
+
+
+def clean_address(address: pd.Series) -> pd.Series:
+    """Province only: the last comma-separated part."""
+    if arrow_text.pa is None:
+        return address.str.extract(PROVINCE_RE)["province"].str.strip()
+    province = pc.struct_field(pc.extract_regex(to_arrow(address), PROVINCE_PATTERN), [0])
+    province = pc.utf8_trim_whitespace(province).to_numpy(zero_copy_only=False)
+    return pd.Series(province, index=address.index, dtype=object).where(address.notna(), np.nan)
+
+
+def clean_lot(lot: pd.Series) -> pd.Series:
+    """LA (lot area) if present, else FA (floor area), as a number of sqm."""
+    if arrow_text.pa is None:
+        areas = lot.astype(str).str.extract(LOT_RE)
+        area = areas["la"].fillna(areas["fa"]).str.replace(",", "", regex=False)
+        return pd.to_numeric(area, errors="coerce")
+    areas = pc.extract_regex(to_arrow(lot), LOT_PATTERN)
+    area = pc.coalesce(group(areas, 0), group(areas, 1))
+    return _to_float(pc.replace_substring(area, ",", ""), lot.index)
+
+
+def clean_price(price: pd.Series) -> pd.Series:
+    """Drop the Php/₱ prefix, commas and spaces in one pass and convert to a number."""
+    if arrow_text.pa is None:
+        digits = price.astype(str).str.replace(PRICE_NOISE_RE, "", regex=True)
+        return pd.to_numeric(digits.where(digits.str.fullmatch(NUMBER_RE)), errors="coerce")
+    digits = pc.replace_substring_regex(to_arrow(price), PRICE_NOISE_PATTERN, "")
+    return _to_float(digits, price.index)
+
+
+def clean_real_estate_data(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cleans Address, Lot, and Price columns:
+    - Address: extracts Province only
+    - Lot: extracts LA if present, else FA, converts to numeric
+    - Price: removes Php/₱, commas, converts to numeric
+    Returns a new DataFrame; the input is not modified.
+    """
+    df = df.copy()
+    df["Address"] = clean_address(df["Address"])
+    df["Lot"] = clean_lot(df["Lot"])
+    df["Price"] = clean_price(df["Price"])
+    return df
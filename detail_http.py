@@ -0,0 +1,95 @@
+# detail_http.py
+from typing import Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+import lxml.etree
+import lxml.html
+
+# ---- Settings ----
+HTTP_TIMEOUT = 15               # seconds per request
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0 Safari/537.36"
+)
+
+LOT_DESCRIPTION_XPATH = (
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' txt-container-2 ')]//h1"
+)
+
+
+def make_session(pool_size: int = 4) -> requests.Session:
+    """
+    Keep-alive HTTP session whose connection pool is sized for `pool_size` workers.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+def classify_lot_description(text: str) -> str:
+    """
+    Map the detail page heading to 'Vacant Lot', 'Town House', 'Condominium',
+    'House and Lot', or '(unknown)'.
+    """
+    text = text.strip().lower()
+    if "vacant lot" in text:
+        return "Vacant Lot"
+    elif "townhouse" in text:
+        return "Town House"
+    elif "condominium" in text:
+        return "Condominium"
+    elif "house and lot" in text:
+        return "House and Lot"
+    return "(unknown)"
+
+
+def parse_detail_html(html: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Parse a saved/raw detail page and return (title, lot description).
+    Title follows the same order as the Selenium path: og:title, <title>, first <h1>.
+    Either value is None when the static HTML does not contain it, and both are None
+    for an empty document.
+    """
+    if not html or not html.strip():
+        return None, None
+    try:
+        doc = lxml.html.fromstring(html)
+    except lxml.etree.ParserError:      # e.g. a body of nothing but a comment
+        return None, None
+
+    title = None
+    og = doc.xpath("//meta[@property='og:title']/@content")
+    if og and og[0].strip():
+        title = og[0].strip()
+    if title is None:
+        raw_title = doc.findtext(".//title")
+        if raw_title and raw_title.strip():
+            title = raw_title.strip()
+    if title is None:
+        h1 = doc.xpath("//h1")
+        if h1 and h1[0].text_content().strip():
+            title = h1[0].text_content().strip()
+
+    lot_description = None
+    heading = doc.xpath(LOT_DESCRIPTION_XPATH)
+    if heading:
+        lot_description = classify_lot_description(heading[0].text_content())
+
+    return title, lot_description
+
+
+def fetch_detail_html(session: requests.Session, url: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Fetch one detail page without a browser. Returns (None, None) on HTTP errors
+    so the caller can fall back to Selenium.
+    """
+    try:
+        response = session.get(url, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException:
+        return None, None
+    return parse_detail_html(response.text)
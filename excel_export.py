@@ -0,0 +1,74 @@
+# excel_export.py
+# Streaming workbook writer: rows go to disk chunk by chunk (openpyxl write-only
+# mode), so memory stays flat however long the sheets are.
+import os
+from typing import Dict
+import pandas as pd
+import run_metrics
+
+# ---- Settings ----
+EXCEL_MAX_ROWS = 1_048_575       # data rows per sheet (Excel's limit minus the header)
+CHUNK_ROWS = 10_000              # rows converted to Python values at a time
+LARGE_SHEET_ROWS = EXCEL_MAX_ROWS
+# What happens to a sheet longer than LARGE_SHEET_ROWS:
+#   "split":   Name_1, Name_2, ... sheets of LARGE_SHEET_ROWS rows each
+#   "parquet": written to <workbook>_<Name>.parquet; the sheet only points to it
+#   "csv":     same, as <workbook>_<Name>.csv
+LARGE_SHEET_MODE = "split"
+LARGE_SHEET_MODES = ("split", "parquet", "csv")
+
+
+def _append_rows(ws, df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS):
+    ws.append([str(c) for c in df.columns])
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        # NaN / NA become empty cells, as with DataFrame.to_excel
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            ws.append(row)
+
+
+def write_workbook(path: str, sheets: Dict[str, pd.DataFrame],
+                   large_sheet_rows: int = LARGE_SHEET_ROWS,
+                   large_sheet_mode: str = LARGE_SHEET_MODE) -> Dict[str, str]:
+    """
+    Stream every frame in `sheets` into one .xlsx (index not written).
+    Sheets longer than large_sheet_rows are split or sent to a side file, see
+    LARGE_SHEET_MODE. Returns where each sheet ended up.
+    """
+    from openpyxl import Workbook
+
+    if large_sheet_mode not in LARGE_SHEET_MODES:
+        raise ValueError(f"Unknown large sheet mode: {large_sheet_mode!r}. "
+                         f"Use one of {', '.join(LARGE_SHEET_MODES)}.")
+    large_sheet_rows = min(large_sheet_rows, EXCEL_MAX_ROWS)
+
+    with run_metrics.timer("excel_write"):
+        return _write_sheets(Workbook(write_only=True), path, sheets, large_sheet_rows, large_sheet_mode)
+
+
+def _write_sheets(wb, path: str, sheets: Dict[str, pd.DataFrame],
+                  large_sheet_rows: int, large_sheet_mode: str) -> Dict[str, str]:
+    placed = {}
+    for name, df in sheets.items():
+        run_metrics.count("excel_rows", len(df))
+        if len(df) <= large_sheet_rows:
+            _append_rows(wb.create_sheet(name), df)
+            placed[name] = f"{path}:{name}"
+        elif large_sheet_mode == "split":
+            parts = range(0, len(df), large_sheet_rows)
+            for i, start in enumerate(parts, 1):
+                _append_rows(wb.create_sheet(f"{name}_{i}"), df.iloc[start:start + large_sheet_rows])
+            placed[name] = f"{path}:{name}_1..{name}_{len(parts)}"
+        else:
+            side = f"{os.path.splitext(path)[0]}_{name}.{large_sheet_mode}"
+            if large_sheet_mode == "parquet":
+                df.to_parquet(side, index=False)
+            else:
+                df.to_csv(side, index=False, encoding="utf-8-sig")
+            ws = wb.create_sheet(name)
+            ws.append(["rows", "file"])
+            ws.append([len(df), os.path.basename(side)])
+            placed[name] = side
+    wb.save(path)
+    return placed
@@ -0,0 +1,254 @@
+# fixture_server.py
+# Offline stand-ins for unionbankph.com and Nominatim, for benchmarks and local runs:
+#   /foreclosed-properties?page=N   index pages with the same card markup the scrapers read
+#                                   (p.city-arg, p.specs, p.price, the data-icon='right' pager)
+#   /foreclosed-properties/<id>     detail pages (og:title, div.txt-container-2 h1)
+#   /images/<id>.png                listing photos (ETag / If-None-Match aware)
+#   /search?q=...&format=jsonv2     Nominatim-style geocoder
+# Every listing is generated from its number, so the same settings always serve the
+# same site. Usage: python fixture_server.py [listings] [port]
+import hashlib
+import io
+import json
+import random
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlparse, parse_qs, urlencode
+
+# ---- Settings ----
+HOST = "127.0.0.1"
+LISTINGS = 1_000
+PAGE_SIZE = 24              # cards per index page
+LATENCY = 0.0               # seconds added to every site response
+GEOCODE_LATENCY = 0.0       # seconds added to every geocoder response
+NOT_FOUND_RATE = 0.05       # share of geocoder queries answered with no result
+ERROR_RATE = 0.0            # share of geocoder requests answered 503 (retried by the client)
+FIRST_ID = 100_000
+IMAGE_SIZE = (1280, 960)    # photos are screenshot-sized PNGs (a few MB each)
+IMAGE_VARIANTS = 20         # distinct photos; listings share them, as reused screenshots do
+
+PROVINCES = ["NCR", "Cavite", "Laguna", "Rizal", "Bulacan", "Pampanga", "Batangas",
+             "Cebu", "Davao del Sur", "Iloilo", "Pangasinan", "Negros Occidental"]
+LOT_DESCRIPTIONS = ["House and Lot", "Vacant Lot", "Townhouse", "Condominium"]
+
+# 1x1 transparent GIF, served when Pillow is not installed
+PIXEL_GIF = bytes.fromhex("47494638396101000100800000000000ffffff21f90401000000002c"
+                          "00000000010001000002024401003b")
+_images = {}
+_images_lock = threading.Lock()
+
+
+def listing(n: int) -> dict:
+    """The n-th synthetic listing (0-based)."""
+    rng = random.Random(n)
+    lot = rng.randint(40, 1_500)
+    return {
+        "id": FIRST_ID + n,
+        "province": rng.choice(PROVINCES),
+        "city": f"City {rng.randint(1, 40)}",
+        "barangay": f"Barangay {rng.randint(1, 60)}",
+        "lot": lot,
+        "floor": rng.randint(0, lot // 2),
+        "price": round(lot * rng.uniform(4_000, 60_000), -3),
+        "lot_description": rng.choice(LOT_DESCRIPTIONS),
+    }
+
+
+def _card(item: dict) -> str:
+    return (
+        f'<div class="property-card">'
+        f'<a href="/foreclosed-properties/{item["id"]}">'
+        f'<img src="/images/{item["id"]}.png" alt="photo"></a>'
+        f'<p class="city-arg">{item["city"]}, {item["province"]}</p>'
+        f'<p class="specs">LA: {item["lot"]:,} sqm | FA: {item["floor"]:,} sqm</p>'
+        f'<p class="price">₱ {item["price"]:,.2f}</p>'
+        f'</div>'
+    )
+
+
+def index_page(page: int, query: dict, listings: int, page_size: int) -> str:
+    first = (page - 1) * page_size
+    cards = "".join(_card(listing(n)) for n in range(max(first, 0), min(first + page_size, listings)))
+    # Past the last page the site serves an empty grid; the pager stays
+    next_query = urlencode({**{k: v[0] for k, v in query.items()}, "page": page + 1})
+    return (
+        "<!DOCTYPE html><html><head><title>Foreclosed Properties</title></head><body>"
+        f'<div class="grid">{cards}</div>'
+        f'<nav><a href="/foreclosed-properties?{next_query}" aria-disabled="{str(first + page_size >= listings).lower()}">'
+        '<svg data-icon="right" viewBox="0 0 10 10"></svg></a></nav>'
+        "</body></html>"
+    )
+
+
+def detail_page(item: dict) -> str:
+    place = f'{item["barangay"]}, {item["city"]}, {item["province"]}'
+    return (
+        "<!DOCTYPE html><html><head>"
+        f'<meta property="og:title" content="{place} | UnionBank Foreclosed Properties">'
+        f"<title>{place} | UnionBank</title></head><body>"
+        f'<div class="txt-container-2"><h1>{item["lot_description"]} for Sale</h1></div>'
+        "</body></html>"
+    )
+
+
+def image_bytes(variant: int, size=IMAGE_SIZE) -> tuple:
+    """(body, content type) of one photo variant, generated once per process."""
+    with _images_lock:
+        if (variant, size) not in _images:
+            try:
+                from PIL import Image
+            except ImportError:
+                _images[variant, size] = (PIXEL_GIF, "image/gif")
+            else:
+                # Coarse noise upscaled: photo-like, and PNG cannot shrink it much
+                rng = random.Random(variant)
+                small = Image.frombytes("RGB", (size[0] // 4, size[1] // 4),
+                                        rng.randbytes(size[0] // 4 * size[1] // 4 * 3))
+                buffer = io.BytesIO()
+                small.resize(size).save(buffer, "PNG")
+                _images[variant, size] = (buffer.getvalue(), "image/png")
+        return _images[variant, size]
+
+
+def geocode_answer(query: str, not_found_rate: float = NOT_FOUND_RATE) -> list:
+    """Deterministic Nominatim jsonv2 answer for a query: a point in the Philippines, or []."""
+    digest = int.from_bytes(hashlib.sha1(query.strip().lower().encode()).digest()[:8], "big")
+    rng = random.Random(digest)
+    if rng.random() < not_found_rate:
+        return []
+    lat, lon = rng.uniform(5.5, 18.5), rng.uniform(118.0, 126.0)
+    return [{"lat": f"{lat:.7f}", "lon": f"{lon:.7f}", "display_name": query, "importance": 0.5}]
+
+
+class FixtureServer:
+    """
+    Threaded local server for the synthetic site and geocoder. Use as a context
+    manager; `requests` counts what was served (index, detail, image, search, error).
+    """
+
+    def __init__(self, listings: int = LISTINGS, page_size: int = PAGE_SIZE,
+                 latency: float = LATENCY, geocode_latency: float = GEOCODE_LATENCY,
+                 not_found_rate: float = NOT_FOUND_RATE, error_rate: float = ERROR_RATE,
+                 host: str = HOST, port: int = 0):
+        self.listings = listings
+        self.page_size = page_size
+        self.latency = latency
+        self.geocode_latency = geocode_latency
+        self.not_found_rate = not_found_rate
+        self.error_rate = error_rate
+        self.requests = Counter()
+        self.lock = threading.Lock()
+        self.errors = random.Random(0)
+        self.httpd = ThreadingHTTPServer((host, port), _handler(self))
+        self.httpd.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def index_url(self) -> str:
+        """Same shape as UB_Listing.START_URL."""
+        return (f"{self.url}/foreclosed-properties?page=1&min_bid_price=0&max_bid_price=0"
+                "&type_of_property=Residential&type_of_residential=House%20and%20Lot")
+
+    def count(self, kind: str):
+        with self.lock:
+            self.requests[kind] += 1
+
+    def start(self) -> "FixtureServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _handler(fixture: FixtureServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"     # keep-alive, like the real sites
+
+        def setup(self):
+            super().setup()
+            # Headers and body go out in separate writes; without this, keep-alive
+            # clients stall on delayed ACKs and the server looks 40 ms slower per request
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str, etag: Optional[str] = None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            if etag:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            parts = [p for p in parsed.path.split("/") if p]
+            query = parse_qs(parsed.query)
+
+            if parts == ["search"]:
+                fixture.count("search")
+                time.sleep(fixture.geocode_latency)
+                with fixture.lock:
+                    failed = fixture.errors.random() < fixture.error_rate
+                if failed:
+                    fixture.count("error")
+                    return self._send(503, b"busy", "text/plain")
+                answer = geocode_answer(query.get("q", [""])[0], fixture.not_found_rate)
+                return self._send(200, json.dumps(answer).encode(), "application/json")
+
+            time.sleep(fixture.latency)
+            if parts == ["foreclosed-properties"]:
+                fixture.count("index")
+                page = int(query.get("page", ["1"])[0] or 1)
+                html = index_page(page, query, fixture.listings, fixture.page_size)
+                return self._send(200, html.encode(), "text/html; charset=utf-8")
+            if len(parts) == 2 and parts[0] in ("foreclosed-properties", "images"):
+                n = int(parts[1].split(".")[0]) - FIRST_ID if parts[1].split(".")[0].isdigit() else -1
+                if 0 <= n < fixture.listings:
+                    if parts[0] == "images":
+                        variant = n % IMAGE_VARIANTS
+                        etag = f'"{variant}-{IMAGE_SIZE[0]}x{IMAGE_SIZE[1]}"'
+                        if self.headers.get("If-None-Match") == etag:
+                            fixture.count("image_not_modified")
+                            return self._send(304, b"", "image/png", etag)
+                        fixture.count("image")
+                        return self._send(200, *image_bytes(variant), etag)
+                    fixture.count("detail")
+                    return self._send(200, detail_page(listing(n)).encode(), "text/html; charset=utf-8")
+            fixture.count("not_found")
+            self._send(404, b"not found", "text/plain")
+
+    return Handler
+
+
+if __name__ == "__main__":
+    listings = int(sys.argv[1]) if len(sys.argv) > 1 else LISTINGS
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8088
+    with FixtureServer(listings=listings, port=port) as server:
+        print(f"Serving {listings} listings at {server.index_url}")
+        print(f"Geocoder: {server.url}/search (geocode_async 'mock' provider)")
+        try:
+            server.thread.join()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,118 @@
+# gazetteer.py
+# Offline barangay / city / province centroid lookup.
+# ph_gazetteer.csv ships province and city/municipality points only (town-center
+# coordinates used as approximate centroids), no barangay rows. With the bundled file the
+# gazetteer is therefore a fallback: get_LatLong only answers locally at barangay level,
+# so every listing still goes to Nominatim and the coarse points are used when that fails
+# (or for everything with OFFLINE_ONLY). A PSGC extract with barangay rows can be dropped
+# in with the same columns (level,name,city,province,lat,long,aliases) to answer locally.
+import re
+from typing import Dict, NamedTuple, Optional, Tuple
+import pandas as pd
+from query_normalize import canonical_key as place_key
+
+GAZETTEER_CSV = "ph_gazetteer.csv"
+LEVELS = {"province": 1, "city": 2, "barangay": 3}
+
+
+class Match(NamedTuple):
+    lat: float
+    long: float
+    level: str
+
+
+def _alternation(names) -> re.Pattern:
+    # Longest names first so "san jose del monte" wins over "san jose"
+    names = sorted(set(names), key=len, reverse=True)
+    return re.compile(r"\b(" + "|".join(re.escape(n) for n in names) + r")\b")
+
+
+class Gazetteer:
+    """
+    In-memory index over the gazetteer: one dict per level plus a precompiled
+    name alternation per parent, so a title is resolved with a handful of regex scans.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.provinces: Dict[str, Tuple[float, float]] = {}
+        self.cities: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self.barangays: Dict[Tuple[str, str, str], Tuple[float, float]] = {}
+
+        for row in df.fillna("").itertuples(index=False):
+            point = (float(row.lat), float(row.long))
+            province = place_key(row.province)
+            names = [row.name] + [a for a in str(row.aliases).split("|") if a.strip()]
+            for name in map(place_key, names):
+                if row.level == "province":
+                    self.provinces[name] = point
+                elif row.level == "city":
+                    self.cities[(province, name)] = point
+                elif row.level == "barangay":
+                    self.barangays[(province, place_key(row.city), name)] = point
+
+        # Province aliases (e.g. "metro manila") resolve to the canonical province key
+        self.province_alias = {place_key(a): place_key(r.province)
+                               for r in df.fillna("").itertuples(index=False) if r.level == "province"
+                               for a in [r.name] + str(r.aliases).split("|") if a.strip()}
+        self.province_re = _alternation(self.province_alias)
+        self.city_re = {p: _alternation(c for (pp, c) in self.cities if pp == p)
+                        for p in {p for p, _ in self.cities}}
+        self.barangay_re = {pc: _alternation(b for (p, c, b) in self.barangays if (p, c) == pc)
+                            for pc in {(p, c) for p, c, _ in self.barangays}}
+
+    @property
+    def finest_level(self) -> Optional[str]:
+        """Most specific level with any rows loaded (None for an empty gazetteer)."""
+        for level, points in (("barangay", self.barangays), ("city", self.cities),
+                              ("province", self.provinces)):
+            if points:
+                return level
+        return None
+
+    @classmethod
+    def load(cls, path: str = GAZETTEER_CSV) -> "Gazetteer":
+        return cls(pd.read_csv(path, dtype=str))
+
+    def _find_city(self, title: str, province: str) -> Optional[str]:
+        pattern = self.city_re.get(province)
+        if pattern is None:
+            return None
+        # Ignore names inside the trailing province mention ("manila" in "metro manila",
+        # the second "bulacan" in "Bulacan, Bulacan")
+        suffix = [m.span() for m in self.province_re.finditer(title)
+                  if self.province_alias[m.group(1)] == province]
+        start, end = suffix[-1] if suffix else (len(title), len(title))
+        found = [m.group(1) for m in pattern.finditer(title)
+                 if not (m.start() >= start and m.end() <= end)]
+        # Titles read barangay, city, province, so the last match is usually the city.
+        # Cities named after their province (Iloilo City) only win when nothing else matched.
+        strong = [c for c in found if not c.startswith(province)]
+        if strong:
+            return strong[-1]
+        return found[-1] if found else None
+
+    def resolve(self, title: str, province_hint: Optional[str] = None) -> Optional[Match]:
+        """
+        Resolve a listing title to the most specific point available:
+        barangay, then city/municipality, then province. Returns None if
+        not even the province is known.
+        """
+        key = place_key(title)
+        province = self.province_alias.get(place_key(province_hint)) if province_hint else None
+        if province is None:
+            found = self.province_re.findall(key)
+            province = self.province_alias[found[-1]] if found else None
+        if province is None:
+            return None
+
+        city = self._find_city(key, province)
+        if city is not None:
+            pattern = self.barangay_re.get((province, city))
+            found = pattern.findall(key) if pattern else []
+            if found:
+                return Match(*self.barangays[(province, city, found[0])], "barangay")
+            return Match(*self.cities[(province, city)], "city")
+
+        if province in self.provinces:
+            return Match(*self.provinces[province], "province")
+        return None
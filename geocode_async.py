@@ -0,0 +1,115 @@
+# geocode_async.py
+import asyncio
+from typing import Callable, List, Optional, Tuple
+import aiohttp
+import run_metrics
+from rate_limit import AsyncTokenBucket
+
+# ---- Settings ----
+USER_AGENT = "my_Geocoder_App-Erson"
+REQUEST_TIMEOUT = 10                       # seconds per request
+SELF_HOSTED_URL = "http://localhost:8080"  # <-- your own Nominatim instance
+MOCK_URL = "http://127.0.0.1:8088"         # fixture_server.py (its default port); tests/benchmarks start their own
+
+Location = Optional[Tuple[float, float]]
+OnResult = Callable[[int, bool, Location], None]
+
+
+class TransientGeocodeError(Exception):
+    """Network error, timeout, 429 or 5xx: worth retrying."""
+
+
+class NominatimProvider:
+    """
+    Any server speaking the Nominatim /search API. Each provider carries its own
+    rate limit (requests/second, None = unlimited) and concurrency.
+    """
+
+    def __init__(self, name: str, base_url: str,
+                 rate: Optional[float] = 1.0, concurrency: int = 1,
+                 user_agent: str = USER_AGENT):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.rate = rate
+        self.concurrency = concurrency
+        self.user_agent = user_agent
+
+    async def geocode(self, session: aiohttp.ClientSession, query: str) -> Location:
+        params = {"q": query, "format": "jsonv2", "limit": "1"}
+        try:
+            async with session.get(f"{self.base_url}/search", params=params,
+                                   headers={"User-Agent": self.user_agent}) as response:
+                if response.status == 429 or response.status >= 500:
+                    raise TransientGeocodeError(f"{self.name}: HTTP {response.status}")
+                response.raise_for_status()
+                results = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise TransientGeocodeError(f"{self.name}: {type(e).__name__}: {e}") from e
+        if not results:
+            return None
+        return float(results[0]["lat"]), float(results[0]["lon"])
+
+
+PROVIDERS = {
+    # Public OSM server: usage policy is 1 request/second, one at a time
+    "nominatim": lambda: NominatimProvider("nominatim", "https://nominatim.openstreetmap.org",
+                                           rate=1.0, concurrency=1),
+    "self_hosted": lambda: NominatimProvider("self_hosted", SELF_HOSTED_URL,
+                                             rate=None, concurrency=16),
+    "mock": lambda: NominatimProvider("mock", MOCK_URL, rate=None, concurrency=32),
+}
+
+
+def get_provider(name: str) -> NominatimProvider:
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown geocode provider {name!r}. Choose from: {', '.join(PROVIDERS)}")
+    return PROVIDERS[name]()
+
+
+async def _geocode_all(queries: List[str], provider: NominatimProvider,
+                       max_retries: int, retry_delay: float,
+                       on_result: Optional[OnResult]) -> List[Tuple[bool, Location]]:
+    bucket = AsyncTokenBucket(provider.rate) if provider.rate else None
+    semaphore = asyncio.Semaphore(provider.concurrency)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=provider.concurrency)
+
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        async def attempt_all(query: str) -> Tuple[bool, Location]:
+            for attempt in range(max_retries + 1):
+                async with semaphore:
+                    if bucket:
+                        await bucket.acquire()
+                    try:
+                        with run_metrics.timer("geocode_call"):
+                            return True, await provider.geocode(session, query)
+                    except TransientGeocodeError:
+                        run_metrics.count("geocode_errors")
+                with run_metrics.timer("sleep"):
+                    await asyncio.sleep(retry_delay + (attempt + 1) * 0.5)  # backoff
+            return False, None
+
+        async def one(i: int, query: str) -> Tuple[bool, Location]:
+            answered, loc = await attempt_all(query)
+            if on_result:
+                on_result(i, answered, loc)
+            return answered, loc
+
+        return await asyncio.gather(*(one(i, q) for i, q in enumerate(queries)))
+
+
+def geocode_queries(queries: List[str], provider: NominatimProvider,
+                    max_retries: int = 2, retry_delay: float = 1.0,
+                    on_result: Optional[OnResult] = None) -> List[Tuple[bool, Location]]:
+    """
+    Geocode `queries` concurrently within the provider's rate/concurrency limits.
+    Returns one (answered, location) pair per query, in input order:
+      - (True, (lat, lon)) found
+      - (True, None)       the provider answered "not found"
+      - (False, None)      still failing after max_retries transient errors
+    on_result(index, answered, location) is called as each query finishes, so
+    callers can persist answers before the whole batch is done.
+    """
+    if not queries:
+        return []
+    return asyncio.run(_geocode_all(list(queries), provider, max_retries, retry_delay, on_result))
@@ -0,0 +1,81 @@
+# geocode_cache.py
+import sqlite3
+import time
+from typing import Optional, Tuple
+from query_normalize import canonical_key
+
+# ---- Settings ----
+CACHE_PATH = "geocode_cache.db"
+TTL_SECONDS = 90 * 24 * 3600            # found coordinates are trusted for 90 days
+NEGATIVE_TTL_SECONDS = 7 * 24 * 3600    # "not found" is retried after 7 days
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocodes (
+    query      TEXT PRIMARY KEY,
+    lat        REAL,
+    long       REAL,
+    found      INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+)
+"""
+
+
+def normalize_query(query: str) -> str:
+    """
+    Cache key for a geocoder query: its canonical form (see query_normalize).
+    """
+    return canonical_key(query)
+
+
+class GeocodeCache:
+    """
+    SQLite-backed geocode cache with separate TTLs for found and not-found results.
+    Counts hits, misses and stale entries for the end-of-run report.
+    """
+
+    def __init__(self, path: str = CACHE_PATH,
+                 ttl_seconds: float = TTL_SECONDS,
+                 negative_ttl_seconds: float = NEGATIVE_TTL_SECONDS):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(SCHEMA)
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.stats = {"hits": 0, "misses": 0, "stale": 0}
+
+    def get(self, query: str) -> Tuple[bool, Optional[Tuple[float, float]]]:
+        """
+        Return (cached, location). location is None for a cached "not found".
+        Expired entries count as stale and are reported as not cached.
+        """
+        row = self.conn.execute(
+            "SELECT lat, long, found, fetched_at FROM geocodes WHERE query = ?",
+            (normalize_query(query),)
+        ).fetchone()
+        if row is None:
+            self.stats["misses"] += 1
+            return False, None
+
+        lat, lon, found, fetched_at = row
+        ttl = self.ttl_seconds if found else self.negative_ttl_seconds
+        if time.time() - fetched_at > ttl:
+            self.stats["stale"] += 1
+            return False, None
+
+        self.stats["hits"] += 1
+        return True, ((lat, lon) if found else None)
+
+    def put(self, query: str, location: Optional[Tuple[float, float]]):
+        lat, lon = location if location is not None else (None, None)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO geocodes (query, lat, long, found, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (normalize_query(query), lat, lon, int(location is not None), time.time())
+            )
+
+    def report(self) -> str:
+        s = self.stats
+        return f"Geocode cache: {s['hits']} hits, {s['misses']} misses, {s['stale']} stale"
+
+    def close(self):
+        self.conn.close()
@@ -1,16 +1,19 @@
 
 # selenium_extract_titles.py
-import time,os,re#, Testing
+import os,threading#, Testing
 import pandas as pd
-from typing import Optional
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import WebDriverException, TimeoutException, NoSuchElementException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional, Tuple
+from rate_limit import HostRateLimiter
+from detail_http import make_session, fetch_detail_html, classify_lot_description
+from checkpoint import Checkpoint
+from stage_io import read_stage, write_stage
+from address_parser import clean_title, add_address_fields
+import run_metrics
+
+# Selenium is only imported once a page actually needs rendering
+if TYPE_CHECKING:
+    from selenium import webdriver
 
 
 ROOT = r"D:\Desktop\Python\Web_Scraping"
@@ -24,9 +27,16 @@ FILE_PATH = os.path.join(ROOT, PATH, FILENAME)
 INPUT_CSV = FILE_PATH     # <-- change to your file path
 OUTPUT_CSV = "titles.csv"
 DELAY_SECONDS = 1.0            # polite delay between pages
-MAX_RETRIES = 2                 # retries per URL
+MAX_RETRIES = 2                 # browser retries per URL, each with a fresh driver
 PAGE_LOAD_TIMEOUT = 25          # seconds
+CONCURRENCY = 4                 # parallel headless drivers
+REQUESTS_PER_SECOND = 1.0 / DELAY_SECONDS   # shared per-host budget across all drivers
+ENGINE = "http"                 # "http": parse static HTML, Selenium only as fallback; "selenium": always render
 def make_driver(headless=True, proxy=None):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
     opts = webdriver.ChromeOptions()
     if headless:
         opts.add_argument("--headless=new")
@@ -47,13 +57,18 @@ def make_driver(headless=True, proxy=None):
     return driver
 
 
-def extract_title_with_selenium(driver: webdriver.Chrome) -> Optional[str]:
+def extract_title_with_selenium(driver: "webdriver.Chrome") -> Optional[str]:
     """
     Try to extract a clean title from:
       1) <meta property="og:title">
       2) <title>
       3) first <h1>
     """
+    from selenium.webdriver.common.by import By
+    from selenium.common.exceptions import WebDriverException, NoSuchElementException
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     # 1) og:title via JS
     try:
         og = driver.execute_script(
@@ -88,27 +103,6 @@ def extract_title_with_selenium(driver: webdriver.Chrome) -> Optional[str]:
 
     return None
 
-def fetch_title(driver: webdriver.Chrome, url: str) -> str:
-    last_err = None
-    for attempt in range(MAX_RETRIES + 1):
-        try:
-            driver.get(url)
-
-            # Small wait to allow JS/meta tags to be populated
-            time.sleep(1.5)
-
-            title = extract_title_with_selenium(driver)
-            if title:
-                return title
-            else:
-                return "(no title)"
-        except (WebDriverException, TimeoutException) as e:
-            last_err = e
-            time.sleep(DELAY_SECONDS + attempt * 0.5)
-    return f"(error) {type(last_err).__name__}: {last_err}"
-
-
-
 def read_links_column(df: pd.DataFrame) -> pd.Series:
     """
     Return the Series containing links.
@@ -121,53 +115,163 @@ def read_links_column(df: pd.DataFrame) -> pd.Series:
             raise ValueError("CSV does not have a 4th column and 'Link' column is missing.")
         return df.iloc[:, 3].astype(str).str.strip()  # 0-based index: 3 = fourth column
 
-def remove_after_pipe(text: str) -> str:
-    """
-    Removes everything after the first '|' in the given text.
-    If '|' is not found, returns the original text.
-    """
-    if not isinstance(text, str):
-        raise TypeError("Input must be a string")
-    
-    # Split at the first '|' and take the part before it
-    remove_pipe = text.split('|', 1)[0].strip()
-
-    match = re.search(r'(Barangay|BRGY|Brgy.|BRGY.|Barangays|BGY|Building|Brgys.|Barnagy|Subdivision,\
-                      |Subdivision|Mansions,|Mansion|Executive,|Subdivision,)\s.*$', remove_pipe, flags=re.IGNORECASE)
-
-    if match:
-        result = match.group(0).strip()
-        return result
-        #print("Extracted:", result)
-    else:
-        return print("No match found")
-
-def extract_lot_description(driver: webdriver.Chrome) -> str:
+def extract_lot_description(driver: "webdriver.Chrome") -> str:
     """
     Extracts lot description from the page, typically from an <h1> or a known container.
     Returns 'Vacant Lot', 'House and Lot', or '(unknown)'.
     """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     try:
         WebDriverWait(driver, 5).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "div.txt-container-2 h1"))
         )
         h1 = driver.find_element(By.CSS_SELECTOR, "div.txt-container-2 h1")
-        text = h1.text.strip().lower()
-        if "vacant lot" in text:
-            return "Vacant Lot"
-        elif "townhouse" in text:
-            return "Town House"
-        elif "condominium" in text:
-            return "Condominium"
-        elif "house and lot" in text:
-            return "House and Lot"
+        return classify_lot_description(h1.text)
     except Exception:
         pass
     return "(unknown)"
 
-def main():
+def fetch_detail(driver: "webdriver.Chrome", url: str) -> Tuple[Optional[str], str]:
+    """
+    Load one detail page and return (cleaned title, lot description).
+    """
+    with run_metrics.timer("browser_page_load"):
+        driver.get(url)
+    run_metrics.sleep(1.5)
+
+    title = extract_title_with_selenium(driver)
+    cleaned_title = clean_title(title)
+    lot_type = extract_lot_description(driver)
+    return cleaned_title, lot_type
+
+def extract_titles_and_lot_descriptions(
+    df: pd.DataFrame,
+    concurrency: Optional[int] = None,
+    requests_per_second: Optional[float] = None,
+    engine: Optional[str] = None,
+    checkpoint: Optional[Checkpoint] = None
+) -> pd.DataFrame:
+    """
+    Visit every Link in df and return a copy with 'Title' and 'Lot Description' added.
+    Pages are fetched by a pool of `concurrency` workers that share a per-host
+    token bucket, so the site never sees more than `requests_per_second`.
+    With engine="http" each page is first fetched over a keep-alive session and parsed
+    as static HTML; a (reusable, per-worker) Chrome driver is only started for pages
+    whose static HTML lacks the title or lot description.
+    Output rows keep their original order.
+    A page the browser still cannot load after MAX_RETRIES retries gets (None, None)
+    and is counted as a detail_page_failure; the other pages are unaffected.
+    If checkpoint is given, links it already holds are not visited again and every
+    new result is recorded in it as soon as it is available (failures are not, so a
+    rerun tries them again).
+    Unset concurrency/rate/engine use the module settings, read at call time.
+    """
+    concurrency = concurrency or CONCURRENCY
+    requests_per_second = requests_per_second or REQUESTS_PER_SECOND
+    engine = engine or ENGINE
+    if engine not in ("http", "selenium"):
+        raise ValueError(f"Unknown engine: {engine!r}. Use 'http' or 'selenium'.")
+
+    df_out = df.copy()
+    if df_out.empty:
+        df_out["Title"] = pd.Series(dtype=object)
+        df_out["Lot Description"] = pd.Series(dtype=object)
+        return df_out
+
+    links = df_out["Link"].tolist()
+    done = checkpoint.load() if checkpoint else {}
+    todo = [(i, url) for i, url in enumerate(links, 1) if url not in done]
+    if done:
+        print(f"Checkpoint: {len(links) - len(todo)} of {len(links)} detail pages already fetched")
+        run_metrics.count("detail_pages_from_checkpoint", len(links) - len(todo))
+
+    limiter = HostRateLimiter(requests_per_second, capacity=concurrency)
+    local = threading.local()
+    drivers = []
+    drivers_lock = threading.Lock()
+    total = len(df_out)
+    session = make_session(pool_size=concurrency) if engine == "http" and todo else None
+
+    def get_driver() -> "webdriver.Chrome":
+        # One driver per worker thread, reused for every page that worker visits
+        driver = getattr(local, "driver", None)
+        if driver is None:
+            driver = make_driver(headless=True, proxy=None)
+            local.driver = driver
+            with drivers_lock:
+                drivers.append(driver)
+        return driver
+
+    def drop_driver():
+        # A driver that raised may be dead; the next attempt starts a new one
+        driver = getattr(local, "driver", None)
+        local.driver = None
+        if driver is not None:
+            with drivers_lock:
+                drivers.remove(driver)
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def render(url: str) -> Optional[Tuple[Optional[str], str]]:
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                with run_metrics.timer("detail_browser"):
+                    return fetch_detail(get_driver(), url)
+            except Exception as exc:    # WebDriverException, driver start-up, ...
+                run_metrics.count("detail_page_errors")
+                print(f"{url}: {type(exc).__name__}: {exc}")
+                drop_driver()
+                if attempt < MAX_RETRIES:
+                    limiter.acquire(url)
+                    run_metrics.sleep(DELAY_SECONDS + attempt * 0.5)
+        run_metrics.count("detail_page_failures")
+        return None
+
+    def visit(item):
+        i, url = item
+        limiter.acquire(url)
+        print(f"[{i}/{total}] {url}")
+        run_metrics.count("detail_pages_fetched")
+        if session is not None:
+            with run_metrics.timer("detail_http"):
+                title, lot_type = fetch_detail_html(session, url)
+            if title and lot_type:
+                return clean_title(title), lot_type
+            # Static HTML is missing a field: render it
+            limiter.acquire(url)
+        run_metrics.count("detail_pages_rendered")
+        return render(url)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(todo)))) as pool:
+            # map() yields in submission order
+            for (_, url), result in zip(todo, pool.map(visit, todo)):
+                if result is None:
+                    done[url] = (None, None)
+                    continue
+                done[url] = result
+                if checkpoint:
+                    checkpoint.put(url, result)
+    finally:
+        for driver in drivers:
+            driver.quit()
+        if session is not None:
+            session.close()
+        if checkpoint:
+            checkpoint.flush()
+
+    df_out["Title"] = [done[url][0] for url in links]
+    df_out["Lot Description"] = [done[url][1] for url in links]
+    return df_out
+
+def main(input_csv: str = INPUT_CSV, output_csv: str = OUTPUT_CSV):
     # 1) Read CSV
-    df = pd.read_csv(INPUT_CSV)
+    df = read_stage("clean", input_csv)
     links = read_links_column(df)
     links = links.dropna()
     # Optional: de-duplicate by link
@@ -175,37 +279,18 @@ def main():
     df = df.loc[mask_valid].copy()
     df["Link"] = links.loc[mask_valid].values
 
-    # 2) Selenium driver
-    driver = make_driver(headless=True, proxy=None)
-    titles = []
-    lot_descriptions = []
-
+    # 2) Visit detail pages (a rerun after a crash picks up where this one stopped)
+    checkpoint = Checkpoint("enrich")
     try:
-     for i, url in enumerate(df["Link"], 1):
-        print(f"[{i}/{len(df)}] {url}")
-        driver.get(url)
-        time.sleep(1.5)
-
-        title = extract_title_with_selenium(driver)
-        cleaned_title = remove_after_pipe(title)
-        titles.append(cleaned_title)
-
-        lot_type = extract_lot_description(driver)
-        lot_descriptions.append(lot_type)
+        df_out = extract_titles_and_lot_descriptions(df, checkpoint=checkpoint)
 
-        time.sleep(DELAY_SECONDS)
+        # 3) Save output with original columns + Title and its parsed address fields
+        df_out = add_address_fields(df_out)
+        write_stage(df_out, "titles", output_csv)
+        print(f"Saved {output_csv} with {len(df_out)} rows.")
+        checkpoint.clear()
     finally:
-     driver.quit()
-
-
-    # 4) Save output with original columns + Title
-    df_out = df.copy()
-    # result = remove_after_pipe(sample)
-    df_out["Title"] = titles
-    df_out["Lot Description"]  = lot_descriptions
-
-    df_out.to_csv(OUTPUT_CSV, index=False, encoding="utf-8-sig")
-    print(f"Saved {OUTPUT_CSV} with {len(df_out)} rows.")
+        checkpoint.close()
 
 if __name__ == "__main__":
     main()
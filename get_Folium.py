@@ -1,58 +1,201 @@
-import pandas as pd, os, numpy as np
-import folium
+import pandas as pd, os, json, numpy as np
+from typing import TYPE_CHECKING
+from stage_io import read_stage
+
+# folium is imported by build_map itself, so importing this module stays cheap
+if TYPE_CHECKING:
+    import folium
 ROOT = r"D:\Desktop\Python\Web_Scraping"
 PATH = "UnionBank_Listing_Automation"
 FILENAME = "listings_geocoded.csv"
 FILE_PATH = os.path.join(ROOT, PATH, FILENAME)
-def main():
+OUTPUT_HTML = "index.html"
+OUTPUT_GEOJSON = "listings.geojson"   # side file for MAP_MODE = "geojson", next to index.html
+
+# "markers": one folium.Marker per listing (fine for a few hundred)
+# "cluster": same markers grouped in a MarkerCluster
+# "fast":    FastMarkerCluster — markers are built in the browser from one JSON array
+# "geojson": listings live in OUTPUT_GEOJSON; the page fetches it after load, draws canvas
+#            points and builds each popup (and loads its image) only when it is opened
+MAP_MODE = "cluster"
+MAP_MODES = ("markers", "cluster", "fast", "geojson")
+# True: popups show the images stage's local thumbnails (thumbnails/..., relative to
+# index.html). Off by default because thumbnails/ is gitignored and the Pages workflow
+# publishes the repository as-is, so the deployed page would point at missing files;
+# only turn it on where the thumbnails are served next to index.html.
+MAP_THUMBNAILS = False
+
+# Builds the same home icon + popup as folium.Marker, client-side, for MAP_MODE = "fast"
+FAST_MARKER_CALLBACK = """
+function (row) {
+    var icon = L.AwesomeMarkers.icon({icon: 'home', markerColor: 'darkblue', prefix: 'glyphicon'});
+    var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: icon});
+    marker.bindPopup(row[2], {maxWidth: 260});
+    marker.bindTooltip('Click for photo');
+    return marker;
+};
+"""
 
- df = pd.read_csv(FILE_PATH)
+# Loaded into the page for MAP_MODE = "geojson"; {map} and {url} are filled in by build_map
+GEOJSON_LOADER = """
+function buildListingPopup(p) {
+    var div = document.createElement("div");
+    div.style.width = "240px";
+    function add(tag, text, style) {
+        var el = document.createElement(tag);
+        el.textContent = text;
+        el.style.cssText = style || "margin:0";
+        div.appendChild(el);
+        return el;
+    }
+    add("h4", p.title || "");
+    add("h5", p.lot_description || "");
+    var price = p.price == null ? "" : "\u20b1" + Math.round(p.price).toLocaleString("en-US");
+    add("p", price + " \u2014 " + (p.lot == null ? "" : p.lot) + " sqm");
+    if (p.image) {
+        var img = document.createElement("img");
+        img.src = p.image;
+        img.width = 220;
+        img.style.marginTop = "5px";
+        div.appendChild(img);
+    }
+    var a = document.createElement("a");
+    a.href = p.link;
+    a.target = "_blank";
+    a.textContent = "View Listing";
+    add("h5", "", "margin-top:10px").appendChild(a);
+    return div;
+}
+fetch("{url}").then(function (r) { return r.json(); }).then(function (data) {
+    var renderer = L.canvas({padding: 0.5});
+    L.geoJSON(data, {
+        pointToLayer: function (feature, latlng) {
+            return L.circleMarker(latlng, {renderer: renderer, radius: 6, color: "#00008b",
+                                           weight: 1, fillOpacity: 0.8});
+        },
+        onEachFeature: function (feature, layer) {
+            layer.bindTooltip("Click for photo");
+            layer.bindPopup(function () { return buildListingPopup(feature.properties); },
+                            {maxWidth: 260});
+        }
+    }).addTo({map});
+});
+"""
 
- m = folium.Map(location=[14.583, 121.063], zoom_start=13, tiles="OpenStreetMap")
+def _json_value(value):
+    # NaN / pandas.NA -> null; numpy scalars -> plain Python
+    if pd.isna(value):
+        return None
+    return value.item() if isinstance(value, np.generic) else value
 
+def _image_column(df: pd.DataFrame) -> str:
+    # Local thumbnails when main() added them (MAP_THUMBNAILS), else the hot-linked originals
+    return "Thumbnail" if "Thumbnail" in df.columns else "Image_Link"
 
- for _, row in df.iterrows():
-      # Skip rows where lat or long is NaN
-      if pd.isna(row["lat"]) or pd.isna(row["long"]):
-          continue
+def write_geojson(df: pd.DataFrame, path: str = OUTPUT_GEOJSON) -> int:
+    """
+    Write the geocoded listings as a compact GeoJSON FeatureCollection
+    (rows without lat/long are skipped). Returns the number of features.
+    """
+    df = df[df["lat"].notna() & df["long"].notna()]
+    properties = {
+        "title": "Title", "lot_description": "Lot Description", "price": "Price",
+        "lot": "Lot", "image": _image_column(df), "link": "Link",
+    }
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [round(lon, 6), round(lat, 6)]},
+            "properties": {key: _json_value(value) for key, value in zip(properties, values)},
+        }
+        for lat, lon, *values in zip(
+            df["lat"].astype(float), df["long"].astype(float),
+            *(df[col] for col in properties.values())
+        )
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f,
+                  ensure_ascii=False, separators=(",", ":"))
+    return len(features)
 
-      popup_html = f"""
-<<<<<<< HEAD:Testing.py
+def build_popups(df: pd.DataFrame) -> list:
+    """
+    Popup HTML for every row, built in one pass over the needed columns.
+    """
+    return [
+        f"""
         <div style="width:240px">
-            <h4 style="margin:0">{row['Title']}</h4>
-            <h5 style="margin:0">{row['Lot Description']}</h5>
-            <p style="margin:0">₱{row['Price']:,.0f} — {row['Lot']} sqm</p>
-            <img src="{row['Image_Link']}" width="220" style="margin-top:5px"/>
+            <h4 style="margin:0">{title}</h4>
+            <h5 style="margin:0">{lot_description}</h5>
+            <p style="margin:0">₱{price:,.0f} — {lot} sqm</p>
+            <img src="{image_link}" width="220" style="margin-top:5px"/>
             <h5 style="margin-top:10px">
-                <a href="{row['Link']}" target="_blank">View Listing</a>
+                <a href="{link}" target="_blank">View Listing</a>
             </h5>
         </div>
         """
+        for title, lot_description, price, lot, image_link, link in zip(
+            df["Title"], df["Lot Description"], df["Price"].astype(float), df["Lot"],
+            df[_image_column(df)], df["Link"]
+        )
+    ]
+
+def build_map(df: pd.DataFrame, mode: str = MAP_MODE,
+              geojson_url: str = OUTPUT_GEOJSON) -> "folium.Map":
+    """
+    Build the listings map in memory; the caller saves it once.
+    Rows without lat/long are skipped. In "geojson" mode the page only
+    references geojson_url, which must be written with write_geojson.
+    """
+    if mode not in MAP_MODES:
+        raise ValueError(f"Unknown map mode: {mode!r}. Use one of {', '.join(MAP_MODES)}.")
+    import folium
+    from folium.plugins import MarkerCluster, FastMarkerCluster
+
+    m = folium.Map(location=[14.583, 121.063], zoom_start=13, tiles="OpenStreetMap")
+
+    if mode == "geojson":
+        # No listing data in the page itself: it is fetched from the side file
+        loader = GEOJSON_LOADER.replace("{map}", m.get_name()).replace("{url}", geojson_url)
+        m.get_root().script.add_child(folium.Element(loader))
+        return m
+
+    df = df[df["lat"].notna() & df["long"].notna()]
+    popups = build_popups(df)
+    coords = df[["lat", "long"]].to_numpy(dtype=float)
+
+    if mode == "fast":
+        data = [[lat, lon, popup] for (lat, lon), popup in zip(coords.tolist(), popups)]
+        FastMarkerCluster(data, callback=FAST_MARKER_CALLBACK).add_to(m)
+        return m
+
+    layer = MarkerCluster().add_to(m) if mode == "cluster" else m
+    for (lat, lon), popup_html in zip(coords.tolist(), popups):
+        folium.Marker(
+            location=[lat, lon],
+            popup=folium.Popup(popup_html, max_width=260),
+            tooltip="Click for photo",
+            icon=folium.Icon(color="darkblue", icon="home")
+        ).add_to(layer)
+    return m
+
+def main(mode: str = MAP_MODE, thumbnails: bool = MAP_THUMBNAILS):
+ df = read_stage("geocoded", FILE_PATH)
+ if thumbnails:
+     from image_cache import thumbnails_for
+     # Popups show the cached thumbnails (paths relative to index.html); listings the
+     # images stage has not cached yet keep their original Image_Link
+     df["Thumbnail"] = thumbnails_for(df["Image_Link"])
+
+ if mode == "geojson":
+     n = write_geojson(df, OUTPUT_GEOJSON)
+     print(f"Saved {OUTPUT_GEOJSON} with {n} listings")
+
+ # The side file sits next to the page, so reference it by name
+ m = build_map(df, mode=mode, geojson_url=os.path.basename(OUTPUT_GEOJSON))
+ m.save(OUTPUT_HTML)
 
-=======
-      <div style="width:240px">
-        <h4 style="margin:0">{row['Title']}</h4>
-        <h5 style="margin:0">{row['Lot Description']}</h5>
-        <p style="margin:0">₱{row['Price']:,.0f} — {row['Lot']} sqm</p>
-        <img src="{row['Image_Link']}" width="220" style="margin-top:5px"/>
-        <p style="margin:0">
-        <a href="{row['Link']}"">View Listing</a>
-        </p>
-      </div>
-      """
->>>>>>> ThirdImprovement:get_Folium.py
-
-      folium.Marker(
-          location=[row["lat"], row["long"]],
-          popup=folium.Popup(popup_html, max_width=260),
-          tooltip="Click for photo",
-          icon=folium.Icon(color="darkblue", icon="home")
-      ).add_to(m)
-      m.save("index.html")
-
-
-
-print("Saved map_markers.html (tip: serve via `python -m http.server 8000` and open http://localhost:8000/map_markers.html)")
+ print(f"Saved {OUTPUT_HTML} (tip: serve via `python -m http.server 8000` and open http://localhost:8000/{OUTPUT_HTML})")
 
 if __name__ == "__main__":
     main()
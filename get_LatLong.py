@@ -1,23 +1,35 @@
 
 # geocode_csv_5th_column_nulls.py
 import pandas as pd
-import time
-from typing import Optional, Dict
-from geopy.geocoders import Nominatim
-from geopy.extra.rate_limiter import RateLimiter
+from typing import TYPE_CHECKING, Optional, Dict
+from geocode_cache import GeocodeCache
+import run_metrics
+from query_normalize import canonical_keys
+from stage_io import read_stage, write_stage
+from gazetteer import Gazetteer, Match, LEVELS
+
+# geopy / aiohttp are imported by the upstream branch that uses them
+if TYPE_CHECKING:
+    from geocode_async import NominatimProvider
 
 # ---- Settings ----
 INPUT_CSV = "titles.csv"         # <-- change to your source CSV path
 OUTPUT_CSV = "listings_geocoded.csv"
 MIN_DELAY_SECONDS = 1.0            # Nominatim policy: 1 request/second
 MAX_RETRIES = 2                    # retry on transient errors
+OFFLINE_MIN_LEVEL = "barangay"     # gazetteer matches at this level or finer skip Nominatim;
+                                   # coarser ones (town-centre / province centroids) are only
+                                   # used when Nominatim cannot place the listing. The bundled
+                                   # ph_gazetteer.csv has no barangay rows, so it is fallback-only
+OFFLINE_ONLY = False               # True: never call Nominatim (no network needed)
+PROVIDER = "nominatim"             # geocode_async provider: "nominatim", "self_hosted", "mock"
 
 def read_5th_column_as_address(filepath: str) -> pd.DataFrame:
     """
     Read the CSV and create a normalized 'address' column sourced from the 6th column
     (column POSITION, 0-based index 5), regardless of its header name.
     """
-    df = pd.read_csv(filepath)
+    df = read_stage("titles", filepath)
     if df.shape[1] < 6:
         raise ValueError("CSV must have at least 6 columns to use the 6th column as address.")
 
@@ -29,86 +41,196 @@ def read_5th_column_as_address(filepath: str) -> pd.DataFrame:
     # Keep all rows (even if address is empty); we'll mark failed geocodes as NULL
     return df#, fifth_col_name
 
+def geocode_one_with_retries(rate_geocode, query: str,
+                             min_delay_seconds: float, max_retries: int):
+    """
+    Synchronous geopy lookup. Returns (answered, location); answered is False
+    when every attempt raised.
+    """
+    attempt = 0
+    while attempt <= max_retries:
+        try:
+            with run_metrics.timer("geocode_call"):
+                result = rate_geocode(query, addressdetails=False)
+            if result:
+                return True, (result.latitude, result.longitude)
+            return True, None
+        except Exception:
+            attempt += 1
+            run_metrics.count("geocode_errors")
+            run_metrics.sleep(min_delay_seconds + attempt * 0.5)  # backoff
+    return False, None
+
+def placement_summary(levels: pd.Series) -> str:
+    """'nominatim 27, province 3, unplaced 0' for a geocode_level column."""
+    placed = levels.astype("string").value_counts()
+    placed["unplaced"] = int(levels.isna().sum())
+    return ", ".join(f"{level} {n}" for level, n in placed.items())
+
 def geocode_addresses_no_hint_with_nulls(
     df: pd.DataFrame,
     min_delay_seconds: float = 1.0,
-    max_retries: int = 2    
+    max_retries: int = 2,
+    persistent_cache: Optional[GeocodeCache] = None,
+    gazetteer: Optional[Gazetteer] = None,
+    offline_min_level: str = OFFLINE_MIN_LEVEL,
+    offline_only: bool = OFFLINE_ONLY,
+    provider: Optional["NominatimProvider"] = None
 ) -> pd.DataFrame:
     """
     Geocode df['address'] → df['lat'], df['long'] using Nominatim.
     Does NOT append any country hint. Respects usage policy via RateLimiter.
     Returns NULL (as pandas.NA) for lat/long when geocoding fails.
+    If persistent_cache is given, it is consulted before Nominatim and updated with
+    every answer (found or not found); transient errors are never persisted.
+    If gazetteer is given, titles it resolves at `offline_min_level` or finer
+    (barangay > city > province) are answered locally; coarser local matches are
+    only used when Nominatim cannot resolve the title.
+    If provider is given, the remaining queries go through the asyncio engine
+    (geocode_async) with that provider's rate limit and concurrency instead of geopy.
+    df['geocode_level'] records how each row was placed: the gazetteer level
+    (barangay / city / province) or "nominatim" (upstream answer or cached one).
     """
-    geolocator = Nominatim(user_agent="my_Geocoder_App-Erson", timeout=10)
-    rate_geocode = RateLimiter(
-        geolocator.geocode,
-        min_delay_seconds=min_delay_seconds,
-        swallow_exceptions=False
-    )
-
-    cache: Dict[str, Optional[tuple]] = {}
-    lats, longs = [], []
-
-    for i, raw in enumerate(df["Title"].astype(str)):
-        query = raw.strip()  # no country hint
-
-        # Cache repeated addresses to save requests
-        if query in cache:
-            loc = cache[query]
-        else:
-            loc = None
-            attempt = 0
-            while attempt <= max_retries:
-                try:
-                    result = rate_geocode(query, addressdetails=False)
-                    if result:
-                        loc = (result.latitude, result.longitude)
-                    else:
-                        loc = None
-                    break
-                except Exception:
-                    attempt += 1
-                    time.sleep(min_delay_seconds + attempt * 0.5)  # backoff
-            cache[query] = loc
-
-        if loc is not None:
-            lat, lon = loc
-            lats.append(lat)
-            longs.append(lon)
+    # Group rows by canonical query so spelling variants of the same place
+    # cost a single upstream call; the first raw title of each group is sent.
+    raw_queries = df["Title"].astype(str).str.strip()  # no country hint
+    # The cache is keyed by the same canonical title, and subdivision/phase names stay in
+    # the query, where they can pin a listing more precisely than its barangay.
+    keys = canonical_keys(raw_queries)
+    representatives = raw_queries.groupby(keys, sort=False).first()
+    hint_column = "Province" if "Province" in df.columns else "Address"
+    province_hints = (df[hint_column].astype(object).groupby(keys, sort=False).first()
+                      if hint_column in df.columns else pd.Series(dtype=object))
+
+    locations: Dict[str, Optional[tuple]] = {}
+    levels: Dict[str, str] = {}
+    fallbacks: Dict[str, Match] = {}
+    pending = []   # (key, query) still needing an upstream answer
+    resolved_by_level = {level: 0 for level in LEVELS}
+    finest = gazetteer.finest_level if gazetteer else None
+    if gazetteer and not offline_only and LEVELS.get(finest, 0) < LEVELS[offline_min_level]:
+        print(f"Gazetteer has no {offline_min_level}-level rows (finest: {finest}); "
+              "using it only as a fallback when Nominatim cannot place a listing")
+
+    # 1) Offline gazetteer, then the persistent cache
+    for key, query in representatives.items():
+        hint = province_hints.get(key)
+        offline = gazetteer.resolve(query, hint if isinstance(hint, str) else None) if gazetteer else None
+        if offline is not None and (offline_only or LEVELS[offline.level] >= LEVELS[offline_min_level]):
+            resolved_by_level[offline.level] += 1
+            locations[key] = (offline.lat, offline.long)
+            levels[key] = offline.level
+            run_metrics.count("geocode_gazetteer_hits")
+            continue
+        if offline is not None:
+            fallbacks[key] = offline
+        if offline_only:
+            locations[key] = None
+            continue
+
+        cached, loc = persistent_cache.get(query) if persistent_cache else (False, None)
+        if cached:
+            locations[key] = loc
+            run_metrics.count("geocode_cache_hits")
         else:
-            # Use pandas.NA; will be written as "NULL" in CSV
-            lats.append(pd.NA)
-            longs.append(pd.NA)
-
-        # Progress log every 10 rows
-        if (i + 1) % 10 == 0:
-            print(f"Geocoded {i+1}/{len(df)} addresses…")
-
-    # Assign (do NOT drop rows)
-    df["lat"] = lats
-    df["long"] = longs  # requested naming
+            pending.append((key, query))
+            run_metrics.count("geocode_cache_misses" if persistent_cache else "geocode_uncached")
+
+    # 2) Upstream geocoder for whatever is left. Each answer is written to the
+    # persistent cache as soon as it arrives, so a crashed run never pays for it twice.
+    queries = [query for _, query in pending]
+
+    def record(i: int, answered: bool, loc):
+        run_metrics.count("geocode_calls")
+        if not answered:
+            run_metrics.count("geocode_failures")
+        elif loc is None:
+            run_metrics.count("geocode_not_found")
+        if answered and persistent_cache:
+            persistent_cache.put(queries[i], loc)
+
+    if provider is not None:
+        from geocode_async import geocode_queries
+        answers = geocode_queries(queries, provider, max_retries=max_retries,
+                                  retry_delay=min_delay_seconds, on_result=record)
+    else:
+        answers = []
+        if queries:
+            from geopy.geocoders import Nominatim
+            from geopy.extra.rate_limiter import RateLimiter
+            geolocator = Nominatim(user_agent="my_Geocoder_App-Erson", timeout=10)
+            rate_geocode = RateLimiter(
+                geolocator.geocode,
+                min_delay_seconds=min_delay_seconds,
+                swallow_exceptions=False
+            )
+        for i, query in enumerate(queries):
+            answers.append(geocode_one_with_retries(rate_geocode, query, min_delay_seconds, max_retries))
+            record(i, *answers[-1])
+            # Progress log every 10 upstream queries
+            if (i + 1) % 10 == 0:
+                print(f"Geocoded {i+1}/{len(queries)} unique addresses…")
+
+    for (key, _), (_, loc) in zip(pending, answers):
+        locations[key] = loc
+    for key, loc in locations.items():
+        if loc is not None and key not in levels:
+            levels[key] = "nominatim"
+    upstream_calls = len(pending)
+
+    # 3) Nominatim could not place it: a coarse local point beats no pin at all
+    for key, offline in fallbacks.items():
+        if locations.get(key) is None:
+            resolved_by_level[offline.level] += 1
+            locations[key] = (offline.lat, offline.long)
+            levels[key] = offline.level
+            run_metrics.count("geocode_gazetteer_fallbacks")
+
+    saved = len(df) - len(representatives)
+    print(f"Geocode dedup: {len(df)} rows, {raw_queries.nunique()} distinct titles, "
+          f"{len(representatives)} canonical queries ({saved} upstream calls saved; "
+          f"{upstream_calls} actually sent)")
+    if gazetteer:
+        print("Gazetteer: " + ", ".join(f"{n} by {level}" for level, n in resolved_by_level.items()))
+
+    df["geocode_level"] = keys.map(levels).astype("string")
+    print(f"Listings placed at: {placement_summary(df['geocode_level'])}")
+
+    # Fan results back out to every row (do NOT drop rows); failures stay NULL (pandas.NA)
+    found = {k: v for k, v in locations.items() if v is not None}
+    df["lat"] = keys.map({k: v[0] for k, v in found.items()}).astype("Float64")
+    df["long"] = keys.map({k: v[1] for k, v in found.items()}).astype("Float64")  # requested naming
 
     # Optional safety: clip only non-null values
-    df.loc[df["lat"].notna(), "lat"] = df.loc[df["lat"].notna(), "lat"].astype(float).clip(-90, 90)
-    df.loc[df["long"].notna(), "long"] = df.loc[df["long"].notna(), "long"].astype(float).clip(-180, 180)
+    df["lat"] = df["lat"].clip(-90, 90)
+    df["long"] = df["long"].clip(-180, 180)
 
     return df
 
 def main():
+    from geocode_async import get_provider
+
     df_src= read_5th_column_as_address(INPUT_CSV)
     print(f"Loaded {len(df_src)} rows from {INPUT_CSV}." )
       
         #Using 5th column '{fifth}' as address input (no country hint).")
 
-    df_geo = geocode_addresses_no_hint_with_nulls(
-        df_src,
-        min_delay_seconds=MIN_DELAY_SECONDS,
-        max_retries=MAX_RETRIES
-    )
-
-    # Save output CSV: original columns + address + lat + long
-    # Represent missing values as literal "NULL" in the CSV
-    df_geo.to_csv(OUTPUT_CSV, index=False, encoding="utf-8-sig", na_rep="NULL")
+    geo_cache = GeocodeCache()
+    try:
+        df_geo = geocode_addresses_no_hint_with_nulls(
+            df_src,
+            min_delay_seconds=MIN_DELAY_SECONDS,
+            max_retries=MAX_RETRIES,
+            persistent_cache=geo_cache,
+            gazetteer=Gazetteer.load(),
+            provider=get_provider(PROVIDER)
+        )
+    finally:
+        print(geo_cache.report())
+        geo_cache.close()
+
+    # Save output: typed Parquet (lat/long stay nullable floats) + CSV view with "NULL"
+    write_stage(df_geo, "geocoded", OUTPUT_CSV)
     print(f"Saved geocoded CSV: {OUTPUT_CSV} ({len(df_geo)} rows; failures marked as NULL)")
 
 if __name__ == "__main__":
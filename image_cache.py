@@ -0,0 +1,206 @@
+# image_cache.py
+# Local thumbnails of the listing photos (Image_Link), so the map (with
+# get_Folium.MAP_THUMBNAILS, where thumbnails/ is served) and the workbooks do not
+# hot-link multi-MB screenshots from the bank's site.
+# Images are fetched concurrently over one pooled session, once per distinct URL, and
+# stored content-addressed (thumbnails/ab/<sha256 of the original>.webp): URLs serving
+# the same bytes share one thumbnail. Known URLs are revalidated with conditional GETs.
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, NamedTuple, Optional
+import pandas as pd
+import requests
+
+import run_metrics
+from detail_http import make_session, HTTP_TIMEOUT
+from rate_limit import HostRateLimiter
+
+# ---- Settings ----
+CACHE_PATH = "image_cache.db"
+THUMB_DIR = "thumbnails"
+THUMB_SIZE = (440, 330)             # fits the 220 px popup image at 2x
+THUMB_FORMAT = "webp"               # "webp" or "jpeg"
+THUMB_QUALITY = 75
+CONCURRENCY = 8                     # parallel downloads
+REQUESTS_PER_SECOND = 4.0           # shared per-host budget
+REVALIDATE_AFTER_SECONDS = 7 * 24 * 3600   # younger entries are used without asking the server
+THUMB_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    url           TEXT PRIMARY KEY,
+    content_hash  TEXT,             -- sha256 of the original bytes
+    thumb_path    TEXT,             -- relative to the working directory
+    etag          TEXT,
+    last_modified TEXT,
+    fetched_at    REAL NOT NULL
+)
+"""
+
+
+class Entry(NamedTuple):
+    url: str
+    content_hash: Optional[str]
+    thumb_path: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+def open_cache(path: str = CACHE_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA)
+    return conn
+
+
+def thumb_path(content_hash: str, thumb_dir: str = THUMB_DIR, fmt: str = THUMB_FORMAT) -> str:
+    """thumbnails/ab/abcdef....webp (forward slashes, so it works as a relative URL)."""
+    ext = "jpg" if fmt == "jpeg" else fmt
+    return f"{thumb_dir}/{content_hash[:2]}/{content_hash}.{ext}"
+
+
+def make_thumbnail(data: bytes, path: str, size=THUMB_SIZE, fmt: str = THUMB_FORMAT,
+                   quality: int = THUMB_QUALITY):
+    """Downscale an image (any format Pillow reads) into `path`, written atomically."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as img:
+        img.draft("RGB", size)          # JPEG: decode at reduced scale
+        img = img.convert("RGB")
+        img.thumbnail(size)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Workers that downloaded the same bytes may race here; each writes its own file
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        img.save(tmp, THUMB_FORMATS[fmt], quality=quality)
+    os.replace(tmp, path)
+
+
+def _usable(entry: Optional[Entry], fmt: str) -> bool:
+    # The entry's thumbnail exists in the requested format
+    return (entry is not None and entry.content_hash is not None
+            and entry.thumb_path == thumb_path(entry.content_hash, fmt=fmt)
+            and os.path.exists(entry.thumb_path))
+
+
+def _fetch(session: requests.Session, limiter: HostRateLimiter, url: str,
+           known: Optional[Entry], fmt: str) -> Optional[Entry]:
+    """
+    Download (or revalidate) one image and make sure its thumbnail exists.
+    Returns the updated entry, or None when the image could not be fetched.
+    """
+    headers = {}
+    if _usable(known, fmt):
+        if known.etag:
+            headers["If-None-Match"] = known.etag
+        if known.last_modified:
+            headers["If-Modified-Since"] = known.last_modified
+
+    limiter.acquire(url)
+    try:
+        with run_metrics.timer("image_fetch"):
+            response = session.get(url, headers=headers, timeout=HTTP_TIMEOUT)
+        if response.status_code == 304:
+            run_metrics.count("images_not_modified")
+            return known._replace(fetched_at=time.time())
+        response.raise_for_status()
+    except requests.RequestException:
+        run_metrics.count("image_errors")
+        return None
+
+    run_metrics.count("images_downloaded")
+    run_metrics.count("image_bytes_downloaded", len(response.content))
+    content_hash = hashlib.sha256(response.content).hexdigest()
+    path = thumb_path(content_hash, fmt=fmt)
+    if os.path.exists(path):
+        run_metrics.count("image_content_dedup_hits")
+    else:
+        try:
+            with run_metrics.timer("thumbnail_encode"):
+                make_thumbnail(response.content, path, fmt=fmt)
+        except Exception:       # not an image Pillow can read
+            run_metrics.count("image_errors")
+            return None
+    return Entry(url, content_hash, path, response.headers.get("ETag"),
+                 response.headers.get("Last-Modified"), time.time())
+
+
+def cache_images(conn: sqlite3.Connection, urls,
+                 concurrency: Optional[int] = None,
+                 requests_per_second: Optional[float] = None,
+                 revalidate_after: Optional[float] = None,
+                 fmt: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """
+    Make sure every distinct URL in `urls` has a local thumbnail.
+    Entries younger than revalidate_after seconds are used as-is; older ones are
+    revalidated (ETag / Last-Modified), new ones downloaded. A failed fetch keeps the
+    previous thumbnail. Returns url -> thumbnail path (None when there is none).
+    Unset limits use the module settings, read at call time.
+    """
+    concurrency = concurrency or CONCURRENCY
+    requests_per_second = requests_per_second or REQUESTS_PER_SECOND
+    revalidate_after = REVALIDATE_AFTER_SECONDS if revalidate_after is None else revalidate_after
+    fmt = fmt or THUMB_FORMAT
+    if fmt not in THUMB_FORMATS:
+        raise ValueError(f"Unknown thumbnail format: {fmt!r}. Use one of {', '.join(THUMB_FORMATS)}.")
+
+    distinct = pd.Series(urls, dtype=object).dropna().astype(str).str.strip()
+    distinct = [u for u in distinct.drop_duplicates() if u.startswith("http")]
+    known = load_entries(conn, distinct)
+    now = time.time()
+    todo = [u for u in distinct
+            if not _usable(known.get(u), fmt) or now - known[u].fetched_at > revalidate_after]
+    run_metrics.count("images_fresh_in_cache", len(distinct) - len(todo))
+
+    session = make_session(pool_size=concurrency) if todo else None
+    limiter = HostRateLimiter(requests_per_second, capacity=concurrency)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(todo)))) as pool:
+            fetched = pool.map(lambda u: _fetch(session, limiter, u, known.get(u), fmt), todo)
+            # SQLite writes stay on this thread
+            updates = [entry for entry in fetched if entry is not None]
+    finally:
+        if session is not None:
+            session.close()
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?)", updates)
+    for entry in updates:
+        known[entry.url] = entry
+    return {u: known[u].thumb_path if u in known else None for u in distinct}
+
+
+def load_entries(conn: sqlite3.Connection, urls) -> Dict[str, Entry]:
+    """Cached entries of the given URLs."""
+    urls = list(urls)
+    entries = {}
+    for start in range(0, len(urls), 500):          # SQLite host-parameter limit
+        chunk = urls[start:start + 500]
+        rows = conn.execute(
+            f"SELECT * FROM images WHERE url IN ({', '.join('?' * len(chunk))})", chunk
+        ).fetchall()
+        entries.update((row[0], Entry(*row)) for row in rows)
+    return entries
+
+
+def thumbnails_for(urls: pd.Series, path: str = CACHE_PATH, fallback: bool = True) -> pd.Series:
+    """
+    Local thumbnail path for each URL in `urls` (aligned with it). URLs without a
+    thumbnail keep the original URL when fallback is set, else become NA. Reads the
+    cache only; nothing is downloaded.
+    """
+    mapping = {}
+    if os.path.exists(path):
+        conn = sqlite3.connect(path)
+        try:
+            entries = load_entries(conn, urls.dropna().astype(str).str.strip().unique())
+        finally:
+            conn.close()
+        mapping = {u: e.thumb_path for u, e in entries.items()
+                   if e.thumb_path and os.path.exists(e.thumb_path)}
+    stripped = urls.astype("string").str.strip()
+    thumbs = stripped.map(mapping).astype("string")
+    return thumbs.fillna(urls.astype("string")) if fallback else thumbs
@@ -0,0 +1,82 @@
+# listing_cards.py
+from typing import Dict, Iterator, Optional
+from urllib.parse import urljoin
+
+FIELDNAMES = ["Address", "Lot", "Price", "Image_Link", "Link"]
+
+LINK_XPATH = "descendant-or-self::a[contains(@href, 'foreclosed-properties')]"
+PRICE_XPATH = ".//p[contains(concat(' ', normalize-space(@class), ' '), ' price ')]"
+
+# A listing card is the innermost element that holds both a price and a detail link,
+# so every field below is read from the same card and can never drift out of alignment.
+CARD_XPATH = (
+    f"//*[{PRICE_XPATH} and {LINK_XPATH}]"
+    f"[not(descendant::*[{PRICE_XPATH} and {LINK_XPATH}])]"
+)
+
+
+def card_to_record(card) -> Dict[str, Optional[str]]:
+    """
+    Build one listing record (Address, Lot, Price, Image_Link, Link) from a card element.
+    Raises NoSuchElementException if the card is missing a required field.
+    """
+    from selenium.webdriver.common.by import By
+
+    link = card.find_element(By.XPATH, LINK_XPATH)
+    imgs = link.find_elements(By.TAG_NAME, "img") or card.find_elements(By.TAG_NAME, "img")
+    return {
+        "Address": card.find_element(By.CSS_SELECTOR, "p.city-arg").text,
+        "Lot": card.find_element(By.CSS_SELECTOR, "p.specs").text,
+        "Price": card.find_element(By.CSS_SELECTOR, "p.price").text,
+        "Image_Link": imgs[0].get_attribute("src") if imgs else None,
+        "Link": link.get_attribute("href"),
+    }
+
+
+def iter_listing_cards(driver) -> Iterator[Dict[str, Optional[str]]]:
+    """
+    Yield one record per listing card on the current page.
+    Cards without the full set of fields (e.g. banners, featured links) are skipped.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.common.exceptions import NoSuchElementException
+
+    for card in driver.find_elements(By.XPATH, CARD_XPATH):
+        try:
+            yield card_to_record(card)
+        except NoSuchElementException:
+            continue
+
+
+def _class_xpath(tag: str, cls: str) -> str:
+    return f".//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]"
+
+
+def _text(elements) -> Optional[str]:
+    # Match WebElement.text: visible text with whitespace collapsed
+    return " ".join(elements[0].text_content().split()) if elements else None
+
+
+def iter_listing_cards_html(html: str, base_url: str) -> Iterator[Dict[str, Optional[str]]]:
+    """
+    Same as iter_listing_cards, but for raw index-page HTML parsed with lxml.
+    Relative href/src values are resolved against base_url, as a browser would.
+    """
+    import lxml.html
+    doc = lxml.html.fromstring(html)
+    for card in doc.xpath(CARD_XPATH):
+        link = card.xpath(LINK_XPATH)
+        address = _text(card.xpath(_class_xpath("p", "city-arg")))
+        lot = _text(card.xpath(_class_xpath("p", "specs")))
+        price = _text(card.xpath(_class_xpath("p", "price")))
+        if not link or address is None or lot is None or price is None:
+            continue
+        imgs = link[0].xpath(".//img") or card.xpath(".//img")
+        src = imgs[0].get("src") if imgs else None
+        yield {
+            "Address": address,
+            "Lot": lot,
+            "Price": price,
+            "Image_Link": urljoin(base_url, src) if src else None,
+            "Link": urljoin(base_url, link[0].get("href")),
+        }
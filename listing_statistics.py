@@ -0,0 +1,616 @@
+
+import re
+import pandas as pd
+import numpy as np
+import os
+from typing import Optional, Dict, List, NamedTuple
+from stage_io import read_stage
+from excel_export import write_workbook
+from spatial_index import SpatialIndex, neighborhood_median
+
+# ---- Settings ----
+# ₱/sqm outliers: "iqr" (Q1 - 1.5·IQR .. Q3 + 1.5·IQR), "mad" (robust z-score above 3.5) or None
+OUTLIER_METHOD = "iqr"
+OUTLIER_GROUP = "address"   # bounds per value of this column (the province after cleaning); None = global
+MIN_GROUP_SIZE = 8          # smaller groups are judged against the global bounds
+IQR_K = 1.5
+MAD_K = 3.5
+# Neighbourhood ₱/sqm: median of the listings within this radius (geocoded data only)
+NEIGHBORHOOD_RADIUS_KM = 5.0
+MIN_NEIGHBORS = 3
+# Score weights; "neighborhood" (discount against nearby listings) is neutral without lat/long
+DEFAULT_WEIGHTS = {"value": 0.5, "size": 0.2, "location": 0.1, "neighborhood": 0.2}
+INPUT_CSV = "listings_geocoded.csv"     # geocoded stage (lat/long feed the neighbourhood feature)
+
+# ----------------------------
+# 1) Load data (Parquet/CSV/XLS/XLSX)
+# ----------------------------
+def load_data(filepath: str) -> pd.DataFrame:
+    fp = filepath.lower()
+    if fp.endswith(".parquet"):
+        df = pd.read_parquet(filepath)
+    elif fp.endswith(".xlsx"):
+        df = pd.read_excel(filepath, engine="openpyxl")
+    elif fp.endswith(".xls"):
+        df = pd.read_excel(filepath, engine="xlrd")
+    elif fp.endswith(".csv"):
+        df = pd.read_csv(filepath)
+    else:
+        raise ValueError("Unsupported file format. Please upload CSV or Excel.")
+    return df
+
+def load_warehouse(scrape_date: Optional[str] = None) -> pd.DataFrame:
+    """
+    One day's listings straight from the history warehouse (default: latest scrape).
+    """
+    import warehouse
+    conn = warehouse.open_warehouse()
+    try:
+        return warehouse.snapshot(conn, scrape_date)
+    finally:
+        conn.close()
+
+# ------------------------------------------
+# 2) Clean, standardize, derive base metrics
+# ------------------------------------------
+def prepare_data_with_address_lot_price(df: pd.DataFrame,
+                                        outlier_method: Optional[str] = OUTLIER_METHOD,
+                                        outlier_group: Optional[str] = OUTLIER_GROUP) -> pd.DataFrame:
+    # Standardize column names (set_axis returns a new frame; the caller's is untouched)
+    df = df.set_axis(
+        df.columns.str.strip()
+                  .str.lower()
+                  .str.replace(r"[\s\-]+", "_", regex=True),
+        axis=1
+    )
+
+    # Expected columns: address, lot, price
+    col_map = {}
+
+    # Flexible mapping: handle common variants
+    # Address
+    for c in df.columns:
+        if c in ["address", "location", "city", "area", "barangay", "district", "site_address"]:
+            col_map[c] = "address"
+            break
+    # Lot (sqm)
+    for c in df.columns:
+        if c in ["lot", "lot_area", "sqm", "square_meter", "square_meters", "floor_area", "area_sqm"]:
+            col_map[c] = "lot"
+            break
+    # Price
+    for c in df.columns:
+        if c in ["price", "total_price", "listing_price", "amount", "cost"]:
+            col_map[c] = "price"
+            break
+
+    df = df.rename(columns=col_map)
+
+    required = ["address", "lot", "price"]
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}. "
+                         "Please ensure your file has Address, Lot, and Price.")
+
+    # Coerce numeric BEFORE calculations (typed Parquet input is already numeric)
+    price = pd.to_numeric(df["price"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    lot = pd.to_numeric(df["lot"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+    # Basic cleaning (NaNs, zeros and infs) and price per sqm, as one mask
+    with np.errstate(divide="ignore", invalid="ignore"):
+        price_per_sqm = price / lot
+    keep = (np.isfinite(price) & np.isfinite(lot) & (price > 0) & (lot > 0)
+            & df["address"].notna().to_numpy())
+
+    # Trim extreme ₱/sqm outliers within each group (e.g. province), not across the country
+    if outlier_method and keep.any():
+        groups = df[outlier_group][keep] if outlier_group else None
+        lower, upper = outlier_bounds(pd.Series(price_per_sqm[keep]), groups, outlier_method)
+        keep[keep] = (price_per_sqm[keep] >= lower) & (price_per_sqm[keep] <= upper)
+
+    # The only row selection
+    df = df.loc[keep]
+    df["price"] = price[keep]
+    df["lot"] = lot[keep]
+    df["price_per_sqm"] = price_per_sqm[keep]
+
+    # Tidy address (stripped once per distinct value; returned as a categorical)
+    df["address"] = _map_distinct(df["address"], lambda s: s.astype(str).str.strip())
+
+    return df
+
+
+def _map_distinct(values: pd.Series, fn) -> pd.Series:
+    """
+    Apply a string transform to each distinct value only and fan the result back out
+    by code, so the cost follows the number of distinct values, not rows.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    new_codes, new_uniques = pd.factorize(fn(pd.Series(uniques)), use_na_sentinel=False)
+    return pd.Series(pd.Categorical.from_codes(new_codes[codes], new_uniques),
+                     index=values.index, name=values.name)
+
+
+def outlier_bounds(x: pd.Series, groups: Optional[pd.Series] = None,
+                   method: str = OUTLIER_METHOD):
+    """
+    Per-row (lower, upper) bounds for x, computed within each group in one
+    groupby().transform per statistic:
+      - "iqr": Q1 - IQR_K·IQR .. Q3 + IQR_K·IQR
+      - "mad": median ± MAD_K · 1.4826·MAD (robust z-score)
+    Groups smaller than MIN_GROUP_SIZE (and groups=None) use bounds over all of x.
+    """
+    if method not in ("iqr", "mad"):
+        raise ValueError(f"Unknown outlier method: {method!r}. Use 'iqr' or 'mad'.")
+    x = x.reset_index(drop=True)
+
+    def bounds(by):
+        if method == "iqr":
+            q1, q3 = _group_stat(x, by, "quantile", 0.25), _group_stat(x, by, "quantile", 0.75)
+            return q1 - IQR_K * (q3 - q1), q3 + IQR_K * (q3 - q1)
+        median = _group_stat(x, by, "median")
+        mad = 1.4826 * _group_stat((x - median).abs(), by, "median")
+        return median - MAD_K * mad, median + MAD_K * mad
+
+    lower, upper = bounds(None)
+    if groups is not None:
+        groups = groups.reset_index(drop=True)
+        big = (_group_stat(groups, groups, "size") >= MIN_GROUP_SIZE).to_numpy()
+        if big.any():
+            g_lower, g_upper = bounds(groups)
+            lower, upper = lower.where(~big, g_lower), upper.where(~big, g_upper)
+    return lower.to_numpy(), upper.to_numpy()
+
+
+def _group_stat(values: pd.Series, by: Optional[pd.Series], name: str, *args) -> pd.Series:
+    # The statistic of each row's group, broadcast back to the rows (by=None: one group)
+    if by is None:
+        return pd.Series(getattr(values, name)(*args), index=values.index)
+    return values.groupby(by, observed=True, sort=False).transform(name, *args)
+
+def add_neighborhood_median(df: pd.DataFrame, radius_km: float = NEIGHBORHOOD_RADIUS_KM,
+                            min_neighbors: int = MIN_NEIGHBORS,
+                            index: Optional[SpatialIndex] = None) -> pd.DataFrame:
+    """
+    Add neighborhood_price_per_sqm: the median ₱/sqm of the other listings within
+    radius_km (NaN without coordinates or with too few neighbours). Needs lat/long,
+    i.e. geocoded or warehouse data. Pass a prebuilt (or reloaded) index over the same
+    rows to skip building one.
+    """
+    index = index or SpatialIndex.from_frame(df, "lat", "long")
+    df = df.copy()
+    df["neighborhood_price_per_sqm"] = neighborhood_median(
+        index, df["price_per_sqm"].to_numpy(dtype=float), radius_km, min_neighbors
+    )
+    return df
+
+# -----------------------------------------------------
+# 3) Scoring + ranking (budget + location preferences)
+# -----------------------------------------------------
+def location_scores(address: pd.Series, location_prefs: Dict[str, float]) -> np.ndarray:
+    """
+    Bonus of the first preference (in dict order) whose key occurs in the address,
+    case-insensitively; 0.0 when none does. All keys are matched by one compiled
+    alternation, run once per distinct address rather than once per row per key.
+    """
+    codes, uniques = _address_codes(address)
+    presence, key_index = _key_presence(uniques, location_prefs)
+    return _location_bonus(presence, key_index, location_prefs)[codes]
+
+
+def location_text(df: pd.DataFrame) -> pd.Series:
+    """
+    What location preferences are matched against: the address (province), plus the
+    city and barangay parsed from the title when the data has them (see address_parser).
+    """
+    parts = [col for col in ("city", "barangay") if col in df.columns]
+    if not parts:
+        return df["address"]
+    text = df["address"].astype("string")
+    for col in parts:
+        text = text + ", " + df[col].astype("string").fillna("")
+    return text
+
+
+def _address_codes(address: pd.Series):
+    # Distinct lower-cased addresses + each row's position among them
+    lowered = _map_distinct(address, lambda s: s.astype(str).str.lower())
+    return lowered.cat.codes.to_numpy(), lowered.cat.categories
+
+
+def _key_presence(uniques, keys):
+    """
+    Which keys occur in which distinct address: a (addresses x keys) bool matrix
+    and each lower-cased key's column. One regex scan per address covers all keys.
+    """
+    keys = list(dict.fromkeys(str(k).lower() for k in keys))
+    key_index = {k: i for i, k in enumerate(keys)}
+    presence = np.zeros((len(uniques), len(keys)), dtype=bool)
+    if not keys:
+        return presence, key_index
+    # Longest keys first, so the lookahead reports the longest key starting at each
+    # position (overlapping matches included). Every other key starting there is a
+    # prefix of it, so each key also marks the keys that are its prefixes.
+    pattern = re.compile("(?=(" + "|".join(re.escape(k) for k in sorted(keys, key=len, reverse=True)) + "))")
+    prefixes = {k: [key_index[p] for p in keys if k.startswith(p)] for k in keys}
+    for row, address in enumerate(uniques):
+        for key in set(pattern.findall(address)):
+            presence[row, prefixes[key]] = True
+    return presence, key_index
+
+
+def _location_bonus(presence: np.ndarray, key_index: Dict[str, int],
+                    location_prefs: Dict[str, float]) -> np.ndarray:
+    # Per distinct address: bonus of the first key in dict order that is present
+    cols = presence[:, [key_index[str(k).lower()] for k in location_prefs]]
+    bonus = np.array([float(v) for v in location_prefs.values()])
+    return np.where(cols.any(axis=1), bonus[cols.argmax(axis=1)], 0.0)
+
+
+def neighborhood_scores(df: pd.DataFrame) -> np.ndarray:
+    """
+    How cheap each listing is against its neighbourhood, 0..1: 0.5 at the neighbourhood
+    median, 1.0 at half of it or less, 0.0 at 1.5x or more. Neutral (0.5) where there is
+    no neighbourhood_price_per_sqm (see add_neighborhood_median).
+    """
+    if "neighborhood_price_per_sqm" not in df.columns:
+        return np.full(len(df), 0.5)
+    ppsqm = df["price_per_sqm"].to_numpy(dtype=float, na_value=np.nan)
+    median = df["neighborhood_price_per_sqm"].to_numpy(dtype=float, na_value=np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        discount = 1 - ppsqm / median
+    return np.where(np.isfinite(discount), np.clip(discount, -0.5, 0.5) + 0.5, 0.5)
+
+
+def top_k_indices(score: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k highest scores, best first, without sorting the whole array.
+    Ties keep their original order (like a stable sort); NaN scores rank last.
+    k <= 0 selects nothing.
+    """
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    score = np.where(np.isnan(score), -np.inf, score)
+    if k < len(score):
+        # Everything tied with the k-th best is a candidate, so ties resolve by position
+        kth = np.partition(score, len(score) - k)[len(score) - k]
+        candidates = np.flatnonzero(score >= kth)
+    else:
+        candidates = np.arange(len(score))
+    order = np.argsort(-score[candidates], kind="stable")
+    return candidates[order[:k]]
+
+
+def rank_top_k(
+    df: pd.DataFrame,
+    k: int = 10,
+    budget: Optional[float] = None,
+    location_prefs: Optional[Dict[str, float]] = None,
+    weights: Optional[Dict[str, float]] = None
+) -> pd.DataFrame:
+    """
+    Score every listing in one NumPy pass and return the k best, highest first.
+    Only the k winning rows are copied into the result.
+    """
+    price = df["price"].to_numpy(dtype=float, na_value=np.nan)
+    ppsqm = df["price_per_sqm"].to_numpy(dtype=float, na_value=np.nan)
+    lot = df["lot"].to_numpy(dtype=float, na_value=np.nan)
+
+    # Budget filter
+    rows = np.flatnonzero(price <= budget) if budget is not None else np.arange(len(df))
+    if len(rows) == 0:
+        raise ValueError("No listings left after filtering. Adjust budget or check data.")
+    ppsqm, lot = ppsqm[rows], lot[rows]
+
+    weights = weights or DEFAULT_WEIGHTS
+
+    # Normalize price_per_sqm (lower better → higher score)
+    v_min, v_max = np.nanmin(ppsqm), np.nanmax(ppsqm)
+    value_score = np.ones(len(rows)) if v_max == v_min else 1 - (ppsqm - v_min) / (v_max - v_min)
+
+    # Normalize lot size (higher better)
+    s_min, s_max = np.nanmin(lot), np.nanmax(lot)
+    size_score = np.ones(len(rows)) if s_max == s_min else (lot - s_min) / (s_max - s_min)
+
+    # Location preference (match by address string contains key)
+    if location_prefs:
+        location_score = location_scores(location_text(df.iloc[rows]), location_prefs)
+    else:
+        location_score = np.zeros(len(rows))
+
+    # Neighbourhood discount (needs neighborhood_price_per_sqm, see add_neighborhood_median)
+    neighborhood_score = neighborhood_scores(df)[rows]
+
+    # Composite score
+    score = (
+        weights["value"] * value_score +
+        weights["size"] * size_score +
+        weights["location"] * location_score +
+        weights.get("neighborhood", 0.0) * neighborhood_score
+    )
+
+    # Final ranking
+    best = top_k_indices(score, k)
+    top = df.iloc[rows[best]].copy()
+    top["value_score"] = value_score[best]
+    top["size_score"] = size_score[best]
+    top["location_score"] = location_score[best]
+    top["neighborhood_score"] = neighborhood_score[best]
+    top["score"] = score[best]
+    return _add_formatted(top)
+
+
+def _add_formatted(top: pd.DataFrame) -> pd.DataFrame:
+    # Helpful formatted columns
+    top["price_fmt"] = top["price"].map(lambda x: f"₱{x:,.0f}")
+    top["price_per_sqm_fmt"] = top["price_per_sqm"].map(lambda x: f"₱{x:,.0f}/sqm")
+    top["lot_fmt"] = top["lot"].map(lambda x: f"{x:,.2f} sqm")
+    return top
+
+
+def rank_top10(
+    df: pd.DataFrame,
+    budget: Optional[float] = None,
+    location_prefs: Optional[Dict[str, float]] = None,
+    weights: Optional[Dict[str, float]] = None
+) -> pd.DataFrame:
+    return rank_top_k(df, k=10, budget=budget, location_prefs=location_prefs, weights=weights)
+
+
+# -----------------------------------------------------
+# 3b) Batch scenarios (many buyer profiles, one pass)
+# -----------------------------------------------------
+SCENARIO_CHUNK = 16     # scenarios scored together; bounds memory at SCENARIO_CHUNK x rows
+
+
+class Scenario(NamedTuple):
+    name: str
+    budget: Optional[float] = None
+    weights: Optional[Dict[str, float]] = None
+    location_prefs: Optional[Dict[str, float]] = None
+    k: int = 10
+
+
+def _scale_rows(x: np.ndarray, lo: np.ndarray, hi: np.ndarray, invert: bool = False) -> np.ndarray:
+    """
+    Min-max scale x (rows,) once per scenario -> (scenarios, rows); a scenario whose
+    min equals its max scores 1.0 everywhere, as in rank_top_k.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scaled = (x[None, :] - lo[:, None]) / (hi - lo)[:, None]
+    scaled = 1 - scaled if invert else scaled
+    return np.where((hi == lo)[:, None], 1.0, scaled)
+
+
+def score_scenarios(df: pd.DataFrame, scenarios: List[Scenario]) -> Dict[str, pd.DataFrame]:
+    """
+    Score every listing under every scenario as one scenarios x rows matrix and return
+    each scenario's top k (same columns as rank_top_k), keyed by scenario name.
+    df is a prepared frame (prepare_data_with_address_lot_price). A scenario whose
+    budget leaves no listings gets an empty frame.
+    """
+    price = df["price"].to_numpy(dtype=float, na_value=np.nan)
+    ppsqm = df["price_per_sqm"].to_numpy(dtype=float, na_value=np.nan)
+    lot = df["lot"].to_numpy(dtype=float, na_value=np.nan)
+
+    neighborhood_score = neighborhood_scores(df)
+
+    # Every scenario's location keys are matched in the same single scan
+    codes, uniques = _address_codes(location_text(df))
+    presence, key_index = _key_presence(uniques, [k for s in scenarios for k in (s.location_prefs or {})])
+
+    # Budget filters are "price <= budget", so with rows sorted by price each budget
+    # is a prefix: running min/max give every scenario's scaling bounds at once.
+    order = np.argsort(price, kind="stable")
+    sorted_price = price[order]
+    running = {name: (np.fmin.accumulate(x[order]), np.fmax.accumulate(x[order]))
+               for name, x in (("value", ppsqm), ("size", lot))}
+
+    picked = []   # (row positions, value, size, location, score) per scenario
+    for start in range(0, len(scenarios), SCENARIO_CHUNK):
+        chunk = scenarios[start:start + SCENARIO_CHUNK]
+        weights = [s.weights or DEFAULT_WEIGHTS for s in chunk]
+        w_value, w_size, w_location = (np.array([w[key] for w in weights])[:, None]
+                                       for key in ("value", "size", "location"))
+        n_in = np.array([len(df) if s.budget is None else np.searchsorted(sorted_price, s.budget, side="right")
+                         for s in chunk])
+        last = np.maximum(n_in - 1, 0)
+
+        if len(df):
+            value_score = _scale_rows(ppsqm, running["value"][0][last], running["value"][1][last], invert=True)
+            size_score = _scale_rows(lot, running["size"][0][last], running["size"][1][last])
+        else:
+            value_score = size_score = np.empty((len(chunk), 0))
+        location_score = np.vstack([
+            _location_bonus(presence, key_index, s.location_prefs)[codes] if s.location_prefs
+            else np.zeros(len(df)) for s in chunk
+        ])
+        w_neighborhood = np.array([w.get("neighborhood", 0.0) for w in weights])[:, None]
+        score = (w_value * value_score + w_size * size_score + w_location * location_score
+                 + w_neighborhood * neighborhood_score[None, :])
+
+        for j, s in enumerate(chunk):
+            in_budget = price <= s.budget if s.budget is not None else np.ones(len(df), dtype=bool)
+            best = top_k_indices(np.where(in_budget, score[j], np.nan), s.k)
+            best = best[in_budget[best]]
+            picked.append((best, value_score[j, best], size_score[j, best],
+                           location_score[j, best], score[j, best]))
+
+    # Assemble every scenario's winners in one frame, then slice it per scenario
+    rows, value, size, location, total = (np.concatenate(parts) for parts in zip(*picked)) \
+        if picked else (np.array([], dtype=np.intp),) * 5
+    top = df.iloc[rows].copy()
+    top["value_score"] = value
+    top["size_score"] = size
+    top["location_score"] = location
+    top["neighborhood_score"] = neighborhood_score[rows]
+    top["score"] = total
+    top = _add_formatted(top)
+
+    bounds = np.cumsum([0] + [len(p[0]) for p in picked])
+    return {s.name: top.iloc[bounds[i]:bounds[i + 1]] for i, s in enumerate(scenarios)}
+
+
+# -----------------------------------
+# 4) Summary by location (benchmark)
+# -----------------------------------
+def summarize_by_address(df: pd.DataFrame, top_n: Optional[int] = 20, by="address") -> pd.DataFrame:
+    """
+    Per-group listing count, medians and ₱/sqm spread, cheapest median ₱/sqm first.
+    `by` is any column (or list of columns) of the prepared frame: "address" (the
+    province after cleaning), a city or barangay column, a scrape date, ...
+    """
+    grouped = df.groupby(by, observed=True, sort=False)
+    agg = grouped.agg(
+        listings=("price_per_sqm", "size"),
+        median_price_per_sqm=("price_per_sqm", "median"),
+        median_price=("price", "median"),
+        median_lot=("lot", "median"),
+    )
+    quartiles = grouped["price_per_sqm"].quantile([0.25, 0.75]).unstack()
+    agg["iqr_price_per_sqm"] = quartiles[0.75] - quartiles[0.25]
+    agg = agg.reset_index().sort_values("median_price_per_sqm")
+    return agg.head(top_n) if top_n else agg
+
+def city_summary_sheet(df: pd.DataFrame, top_n: Optional[int] = 20) -> Dict[str, pd.DataFrame]:
+    """{"City_Summary": ...} per province and parsed city, or {} when no listing has a city."""
+    located = df[df["city"].notna()] if "city" in df.columns else df.iloc[:0]
+    if located.empty:
+        return {}
+    return {"City_Summary": summarize_by_address(located, top_n=top_n, by=["address", "city"])}
+
+# -------------------------------------
+# 5) Plot Top 10 scores (bar chart)
+# -------------------------------------
+def plot_top10(top10: pd.DataFrame, label_col: str = "address", fname: str = "top10_scores.png"):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 6))
+    labels = top10[label_col]
+    plt.barh(labels, top10["score"], color="#2a9d8f")
+    plt.xlabel("Composite Score (higher is better)")
+    plt.ylabel("Listing (Address)")
+    plt.title("Top 10 Listings — Composite Score")
+    plt.gca().invert_yaxis()
+    # annotate price per sqm
+    
+    for i, (score, ppsqm) in enumerate(zip(top10["score"], top10["price_per_sqm_fmt"])):
+        plt.text(score + 0.005, i, ppsqm, va="center", fontsize=8)
+    plt.tight_layout()
+    plt.savefig(fname, dpi=150)
+    plt.close()
+
+# -------------------------
+# 6) Main analysis function
+# -------------------------
+def _with_thumbnails(df: pd.DataFrame) -> pd.DataFrame:
+    # Local thumbnail path per listing (from the images stage) next to image_link
+    if "image_link" not in df.columns:
+        return df
+    from image_cache import thumbnails_for
+    return df.assign(thumbnail=thumbnails_for(df["image_link"], fallback=False))
+
+
+def analyze_file(filepath: str,
+                 budget: Optional[float] = None,
+                 location_prefs: Optional[Dict[str, float]] = None,
+                 weights: Optional[Dict[str, float]] = None):
+    return analyze_data(load_data(filepath), budget=budget,
+                        location_prefs=location_prefs, weights=weights)
+
+
+def analyze_data(df: pd.DataFrame,
+                 budget: Optional[float] = None,
+                 location_prefs: Optional[Dict[str, float]] = None,
+                 weights: Optional[Dict[str, float]] = None):
+    df_clean = _with_thumbnails(prepare_data_with_address_lot_price(df))
+    if {"lat", "long"} <= set(df_clean.columns):
+        df_clean = add_neighborhood_median(df_clean)
+
+    top10 = rank_top10(
+        df_clean,
+        budget=budget,
+        location_prefs=location_prefs,
+        weights=weights
+    )
+
+    # Simple summary (cheapest addresses by median ₱/sqm)
+    addr_summary = summarize_by_address(df_clean, top_n=20)
+
+    # Export results (streamed; see excel_export for splitting/offloading large sheets)
+    write_workbook("analysis_output.xlsx", {
+        "Cleaned_Data": df_clean,
+        "Top10": top10,
+        "Address_Summary": addr_summary,
+        **city_summary_sheet(df_clean),
+    })
+
+    # Plot chart
+    plot_top10(top10, label_col="address", fname="top10_scores.png")
+
+    return {
+        "top10": top10[["address", "price_fmt", "price_per_sqm_fmt", "lot_fmt", "score"]],
+        "address_summary": addr_summary
+    }
+
+
+def analyze_scenarios(df: pd.DataFrame, scenarios: List[Scenario],
+                      output_xlsx: str = "scenario_output.xlsx") -> Dict[str, pd.DataFrame]:
+    """
+    Compare many buyer profiles: prepare the data once, score all scenarios together
+    and write one workbook (Scenarios, Top_K with a scenario column, Address_Summary,
+    Cleaned_Data). Returns each scenario's top k keyed by name.
+    """
+    names = [s.name for s in scenarios]
+    if len(set(names)) != len(names):
+        raise ValueError("Scenario names must be unique.")
+
+    df_clean = _with_thumbnails(prepare_data_with_address_lot_price(df))
+    if {"lat", "long"} <= set(df_clean.columns):
+        df_clean = add_neighborhood_median(df_clean)
+    results = score_scenarios(df_clean, scenarios)
+
+    summary = pd.DataFrame([
+        {"scenario": s.name, "budget": s.budget, "k": s.k,
+         "weights": str(s.weights or ""), "location_prefs": str(s.location_prefs or ""),
+         "listings_in_budget": int((df_clean["price"] <= (s.budget if s.budget is not None else np.inf)).sum()),
+         "best_score": results[s.name]["score"].max()}
+        for s in scenarios
+    ])
+    top_k = pd.concat(
+        [top.assign(scenario=name, rank=np.arange(1, len(top) + 1)) for name, top in results.items()],
+        ignore_index=True
+    )
+    top_k = top_k[["scenario", "rank"] + [c for c in top_k.columns if c not in ("scenario", "rank")]]
+
+    write_workbook(output_xlsx, {
+        "Scenarios": summary,
+        "Top_K": top_k,
+        "Address_Summary": summarize_by_address(df_clean, top_n=20),
+        **city_summary_sheet(df_clean),
+        "Cleaned_Data": df_clean,
+    })
+
+    return results
+
+
+def main(from_warehouse: bool = False, scenarios: Optional[List[Scenario]] = None):
+    # Latest warehouse snapshot, or this run's geocoded file
+    df = load_warehouse() if from_warehouse else read_stage("geocoded", INPUT_CSV)
+    if scenarios:
+        # e.g. [Scenario("family", budget=6_000_000), Scenario("investor", weights={...}, k=25)]
+        for name, top in analyze_scenarios(df, scenarios).items():
+            print(f"== {name} ==")
+            print(top[["address", "price_fmt", "price_per_sqm_fmt", "lot_fmt", "score"]])
+        return
+    results = analyze_data(
+        df,
+        budget=6_000_000,                   # optional
+       # location_prefs={"NCR": 0.5},  # optional boosts
+        weights={"value": 0.4, "size": 0.3, "location": 0.1, "neighborhood": 0.2}  # optional tuning
+    )
+    print(results["top10"])
+    print(results["address_summary"])
+# ---------- Example Usage ----------
+if __name__ == "__main__":
+    main()
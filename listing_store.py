@@ -0,0 +1,128 @@
+# listing_store.py
+import sqlite3
+from datetime import datetime
+from typing import Sequence, Tuple
+import pandas as pd
+
+# ---- Settings ----
+STORE_PATH = "listing_store.db"           # persistent store, one row per property ID
+ID_PATTERN = r"/foreclosed-properties/(\d+)"
+
+# Snapshot fields: a listing is re-enriched when any of these change
+SNAPSHOT_COLUMNS = {"Price": "price", "Lot": "lot", "Image_Link": "image_link"}
+# Enriched fields: reused as-is for unchanged listings
+ENRICHED_COLUMNS = {"Title": "title", "Lot Description": "lot_description",
+                    "lat": "lat", "long": "long", "geocode_level": "geocode_level"}
+# Geocode columns, which the enrich stage leaves out of its output
+GEOCODE_COLUMNS = ["lat", "long", "geocode_level"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    property_id     TEXT PRIMARY KEY,
+    price           REAL,
+    lot             REAL,
+    image_link      TEXT,
+    title           TEXT,
+    lot_description TEXT,
+    lat             REAL,
+    long            REAL,
+    geocode_level   TEXT,               -- how lat/long was found (see get_LatLong)
+    first_seen      TEXT NOT NULL,
+    last_seen       TEXT NOT NULL
+)
+"""
+
+
+def open_store(path: str = STORE_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(listings)")}
+    if "geocode_level" not in columns:
+        # Stores created before geocode_level was kept
+        with conn:
+            conn.execute("ALTER TABLE listings ADD COLUMN geocode_level TEXT")
+    return conn
+
+
+def property_ids(links: pd.Series) -> pd.Series:
+    """
+    Extract the numeric '/foreclosed-properties/<id>' suffix from every Link.
+    Links without an ID come back as NaN.
+    """
+    return links.astype(str).str.extract(ID_PATTERN, expand=False)
+
+
+def load_snapshots(conn: sqlite3.Connection) -> pd.DataFrame:
+    cols = ["property_id"] + list(SNAPSHOT_COLUMNS.values()) + list(ENRICHED_COLUMNS.values())
+    df = pd.read_sql_query(f"SELECT {', '.join(cols)} FROM listings", conn)
+    return df.set_index("property_id")
+
+
+def _same(a: pd.Series, b: pd.Series) -> pd.Series:
+    # NaN on both sides counts as unchanged; a null on one side only is a change
+    return (a == b).fillna(False).astype(bool) | (a.isna() & b.isna())
+
+
+def split_new_or_changed(conn: sqlite3.Connection, df: pd.DataFrame,
+                         required: Sequence[str] = ("title",),
+                         retry_levels: Sequence[str] = ()) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Diff freshly scraped (cleaned) listings against the store.
+    Returns (pending, known):
+      - pending: new listings, listings whose Price/Lot/Image_Link changed, or whose
+                 stored value of any `required` column is NULL (e.g. ("title", "lat",
+                 "long") retries listings whose geocode failed), or whose stored
+                 geocode_level is one of `retry_levels` (e.g. a city/province centroid
+                 that only stood in for a failed upstream lookup)
+      - known:   unchanged listings, with Title/Lot Description/lat/long filled from the store
+    Both keep the original index so they can be concatenated back in scrape order.
+    """
+    ids = property_ids(df["Link"])
+    stored = load_snapshots(conn).reindex(ids.values)
+    stored.index = df.index
+
+    unchanged = ids.notna()
+    for db_col in required:
+        unchanged &= stored[db_col].notna()
+    if retry_levels:
+        unchanged &= ~stored["geocode_level"].isin(list(retry_levels))
+    for col, db_col in SNAPSHOT_COLUMNS.items():
+        unchanged &= _same(df[col], stored[db_col])
+
+    pending = df.loc[~unchanged].copy()
+    known = df.loc[unchanged].copy()
+    for col, db_col in ENRICHED_COLUMNS.items():
+        known[col] = stored.loc[unchanged, db_col]
+    return pending, known
+
+
+def _none_if_na(value):
+    return None if pd.isna(value) else value
+
+
+def upsert_listings(conn: sqlite3.Connection, df: pd.DataFrame) -> int:
+    """
+    Insert or refresh the snapshot + enrichment of every listing in df.
+    first_seen is kept from the original insert; last_seen is set to now.
+    """
+    now = datetime.now().isoformat(timespec="seconds")
+    ids = property_ids(df["Link"])
+    cols = list(SNAPSHOT_COLUMNS) + list(ENRICHED_COLUMNS)
+    db_cols = list(SNAPSHOT_COLUMNS.values()) + list(ENRICHED_COLUMNS.values())
+
+    rows = []
+    for pid, values in zip(ids, df.reindex(columns=cols).itertuples(index=False)):
+        if pd.isna(pid):
+            continue
+        rows.append((pid, *[_none_if_na(v) for v in values], now, now))
+
+    placeholders = ", ".join("?" * (len(db_cols) + 3))
+    updates = ", ".join(f"{c} = excluded.{c}" for c in db_cols + ["last_seen"])
+    with conn:
+        conn.executemany(
+            f"INSERT INTO listings (property_id, {', '.join(db_cols)}, first_seen, last_seen) "
+            f"VALUES ({placeholders}) "
+            f"ON CONFLICT(property_id) DO UPDATE SET {updates}",
+            rows,
+        )
+    return len(rows)
@@ -0,0 +1,151 @@
+# page_crawler.py
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+import requests
+
+import run_metrics
+from detail_http import make_session, HTTP_TIMEOUT
+from listing_cards import iter_listing_cards_html
+from rate_limit import HostRateLimiter
+
+# ---- Settings ----
+PAGE_CONCURRENCY = 4            # index pages fetched in parallel
+REQUESTS_PER_SECOND = 2.0       # shared per-host budget
+MAX_PAGES = 500                 # safety net only; the crawl normally stops at the first empty page
+MAX_RETRIES = 3                 # per page, for timeouts, connection errors, 429 and 5xx
+RETRY_BACKOFF = 1.0             # seconds before the first retry, doubled after each one
+MAX_FAILED_PAGES = 3            # consecutive pages still failing after their retries end the crawl
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class EmptyCrawlError(RuntimeError):
+    """The first index page has no listing cards (e.g. they are rendered by JavaScript)."""
+
+
+class IncompleteCrawlError(RuntimeError):
+    """
+    Some index pages still failed after their retries. `listings` holds what was
+    fetched and `skipped` the failed page numbers; the snapshot is not complete, so
+    it must not stand in for the site (listings on skipped pages would read as delisted).
+    """
+
+    def __init__(self, listings: List[Dict[str, Optional[str]]], skipped: List[int]):
+        super().__init__(f"Crawl incomplete: page(s) {', '.join(map(str, skipped))} failed "
+                         f"({len(listings)} listings fetched)")
+        self.listings = listings
+        self.skipped = skipped
+
+
+def page_url(start_url: str, page: int) -> str:
+    """
+    Return start_url with its ?page=N query parameter set to `page`,
+    keeping every other filter in the query string as-is.
+    """
+    parsed = urlparse(start_url)
+    qs = parse_qs(parsed.query, keep_blank_values=True)
+    qs["page"] = [str(page)]
+    return urlunparse(parsed._replace(query=urlencode(qs, doseq=True)))
+
+
+def _transient(exc: requests.RequestException) -> bool:
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    response = getattr(exc, "response", None)
+    return response is not None and response.status_code in RETRY_STATUSES
+
+
+def fetch_page(session: requests.Session, limiter: HostRateLimiter,
+               url: str) -> List[Dict[str, Optional[str]]]:
+    """
+    Cards of one index page. Transient errors (timeouts, connection errors, 429, 5xx)
+    are retried with exponential backoff; anything else, or the last failure, is raised.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire(url)
+        try:
+            with run_metrics.timer("index_page"):
+                response = session.get(url, timeout=HTTP_TIMEOUT)
+                response.raise_for_status()
+            break
+        except requests.RequestException as exc:
+            if attempt == MAX_RETRIES or not _transient(exc):
+                raise
+            run_metrics.count("index_page_retries")
+            run_metrics.sleep(RETRY_BACKOFF * 2 ** attempt)
+    run_metrics.count("pages_crawled")
+    return list(iter_listing_cards_html(response.text, url))
+
+
+def crawl_pages(start_url: str,
+                concurrency: Optional[int] = None,
+                requests_per_second: Optional[float] = None,
+                max_pages: Optional[int] = None) -> List[Dict[str, Optional[str]]]:
+    """
+    Enumerate index pages directly (?page=1, 2, ...) and fetch them `concurrency` at a time.
+    Stops at the first page that has no cards, or that only repeats listings already seen
+    (some sites serve the last page again for out-of-range page numbers).
+    A page that still fails after its retries is skipped and the crawl goes on
+    (MAX_FAILED_PAGES of them in a row end it); if any page was skipped the crawl raises
+    IncompleteCrawlError carrying what was fetched, so a partial crawl never passes for
+    the full site. A failing first page is raised, and a first page without cards raises
+    EmptyCrawlError, so an empty crawl never passes for an empty site.
+    Records are returned in page order, one per listing link.
+    Unset limits use the module settings, read at call time.
+    """
+    concurrency = concurrency or PAGE_CONCURRENCY
+    requests_per_second = requests_per_second or REQUESTS_PER_SECOND
+    max_pages = max_pages or MAX_PAGES
+    listings: List[Dict[str, Optional[str]]] = []
+    seen_links = set()
+    session = make_session(pool_size=concurrency)
+    limiter = HostRateLimiter(requests_per_second, capacity=concurrency)
+    first_page = int(parse_qs(urlparse(start_url).query).get("page", ["1"])[0] or 1)
+    skipped: List[int] = []
+
+    def done() -> List[Dict[str, Optional[str]]]:
+        if skipped:
+            raise IncompleteCrawlError(listings, skipped)
+        return listings
+
+    def fetch(url: str):
+        # Errors come back as values so one bad page does not end the batch
+        try:
+            return fetch_page(session, limiter, url)
+        except requests.RequestException as exc:
+            return exc
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            page = first_page
+            failed = 0
+            while page < first_page + max_pages:
+                batch = range(page, min(page + concurrency, first_page + max_pages))
+                urls = [page_url(start_url, n) for n in batch]
+                for n, records in zip(batch, pool.map(fetch, urls)):
+                    if isinstance(records, Exception):
+                        run_metrics.count("index_page_errors")
+                        if n == first_page:
+                            raise records
+                        failed += 1
+                        skipped.append(n)
+                        print(f"Page {n} skipped: {records}")
+                        if failed >= MAX_FAILED_PAGES:
+                            print(f"Stopped: {failed} pages in a row failed. Pages crawled: {n - first_page + 1}")
+                            return done()
+                        continue
+                    failed = 0
+                    new = [r for r in records if r["Link"] not in seen_links]
+                    if not new and n == first_page:
+                        raise EmptyCrawlError(f"Page {n} has no listing cards: {urls[0]}")
+                    if not new:
+                        print(f"Stopped: page {n} has no new cards. Pages crawled: {n - first_page}")
+                        return done()
+                    seen_links.update(r["Link"] for r in new)
+                    listings.extend(new)
+                    print(f"Page {n}: {len(new)} listings")
+                page = batch.stop
+        print(f"Stopped: reached MAX_PAGES ({max_pages})")
+        return done()
+    finally:
+        session.close()
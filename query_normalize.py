@@ -0,0 +1,66 @@
+# query_normalize.py
+# The one normalizer for place text: geocoder queries and their cache keys, gazetteer
+# names and titles, and the fields address_parser cuts out of titles all use these rules.
+import re
+import unicodedata
+import pandas as pd
+
+# Ordered (pattern, replacement) rules on lower-cased, NFKD-decomposed text.
+# Commas (and hyphens) are kept: they delimit the parts address_parser reads.
+# Patterns read the same in RE2 (Arrow-backed Series) and Python re (scalar keys).
+ADDRESS_RULES = [
+    # Accents, left as combining marks by NFKD: Biñan -> binan
+    (r"[^\x00-\x7f]+", ""),
+    # "(Formerly Barangay Calique)", "(Sampaloc)", and a bracket the title cut off
+    (r"\([^)]*\)?", " "),
+    # Barangay spelling variants: Brgy., BRGY, Bgy., Brgys., Barangays, Barnagy
+    (r"\b(?:barangays?|brgys?|bgy|barnagy)\b\.?", " barangay "),
+    (r"\bsta\b\.?", "santa "),
+    (r"\bsto\b\.?", "santo "),
+    (r"\bm\.\s*m\b\.?", " metro manila "),
+    # Country suffix adds nothing for a PH-only listing set
+    (r"\bphilippines\b", " "),
+    (r"[^a-z0-9,\- ]+", " "),
+    # "Province of Rizal" / "Rizal Province" -> "rizal"
+    (r"\b(?:municipality|province) of\b|\bprovince\b", " "),
+    # "City of Pasig" -> "pasig city"
+    (r"\bcity of ([a-z\- ]+?)\s*(,|$)", r"\1 city\2"),
+    (r"\s*,[\s,]*", ", "),
+    (r"\s+", " "),
+]
+# Canonical keys drop the part separators too
+CANONICAL_RULES = ADDRESS_RULES + [(r"[\s,\-]+", " ")]
+
+CANONICAL_RES = [(re.compile(pattern), repl) for pattern, repl in CANONICAL_RULES]
+
+
+def _normalize(texts: pd.Series, rules) -> pd.Series:
+    keys = texts.astype("string").str.lower().str.normalize("NFKD")
+    for pattern, repl in rules:
+        keys = keys.str.replace(pattern, repl, regex=True)
+    return keys.str.strip(" ,-")
+
+
+def address_keys(texts: pd.Series) -> pd.Series:
+    """
+    Normalized form address_parser matches on: lower case, accents folded, barangay
+    spellings unified, Sta./Sto. expanded, parts separated by ", ".
+    """
+    return _normalize(texts, ADDRESS_RULES)
+
+
+def canonical_keys(queries: pd.Series) -> pd.Series:
+    """
+    Vectorized canonical form of geocoder queries, so that e.g.
+    "Brgy. Bagumbayan, Teresa Rizal" and "Barangay Bagumbayan, Teresa, Rizal"
+    share the key "barangay bagumbayan teresa rizal".
+    """
+    return _normalize(queries.astype(str), CANONICAL_RULES).astype(str)
+
+
+def canonical_key(query: str) -> str:
+    """Scalar version of canonical_keys, for single lookups."""
+    key = unicodedata.normalize("NFKD", str(query).lower())
+    for pattern, repl in CANONICAL_RES:
+        key = pattern.sub(repl, key)
+    return key.strip(" ,-")
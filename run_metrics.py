@@ -0,0 +1,184 @@
+# run_metrics.py
+# Instrumentation for one pipeline run: wall time per stage, named timers for the
+# per-record work inside stages (page fetches, browser loads, geocoder calls, sleeps,
+# rate-limit waits, Excel writes), counters, optional profiling per stage, and a
+# JSON report per run so runs can be compared and charted.
+#
+# Stage modules call the module-level count() / timer() / sleep(); they record into
+# the current run (start_run() begins a new one), so nothing has to be threaded
+# through function signatures. Everything is thread-safe.
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+# ---- Settings ----
+REPORT_DIR = "run_reports"      # one run_<timestamp>.json per run
+PROFILER = None                 # None, "cprofile" or "pyinstrument": profile every stage
+PROFILE_DIR = "profiles"        # cProfile .prof / pyinstrument .html files
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+class RunMetrics:
+    """
+    Counters and timers of one run, plus a record per stage with the counters and
+    timers that moved while it ran.
+    """
+
+    def __init__(self):
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.started = time.perf_counter()
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.timers: Dict[str, list] = defaultdict(lambda: [0, 0.0, 0.0])   # calls, seconds, max
+        self.stages = []
+        self.lock = threading.Lock()
+
+    def count(self, name: str, n: int = 1):
+        with self.lock:
+            self.counters[name] += n
+
+    def add_time(self, name: str, seconds: float):
+        with self.lock:
+            timer = self.timers[name]
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def _snapshot(self):
+        with self.lock:
+            return dict(self.counters), {k: list(v) for k, v in self.timers.items()}
+
+    @contextmanager
+    def stage(self, name: str, profiler: Optional[str] = PROFILER, profile_dir: str = PROFILE_DIR):
+        """
+        Time one stage (optionally under a profiler) and record it, even when it fails.
+        """
+        counters_before, timers_before = self._snapshot()
+        entry = {"stage": name, "started_at": datetime.now().isoformat(timespec="seconds"),
+                 "status": "ok"}
+        start = time.perf_counter()
+        try:
+            with _profiled(profiler, os.path.join(profile_dir, f"{self.run_id}_{name}")) as path:
+                if path:
+                    entry["profile"] = path
+                yield entry
+        except BaseException as e:
+            entry["status"] = "failed"
+            entry["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            entry["seconds"] = round(time.perf_counter() - start, 3)
+            counters, timers = self._snapshot()
+            entry["counters"] = {k: v - counters_before.get(k, 0) for k, v in counters.items()
+                                 if v != counters_before.get(k, 0)}
+            # Per-stage calls and time; max_ms is only known for the whole run
+            entry["timers"] = {k: _timer_summary(v[0] - timers_before.get(k, [0, 0.0])[0],
+                                                 v[1] - timers_before.get(k, [0, 0.0])[1])
+                               for k, v in timers.items() if v[0] != timers_before.get(k, [0])[0]}
+            with self.lock:
+                self.stages.append(entry)
+
+    def skip(self, name: str, reason: str):
+        with self.lock:
+            self.stages.append({"stage": name, "status": "skipped", "reason": reason})
+
+    def report(self) -> dict:
+        counters, timers = self._snapshot()
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "seconds": round(time.perf_counter() - self.started, 3),
+            "stages": list(self.stages),
+            "counters": counters,
+            "timers": {k: _timer_summary(*v) for k, v in timers.items()},
+        }
+
+    def write_report(self, directory: str = REPORT_DIR) -> str:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"run_{self.run_id}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+
+def _timer_summary(calls: int, seconds: float, max_seconds: Optional[float] = None) -> dict:
+    summary = {"calls": calls, "seconds": round(seconds, 3),
+               "mean_ms": round(seconds / calls * 1000, 2) if calls else 0.0}
+    if max_seconds is not None:
+        summary["max_ms"] = round(max_seconds * 1000, 2)
+    return summary
+
+
+@contextmanager
+def _profiled(profiler: Optional[str], path_stem: str):
+    # Yields the profile's file path (None when not profiling)
+    if profiler is None:
+        yield None
+        return
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler: {profiler!r}. Use one of {', '.join(PROFILERS)}.")
+    os.makedirs(os.path.dirname(path_stem) or ".", exist_ok=True)
+    if profiler == "cprofile":
+        import cProfile
+        prof = cProfile.Profile()
+        path = path_stem + ".prof"          # python -m pstats <file>, snakeviz, ...
+        prof.enable()
+        try:
+            yield path
+        finally:
+            prof.disable()
+            prof.dump_stats(path)
+    else:
+        from pyinstrument import Profiler
+        prof = Profiler()
+        path = path_stem + ".html"
+        prof.start()
+        try:
+            yield path
+        finally:
+            prof.stop()
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(prof.output_html())
+
+
+# ---- The current run ----
+_current = RunMetrics()
+
+
+def start_run() -> RunMetrics:
+    """Begin recording a new run; later count()/timer() calls go to it."""
+    global _current
+    _current = RunMetrics()
+    return _current
+
+
+def current() -> RunMetrics:
+    return _current
+
+
+def count(name: str, n: int = 1):
+    _current.count(name, n)
+
+
+def timer(name: str):
+    """with timer("geocode_call"): ... adds the block's duration to that timer."""
+    return _current.timer(name)
+
+
+def sleep(seconds: float, name: str = "sleep"):
+    """time.sleep that shows up in the report."""
+    with _current.timer(name):
+        time.sleep(seconds)
@@ -0,0 +1,174 @@
+# spatial_index.py
+# Radius and nearest-neighbour queries over geocoded listings.
+# Points are bucketed into a fixed lat/long grid (geohash-style cells) and sorted by
+# cell, so every query reads one contiguous slice per grid row in its bounding box
+# and runs the exact haversine only on those candidates.
+from typing import List, Tuple
+import numpy as np
+import pandas as pd
+
+# ---- Settings ----
+EARTH_RADIUS_KM = 6371.0088
+CELL_DEG = 0.05                     # grid cell size (~5.5 km at Philippine latitudes)
+INDEX_PATH = "spatial_index.npz"
+NEIGHBOR_BLOCK = 256                # points per distance matrix in neighborhood_median
+KM_PER_DEG_LAT = np.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in km; arguments broadcast like NumPy arrays."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class SpatialIndex:
+    """
+    Grid index over (lat, long) points. Query results are row positions into the
+    arrays the index was built from (rows without coordinates are never returned).
+    """
+
+    def __init__(self, lat, lon, cell_deg: float = CELL_DEG):
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        valid = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+        self.cell_deg = cell_deg
+        self.n_cols = int(np.ceil(360 / cell_deg)) + 1
+        keys = self._keys(lat[valid], lon[valid])
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.lat = lat[valid][order]
+        self.lon = lon[valid][order]
+        self.positions = valid[order]
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, lat_col: str = "lat", lon_col: str = "long",
+                   cell_deg: float = CELL_DEG) -> "SpatialIndex":
+        return cls(df[lat_col].to_numpy(dtype=float, na_value=np.nan),
+                   df[lon_col].to_numpy(dtype=float, na_value=np.nan), cell_deg)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def _cell(self, lat, lon):
+        return (np.floor((np.asarray(lat) + 90) / self.cell_deg).astype(np.int64),
+                np.floor((np.asarray(lon) + 180) / self.cell_deg).astype(np.int64))
+
+    def _keys(self, lat, lon) -> np.ndarray:
+        row, col = self._cell(lat, lon)
+        return row * self.n_cols + col
+
+    # ---- persistence ----
+    def save(self, path: str = INDEX_PATH):
+        np.savez(path, keys=self.keys, lat=self.lat, lon=self.lon, positions=self.positions,
+                 cell_deg=self.cell_deg, n_cols=self.n_cols)
+
+    @classmethod
+    def load(cls, path: str = INDEX_PATH) -> "SpatialIndex":
+        data = np.load(path)
+        index = cls.__new__(cls)
+        index.cell_deg = float(data["cell_deg"])
+        index.n_cols = int(data["n_cols"])
+        for name in ("keys", "lat", "lon", "positions"):
+            setattr(index, name, data[name])
+        return index
+
+    # ---- queries ----
+    def _slots_near(self, lat: np.ndarray, lon: np.ndarray, radius_km: float) -> np.ndarray:
+        # Sorted-array slots of every point in the cells overlapping the bounding box of
+        # the query points grown by radius_km: one contiguous slice per grid row
+        dlat = radius_km / KM_PER_DEG_LAT
+        max_lat = min(np.max(np.abs(lat)) + dlat, 89.9)
+        dlon = min(dlat / np.cos(np.radians(max_lat)), 180.0)
+        row0, col0 = self._cell(np.min(lat) - dlat, np.min(lon) - dlon)
+        row1, col1 = self._cell(np.max(lat) + dlat, np.max(lon) + dlon)
+        col0, col1 = max(int(col0), 0), min(int(col1), self.n_cols - 1)
+        rows = np.arange(row0, row1 + 1) * self.n_cols
+        starts = np.searchsorted(self.keys, rows + col0, side="left")
+        ends = np.searchsorted(self.keys, rows + col1, side="right")
+        slices = [np.arange(s, e) for s, e in zip(starts, ends) if e > s]
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.intp)
+
+    def _radius_one(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        if not (np.isfinite(lat) and np.isfinite(lon)):
+            # e.g. a listing that failed geocoding: nothing is near it
+            return np.empty(0, dtype=self.positions.dtype), np.empty(0)
+        slots = self._slots_near(np.array([lat]), np.array([lon]), radius_km)
+        dist = haversine_km(lat, lon, self.lat[slots], self.lon[slots])
+        inside = dist <= radius_km
+        slots, dist = slots[inside], dist[inside]
+        order = np.argsort(dist, kind="stable")
+        return self.positions[slots[order]], dist[order]
+
+    def query_radius(self, lat, lon, radius_km: float) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        For each query point: (positions, distances_km) of every indexed point within
+        radius_km, nearest first. lat/lon may be scalars or equal-length arrays.
+        Query points without coordinates (NaN) get empty results.
+        """
+        lat, lon = np.atleast_1d(lat).astype(float), np.atleast_1d(lon).astype(float)
+        return [self._radius_one(a, b, radius_km) for a, b in zip(lat, lon)]
+
+    def query_knn(self, lat, lon, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The k nearest indexed points to each query point: (positions, distances_km),
+        both shaped (queries, k), nearest first. Missing neighbours (fewer than k points,
+        or a query point without coordinates) are -1 / inf.
+        """
+        lat, lon = np.atleast_1d(lat).astype(float), np.atleast_1d(lon).astype(float)
+        positions = np.full((len(lat), k), -1, dtype=np.int64)
+        distances = np.full((len(lat), k), np.inf)
+        k_found = min(k, len(self))
+        for i, (a, b) in enumerate(zip(lat, lon)):
+            if not (np.isfinite(a) and np.isfinite(b)):
+                continue
+            # Grow the search radius until the k nearest are certainly inside it
+            radius = self.cell_deg * KM_PER_DEG_LAT
+            while True:
+                found, dist = self._radius_one(a, b, radius)
+                if len(found) >= k_found or radius > np.pi * EARTH_RADIUS_KM:
+                    break
+                radius *= 2
+            positions[i, :k_found] = found[:k_found]
+            distances[i, :k_found] = dist[:k_found]
+        return positions, distances
+
+
+def neighborhood_median(index: SpatialIndex, values, radius_km: float = 5.0,
+                        min_neighbors: int = 3, exclude_self: bool = True) -> np.ndarray:
+    """
+    For every point the index was built from: the median of `values` over the other
+    points within radius_km (NaN where fewer than min_neighbors are found, or the
+    point has no coordinates). values is aligned with the index's input rows.
+    """
+    values = np.asarray(values, dtype=float)
+    result = np.full(len(values), np.nan)
+    # Points close together share their candidates, so each block of them (same
+    # radius-sized group of grid cells) is one points x candidates distance matrix
+    # instead of a query per point
+    span = max(1, int(np.ceil(radius_km / KM_PER_DEG_LAT / index.cell_deg)))
+    row, col = np.divmod(index.keys, index.n_cols)
+    group = (row // span) * index.n_cols + col // span
+    order = np.argsort(group, kind="stable")
+    group_starts = np.flatnonzero(np.r_[True, group[order][1:] != group[order][:-1]])
+    group_ends = np.r_[group_starts[1:], len(index)]
+    for group_start, group_end in zip(group_starts, group_ends):
+        for start in range(group_start, group_end, NEIGHBOR_BLOCK):
+            block = order[start:min(start + NEIGHBOR_BLOCK, group_end)]
+            slots = index._slots_near(index.lat[block], index.lon[block], radius_km)
+            if not slots.size:
+                continue
+            dist = haversine_km(index.lat[block, None], index.lon[block, None],
+                                index.lat[slots][None, :], index.lon[slots][None, :])
+            near = dist <= radius_km
+            if exclude_self:
+                near &= block[:, None] != slots[None, :]
+            neighbors = np.where(near, values[index.positions[slots]][None, :], np.nan)
+            counts = np.isfinite(neighbors).sum(axis=1)
+            # One sort per row (NaN sorts last), then the middle of each row's values
+            neighbors.sort(axis=1)
+            rows = np.arange(len(block))
+            median = (neighbors[rows, (counts - 1) // 2] + neighbors[rows, counts // 2]) / 2
+            result[index.positions[block]] = np.where(counts >= min_neighbors, median, np.nan)
+    return result
@@ -0,0 +1,82 @@
+# stage_io.py
+# Typed hand-off files between pipeline stages. Each stage writes Parquet with a
+# declared schema; the CSV files are only written as export views for people.
+import os
+from typing import Dict
+import pandas as pd
+import run_metrics
+
+# ---- Settings ----
+EXPORT_CSV = True          # also write the human-readable CSV next to each Parquet file
+
+# Columns added by each stage on top of the previous one. Columns not listed
+# (e.g. anything a user adds by hand) are passed through untouched.
+RAW_SCHEMA: Dict[str, str] = {
+    "Address": "string", "Lot": "string", "Price": "string",
+    "Image_Link": "string", "Link": "string",
+}
+CLEAN_SCHEMA = {**RAW_SCHEMA, "Address": "category", "Lot": "Float64", "Price": "Float64"}
+TITLES_SCHEMA = {**CLEAN_SCHEMA, "Title": "string", "Lot Description": "category",
+                 "Subdivision": "string", "Barangay": "category", "City": "category",
+                 "Province": "category"}
+GEOCODED_SCHEMA = {**TITLES_SCHEMA, "lat": "Float64", "long": "Float64", "geocode_level": "category"}
+
+SCHEMAS = {
+    "listings": RAW_SCHEMA,
+    "clean": CLEAN_SCHEMA,
+    "titles": TITLES_SCHEMA,
+    "geocoded": GEOCODED_SCHEMA,
+}
+
+# How each CSV view has always been written, so existing readers keep working
+CSV_OPTIONS = {
+    "listings": {"encoding": "utf-8"},
+    "clean": {},
+    "titles": {"encoding": "utf-8-sig"},
+    "geocoded": {"encoding": "utf-8-sig", "na_rep": "NULL"},
+}
+
+
+def parquet_path(csv_path: str) -> str:
+    """listings.csv -> listings.parquet, in the same folder."""
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def apply_schema(df: pd.DataFrame, stage: str) -> pd.DataFrame:
+    """Cast the stage's declared columns; missing ones are left out."""
+    schema = SCHEMAS[stage]
+    dtypes = {col: dtype for col, dtype in schema.items() if col in df.columns}
+    df = df.astype(dtypes)
+    for col, dtype in dtypes.items():
+        if dtype == "category":
+            # Concatenated frames can carry categories that no longer occur
+            df[col] = df[col].cat.remove_unused_categories()
+    return df
+
+
+def write_stage(df: pd.DataFrame, stage: str, csv_path: str,
+                export_csv: bool = EXPORT_CSV) -> pd.DataFrame:
+    """
+    Write a stage's output as typed Parquet (plus the CSV view when export_csv).
+    Returns the typed frame.
+    """
+    df = apply_schema(df.reset_index(drop=True), stage)
+    with run_metrics.timer("stage_write"):
+        df.to_parquet(parquet_path(csv_path), index=False)
+        if export_csv:
+            df.to_csv(csv_path, index=False, **CSV_OPTIONS[stage])
+    return df
+
+
+def read_stage(stage: str, csv_path: str) -> pd.DataFrame:
+    """
+    Read a stage's output: the Parquet file if present, otherwise the CSV view
+    (e.g. a file produced before this format existed), cast to the same schema.
+    """
+    path = parquet_path(csv_path)
+    if os.path.exists(path):
+        return apply_schema(pd.read_parquet(path), stage)
+    options = CSV_OPTIONS[stage]
+    df = pd.read_csv(csv_path, encoding=options.get("encoding", "utf-8"),
+                     na_values=[options["na_rep"]] if "na_rep" in options else None)
+    return apply_schema(df, stage)
@@ -0,0 +1,33 @@
+import os
+
+import pandas as pd
+import pytest
+
+import arrow_text
+from address_parser import AddressParser
+from conftest import ROOT
+
+CASES = [
+    # A city inside a longer part ("New Manila District") loses to a part that is one
+    ("Building 2 (Zurich Building), Aurora Boulevard corner Balete Drive, Barangay Kaunlaran, "
+     "New Manila District, Quezon City, Metro Manila | UnionBank Foreclosed Properties",
+     "Kaunlaran", "Quezon City", "NCR"),
+    # A city named after the province only wins when no other city is named
+    ("Subdivision, Brgy. Abilay Norte, Oton, Iloilo City", "Abilay Norte", "Oton", "Iloilo"),
+    ("Brgy. Bagumbayan, Teresa Rizal", "Bagumbayan", "Teresa", "Rizal"),
+    ("Barangay Barandal, Calamba City, Province Of Laguna", "Barandal", "Calamba", "Laguna"),
+]
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return AddressParser.load(os.path.join(ROOT, "ph_gazetteer.csv"))
+
+
+@pytest.mark.parametrize("arrow", [True, False])
+def test_parse(parser, monkeypatch, arrow):
+    if not arrow:
+        monkeypatch.setattr(arrow_text, "pa", None)
+        monkeypatch.setattr(arrow_text, "pc", None)
+    parsed = parser.parse(pd.Series([title for title, *_ in CASES]))
+    assert parsed[["Barangay", "City", "Province"]].values.tolist() == [list(c[1:]) for c in CASES]
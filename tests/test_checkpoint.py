@@ -0,0 +1,18 @@
+import checkpoint
+
+
+def test_finished_stages_belong_to_their_run(tmp_path):
+    conn = checkpoint.open_run(str(tmp_path / "pipeline_checkpoint.db"))
+    try:
+        checkpoint.mark_finished(conn, "2026-10-17", "scrape")
+        checkpoint.mark_finished(conn, "2026-10-17", "clean")
+
+        assert checkpoint.interrupted_run(conn) == "2026-10-17"
+        assert sorted(checkpoint.finished_stages(conn, "2026-10-17")) == ["clean", "scrape"]
+        # The next day's run does not inherit them
+        assert checkpoint.finished_stages(conn, "2026-10-18") == []
+
+        checkpoint.reset_run(conn)
+        assert checkpoint.interrupted_run(conn) is None
+    finally:
+        conn.close()
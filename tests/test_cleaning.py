@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import arrow_text
+import cleaning
+
+
+@pytest.fixture(params=["arrow", "pandas"])
+def engine(request, monkeypatch):
+    # Both code paths: Arrow's RE2 kernels and the pandas-only fallback
+    if request.param == "pandas":
+        monkeypatch.setattr(arrow_text, "pa", None)
+    return request.param
+
+
+def test_price_strips_only_currency_commas_and_spaces(engine):
+    prices = pd.Series(["Php 1,250,000", "₱ 980,000.50", " Php3,000,000 ",
+                        "Php 1,000 - 2,000", "Php 1.5M", "Price on request", None])
+    cleaned = cleaning.clean_price(prices)
+    assert cleaned.tolist()[:3] == [1_250_000.0, 980_000.5, 3_000_000.0]
+    assert cleaned.iloc[3:].isna().all()
+
+
+def test_lot_area_keeps_thousands(engine):
+    lots = pd.Series(["FA: 43 sqm • LA: 2,250 sqm", "LA: 1,234.5 sqm", "FA: 1,080 sqm", "n/a"])
+    cleaned = cleaning.clean_lot(lots)
+    assert cleaned.iloc[:3].tolist() == [2250.0, 1234.5, 1080.0]
+    assert np.isnan(cleaned.iloc[3])
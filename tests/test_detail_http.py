@@ -0,0 +1,47 @@
+import os
+
+import pytest
+import requests
+
+from conftest import ROOT
+from detail_http import fetch_detail_html, parse_detail_html
+
+DATA = os.path.join(ROOT, "tests", "data")
+
+
+def saved(name: str) -> str:
+    with open(os.path.join(DATA, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_og_title_and_lot_description():
+    title, lot_description = parse_detail_html(saved("detail_page.html"))
+    assert title == ("Subdivision, Phase 1 At The Island Park, Barangay Paliparan Iii, "
+                     "Dasmariñas City, Province Of Cavite | UnionBank Foreclosed Properties")
+    assert lot_description == "House and Lot"
+
+
+def test_title_tag_when_there_is_no_og_title():
+    assert parse_detail_html(saved("detail_page_title_only.html")) == (
+        "Brgy. Bagumbayan, Teresa Rizal | UnionBank", "Vacant Lot")
+
+
+def test_first_h1_and_no_lot_heading():
+    assert parse_detail_html(saved("detail_page_no_heading.html")) == (
+        "Barangay Barandal, Calamba City, Province Of Laguna", None)
+
+
+@pytest.mark.parametrize("html", ["", "  \n\t", "<!-- maintenance -->"])
+def test_empty_documents(html):
+    assert parse_detail_html(html) == (None, None)
+
+
+class BlankSession:
+    def get(self, url, timeout=None):
+        response = requests.Response()
+        response.status_code, response._content, response.url = 200, b"", url
+        return response
+
+
+def test_blank_response_is_not_an_error():
+    assert fetch_detail_html(BlankSession(), "http://fixture.test/foreclosed-properties/1") == (None, None)
@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip("aiohttp")
+
+import geocode_async
+from fixture_server import FixtureServer, geocode_answer
+
+QUERIES = [f"Barangay {n}, City {n % 7}, Laguna" for n in range(40)]
+
+
+def expected(query):
+    answer = geocode_answer(query)
+    return (True, (float(answer[0]["lat"]), float(answer[0]["lon"])) if answer else None)
+
+
+def test_mock_provider_against_the_fixture_geocoder(monkeypatch):
+    with FixtureServer(listings=0, error_rate=0.2) as server:
+        monkeypatch.setattr(geocode_async, "MOCK_URL", server.url)
+        results = geocode_async.geocode_queries(
+            QUERIES, geocode_async.get_provider("mock"), max_retries=10, retry_delay=0.0)
+
+    assert results == [expected(q) for q in QUERIES]
+    assert server.requests["error"] > 0             # 503s were retried
+    assert server.requests["search"] == len(QUERIES) + server.requests["error"]
@@ -0,0 +1,49 @@
+import geocode_cache
+from geocode_cache import GeocodeCache
+
+DAY = 24 * 3600
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def open_cache(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(geocode_cache.time, "time", clock)
+    return GeocodeCache(str(tmp_path / "geocode_cache.db"), ttl_seconds=10 * DAY,
+                        negative_ttl_seconds=2 * DAY), clock
+
+
+def test_found_entries_expire_after_their_ttl(tmp_path, monkeypatch):
+    cache, clock = open_cache(tmp_path, monkeypatch)
+    cache.put("Brgy. Bagumbayan, Teresa Rizal", (14.56, 121.21))
+
+    clock.now += 9 * DAY
+    # Spelling variants share the canonical key
+    assert cache.get("Barangay Bagumbayan, Teresa, Rizal") == (True, (14.56, 121.21))
+    clock.now += 2 * DAY
+    assert cache.get("Barangay Bagumbayan, Teresa, Rizal") == (False, None)
+    assert cache.stats == {"hits": 1, "misses": 0, "stale": 1}
+    cache.close()
+
+
+def test_not_found_entries_use_the_negative_ttl(tmp_path, monkeypatch):
+    cache, clock = open_cache(tmp_path, monkeypatch)
+    cache.put("Barangay Nowhere, Atlantis", None)
+
+    clock.now += DAY
+    assert cache.get("Barangay Nowhere, Atlantis") == (True, None)
+    clock.now += 2 * DAY
+    assert cache.get("Barangay Nowhere, Atlantis") == (False, None)
+
+    # A fresh answer replaces the stale one
+    cache.put("Barangay Nowhere, Atlantis", (10.0, 122.0))
+    assert cache.get("Barangay Nowhere, Atlantis") == (True, (10.0, 122.0))
+    assert cache.get("Barangay Elsewhere, Atlantis") == (False, None)
+    assert cache.stats == {"hits": 2, "misses": 1, "stale": 1}
+    cache.close()
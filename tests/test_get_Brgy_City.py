@@ -0,0 +1,39 @@
+import pandas as pd
+
+import get_Brgy_City
+from checkpoint import Checkpoint
+
+
+class FakeDriver:
+    def quit(self):
+        pass
+
+
+def test_browser_failures_do_not_end_the_stage(tmp_path, monkeypatch):
+    class WebDriverException(Exception):
+        pass
+
+    def fetch_detail(driver, url):
+        if url.endswith("/2"):
+            raise WebDriverException("tab crashed")
+        return f"Barangay {url[-1]}, Calamba City, Laguna", "House and Lot"
+
+    monkeypatch.setattr(get_Brgy_City, "make_driver", lambda headless, proxy: FakeDriver())
+    monkeypatch.setattr(get_Brgy_City, "fetch_detail", fetch_detail)
+    monkeypatch.setattr(get_Brgy_City, "DELAY_SECONDS", 0.0)
+    links = [f"http://fixture.test/foreclosed-properties/{n}" for n in (1, 2, 3)]
+    progress = Checkpoint("enrich", path=str(tmp_path / "pipeline_checkpoint.db"))
+    try:
+        out = get_Brgy_City.extract_titles_and_lot_descriptions(
+            pd.DataFrame({"Link": links}), concurrency=2, requests_per_second=10_000,
+            engine="selenium", checkpoint=progress)
+        progress.flush()
+        recorded = progress.load()
+    finally:
+        progress.close()
+
+    assert out["Title"].isna().tolist() == [False, True, False]
+    assert out["Lot Description"].isna().tolist() == [False, True, False]
+    assert out.loc[2, "Title"] == "Barangay 3, Calamba City, Laguna"
+    # The failed page is retried by the next run
+    assert sorted(recorded) == [links[0], links[2]]
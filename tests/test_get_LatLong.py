@@ -0,0 +1,54 @@
+import os
+
+import pandas as pd
+
+from conftest import ROOT
+from gazetteer import Gazetteer
+from geocode_cache import GeocodeCache
+from get_LatLong import geocode_addresses_no_hint_with_nulls
+
+FOUND = "Barangay Barandal, Calamba City, Province Of Laguna"
+NOT_FOUND = "Barangay Paliparan Iii, Dasmariñas City, Province Of Cavite"
+
+
+def test_city_centroids_only_back_up_the_upstream_lookup(tmp_path):
+    # The cache stands in for Nominatim: one title was placed, the other not found
+    cache = GeocodeCache(str(tmp_path / "geocode_cache.db"))
+    cache.put(FOUND, (14.2, 121.1))
+    cache.put(NOT_FOUND, None)
+    df = pd.DataFrame({"Title": [FOUND, NOT_FOUND], "Address": ["Laguna", "Cavite"]})
+    try:
+        out = geocode_addresses_no_hint_with_nulls(
+            df, persistent_cache=cache, gazetteer=Gazetteer.load(os.path.join(ROOT, "ph_gazetteer.csv")))
+    finally:
+        cache.close()
+
+    assert out["geocode_level"].tolist() == ["nominatim", "city"]
+    assert (out.loc[0, "lat"], out.loc[0, "long"]) == (14.2, 121.1)
+    assert out.loc[1, "lat"] != 14.2 and pd.notna(out.loc[1, "lat"])
+
+
+def test_bundled_gazetteer_is_fallback_only():
+    # ph_gazetteer.csv has province and city rows only, so nothing is answered
+    # locally at the default barangay threshold
+    gazetteer = Gazetteer.load(os.path.join(ROOT, "ph_gazetteer.csv"))
+    assert gazetteer.finest_level == "city"
+    assert gazetteer.resolve(FOUND).level == "city"
+
+
+def test_parsed_titles_keep_their_own_query(tmp_path):
+    # Two subdivisions in the same barangay: each title is its own cache entry and pin
+    titles = ["Lot, Camella Homes, Barangay Barandal, Calamba City, Laguna",
+              "Lot, Villa De Calamba, Barangay Barandal, Calamba City, Laguna"]
+    cache = GeocodeCache(str(tmp_path / "geocode_cache.db"))
+    cache.put(titles[0], (14.20, 121.10))
+    cache.put(titles[1], (14.21, 121.12))
+    df = pd.DataFrame({"Title": titles, "Barangay": "Barandal", "City": "Calamba City",
+                       "Province": "Laguna"})
+    try:
+        out = geocode_addresses_no_hint_with_nulls(df, persistent_cache=cache)
+    finally:
+        cache.close()
+
+    assert out["lat"].tolist() == [14.20, 14.21]
+    assert out["geocode_level"].tolist() == ["nominatim", "nominatim"]
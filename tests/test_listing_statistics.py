@@ -0,0 +1,42 @@
+import os
+import shutil
+
+import numpy as np
+
+import listing_statistics
+from conftest import ROOT
+
+
+def test_main_loads_csv_only_stage(tmp_path, monkeypatch):
+    # A checkout has the committed CSV views but no Parquet files
+    shutil.copy(os.path.join(ROOT, "listings_geocoded.csv"), tmp_path / "listings_geocoded.csv")
+    monkeypatch.chdir(tmp_path)
+
+    listing_statistics.main()
+
+    assert (tmp_path / "analysis_output.xlsx").exists()
+    assert (tmp_path / "top10_scores.png").exists()
+    assert not (tmp_path / "listings_geocoded.parquet").exists()
+
+
+def test_geocoded_stage_reaches_the_neighborhood_feature():
+    df = listing_statistics.read_stage("geocoded", os.path.join(ROOT, "listings_geocoded.csv"))
+    df = listing_statistics.add_neighborhood_median(
+        listing_statistics.prepare_data_with_address_lot_price(df))
+
+    assert "neighborhood" in listing_statistics.DEFAULT_WEIGHTS
+    assert df["neighborhood_price_per_sqm"].notna().any()
+    assert (listing_statistics.neighborhood_scores(df) != 0.5).any()
+
+
+def test_non_positive_k_selects_nothing():
+    assert listing_statistics.top_k_indices(np.array([3.0, 1.0, 2.0]), 2).tolist() == [0, 2]
+    for k in (0, -1):
+        assert len(listing_statistics.top_k_indices(np.array([3.0, 1.0, 2.0]), k)) == 0
+
+    df = listing_statistics.add_neighborhood_median(listing_statistics.prepare_data_with_address_lot_price(
+        listing_statistics.read_stage("geocoded", os.path.join(ROOT, "listings_geocoded.csv"))))
+    assert listing_statistics.rank_top_k(df, k=0).empty
+    results = listing_statistics.score_scenarios(df, [listing_statistics.Scenario("none", k=0),
+                                                      listing_statistics.Scenario("top3", k=3)])
+    assert results["none"].empty and len(results["top3"]) == 3
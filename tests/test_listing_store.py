@@ -0,0 +1,74 @@
+import sqlite3
+
+import pandas as pd
+
+import listing_store
+
+
+def listings(lat):
+    return pd.DataFrame({
+        "Link": [f"https://www.unionbankph.com/foreclosed-properties/{n}" for n in (1, 2)],
+        "Price": [1_000_000.0, 2_000_000.0], "Lot": [100.0, 200.0],
+        "Image_Link": ["https://img/1.png", "https://img/2.png"],
+        "Title": ["Barangay Barandal, Calamba City, Laguna", "Brgy. Bagumbayan, Teresa Rizal"],
+        "Lot Description": ["House and Lot", "Vacant Lot"],
+        "lat": lat, "long": [121.1 if pd.notna(v) else None for v in lat],
+        "geocode_level": ["nominatim" if pd.notna(v) else None for v in lat],
+    })
+
+
+def test_unplaced_listings_stay_pending_for_geocoding(tmp_path):
+    conn = listing_store.open_store(str(tmp_path / "listing_store.db"))
+    try:
+        listing_store.upsert_listings(conn, listings([14.2, None]))
+        scraped = listings([None, None]).drop(columns=["Title", "Lot Description", "lat", "long"])
+
+        pending, known = listing_store.split_new_or_changed(conn, scraped)
+        assert len(pending) == 0 and len(known) == 2       # enrich: both titles are stored
+
+        pending, known = listing_store.split_new_or_changed(conn, scraped, required=("title", "lat", "long"))
+        assert pending.index.tolist() == [1]                # geocode: the failed one again
+        assert known["lat"].tolist() == [14.2]
+    finally:
+        conn.close()
+
+
+def test_geocode_level_round_trips(tmp_path):
+    conn = listing_store.open_store(str(tmp_path / "listing_store.db"))
+    try:
+        listing_store.upsert_listings(conn, listings([14.2, 14.3]))
+        scraped = listings([None, None])[["Link", "Price", "Lot", "Image_Link"]]
+        _, known = listing_store.split_new_or_changed(conn, scraped, required=("title", "lat", "long"))
+        assert known["geocode_level"].tolist() == ["nominatim", "nominatim"]
+    finally:
+        conn.close()
+
+
+def test_older_stores_gain_the_geocode_level_column(tmp_path):
+    path = str(tmp_path / "listing_store.db")
+    old = sqlite3.connect(path)
+    old.execute(listing_store.SCHEMA.replace(
+        "    geocode_level   TEXT,               -- how lat/long was found (see get_LatLong)\n", ""))
+    old.close()
+
+    conn = listing_store.open_store(path)
+    try:
+        assert listing_store.upsert_listings(conn, listings([14.2, None])) == 2
+    finally:
+        conn.close()
+
+
+def test_coarse_fallback_points_are_retried(tmp_path):
+    conn = listing_store.open_store(str(tmp_path / "listing_store.db"))
+    try:
+        stored = listings([14.2, 14.3])
+        stored["geocode_level"] = ["nominatim", "city"]      # the second is a fallback centroid
+        listing_store.upsert_listings(conn, stored)
+        scraped = stored[["Link", "Price", "Lot", "Image_Link"]]
+
+        pending, known = listing_store.split_new_or_changed(
+            conn, scraped, required=("title", "lat", "long"), retry_levels=["province", "city"])
+        assert pending.index.tolist() == [1]
+        assert known.index.tolist() == [0]
+    finally:
+        conn.close()
@@ -0,0 +1,77 @@
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+import page_crawler
+from fixture_server import index_page
+
+START_URL = "http://fixture.test/foreclosed-properties?page=1&type_of_property=Residential"
+LISTINGS, PAGE_SIZE = 50, 10
+
+
+class ScriptedSession:
+    """Serves fixture index pages; `failures` maps page -> statuses returned first."""
+
+    def __init__(self, failures=None, listings=LISTINGS):
+        self.failures = {page: list(codes) for page, codes in (failures or {}).items()}
+        self.listings = listings
+        self.calls = []
+
+    def get(self, url, timeout=None):
+        query = parse_qs(urlparse(url).query)
+        page = int(query["page"][0])
+        self.calls.append(page)
+        response = requests.Response()
+        response.url = url
+        codes = self.failures.get(page)
+        if codes:
+            response.status_code = codes.pop(0)
+            response._content = b"error"
+        else:
+            response.status_code = 200
+            response._content = index_page(page, query, self.listings, PAGE_SIZE).encode()
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def crawl(monkeypatch):
+    monkeypatch.setattr(page_crawler, "RETRY_BACKOFF", 0.0)
+
+    def run(session):
+        monkeypatch.setattr(page_crawler, "make_session", lambda pool_size: session)
+        return page_crawler.crawl_pages(START_URL, concurrency=2, requests_per_second=10_000)
+    return run
+
+
+def test_transient_errors_are_retried(crawl):
+    session = ScriptedSession(failures={2: [503, 502]})
+    assert len(crawl(session)) == LISTINGS
+    assert session.calls.count(2) == 3
+
+
+def test_a_failing_page_marks_the_crawl_incomplete(crawl):
+    session = ScriptedSession(failures={3: [404]})
+    with pytest.raises(page_crawler.IncompleteCrawlError) as info:
+        crawl(session)
+    assert info.value.skipped == [3]
+    assert len(info.value.listings) == LISTINGS - PAGE_SIZE
+    assert session.calls.count(3) == 1          # 404 is not retried
+
+
+def test_an_incomplete_crawl_is_not_written(crawl, monkeypatch, tmp_path):
+    import UB_Listing
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(page_crawler, "make_session", lambda pool_size: ScriptedSession(failures={3: [404]}))
+    monkeypatch.setattr(page_crawler, "REQUESTS_PER_SECOND", 10_000)
+    with pytest.raises(page_crawler.IncompleteCrawlError):
+        UB_Listing.scrape(START_URL, pagination="url")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_empty_first_page_is_an_error(crawl):
+    with pytest.raises(page_crawler.EmptyCrawlError):
+        crawl(ScriptedSession(listings=0))
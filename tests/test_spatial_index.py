@@ -0,0 +1,28 @@
+import warnings
+
+import numpy as np
+
+from spatial_index import SpatialIndex
+
+
+def make_index():
+    return SpatialIndex([14.55, 14.56, 14.60, np.nan], [121.00, 121.01, 121.05, np.nan])
+
+
+def test_knn_nearest_first():
+    positions, distances = make_index().query_knn(14.55, 121.00, k=2)
+    assert positions.tolist() == [[0, 1]]
+    assert distances[0, 0] == 0.0 and distances[0, 1] > 0
+
+
+def test_query_point_without_coordinates_finds_nothing():
+    index = make_index()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        positions, distances = index.query_knn([np.nan, 14.55], [np.nan, 121.00], k=5)
+        (near, dist), = index.query_radius(np.nan, 121.0, 5.0)
+
+    assert positions.shape == (2, 5)
+    assert (positions[0] == -1).all() and np.isinf(distances[0]).all()
+    assert positions[1, :3].tolist() == [0, 1, 2]
+    assert len(near) == 0 and len(dist) == 0
@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+import warehouse
+
+
+def listings(rows):
+    """rows: (id, province, price, lot)"""
+    return pd.DataFrame({
+        "Link": [f"https://www.unionbankph.com/foreclosed-properties/{pid}" for pid, *_ in rows],
+        "Address": [province for _, province, *_ in rows],
+        "Price": [price for *_, price, _ in rows],
+        "Lot": [lot for *_, lot in rows],
+        "Title": [f"Listing {pid}" for pid, *_ in rows],
+    })
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = warehouse.open_warehouse(str(tmp_path / "listing_warehouse.db"))
+    # Day 1: 1-3 listed; day 2: 1 drops, 2 rises, 3 gone, 4 new; day 3: 4 drops
+    warehouse.append_snapshot(conn, listings([(1, "Laguna", 1_000_000, 100), (2, "Laguna", 3_000_000, 100),
+                                              (3, "Cavite", 2_000_000, 200)]), "2024-01-01")
+    warehouse.append_snapshot(conn, listings([(1, "Laguna", 900_000, 100), (2, "Laguna", 3_300_000, 100),
+                                              (4, "Cavite", 4_000_000, 200)]), "2024-01-08")
+    warehouse.append_snapshot(conn, listings([(1, "Laguna", 900_000, 100), (2, "Laguna", 3_300_000, 100),
+                                              (4, "Cavite", 3_000_000, 200)]), "2024-01-15")
+    yield conn
+    conn.close()
+
+
+def test_price_changes(conn):
+    changes = warehouse.price_changes(conn, since="2024-01-01")
+    assert changes["scrape_date"].tolist() == ["2024-01-15", "2024-01-08", "2024-01-08"]   # newest first
+    assert sorted(changes[["property_id", "scrape_date", "old_price", "new_price"]].values.tolist()) == [
+        ["1", "2024-01-08", 1_000_000, 900_000],
+        ["2", "2024-01-08", 3_000_000, 3_300_000],
+        ["4", "2024-01-15", 4_000_000, 3_000_000],
+    ]
+    drops = warehouse.price_changes(conn, since="2024-01-08", drops_only=True)
+    assert sorted(drops["property_id"]) == ["1", "4"]
+    assert warehouse.price_changes(conn, since="2024-01-16").empty
+
+
+def test_newly_listed_and_delisted(conn):
+    assert warehouse.newly_listed(conn, "2024-01-08")["property_id"].tolist() == ["4"]
+    assert warehouse.delisted(conn, "2024-01-08")["property_id"].tolist() == ["3"]
+    # The delisted row is the listing's last snapshot
+    assert warehouse.delisted(conn, "2024-01-08")["scrape_date"].tolist() == ["2024-01-01"]
+    assert warehouse.newly_listed(conn, "2024-01-15").empty
+    assert warehouse.delisted(conn, "2024-01-15").empty
+    # The first snapshot has no previous one: everything is new, nothing is gone
+    assert sorted(warehouse.newly_listed(conn, "2024-01-01")["property_id"]) == ["1", "2", "3"]
+    assert warehouse.delisted(conn, "2024-01-01").empty
+
+
+def test_rerunning_a_date_replaces_its_snapshot(conn):
+    warehouse.append_snapshot(conn, listings([(1, "Laguna", 900_000, 100)]), "2024-01-15")
+    assert warehouse.delisted(conn, "2024-01-15")["property_id"].tolist() == ["2", "4"]
+    assert warehouse.price_changes(conn, since="2024-01-15").empty
+
+
+def test_province_trends(conn):
+    trends = warehouse.province_trends(conn)
+    assert trends.index.tolist() == ["2024-01-01", "2024-01-08", "2024-01-15"]
+    # Median price/sqm: Laguna (10,000 & 30,000), then (9,000 & 33,000); Cavite 10,000, 20,000, 15,000
+    assert trends["Laguna"].tolist() == [20_000, 21_000, 21_000]
+    assert trends["Cavite"].tolist() == [10_000, 20_000, 15_000]
+    only = warehouse.province_trends(conn, provinces=["Cavite"], since="2024-01-08")
+    assert only.columns.tolist() == ["Cavite"] and only["Cavite"].tolist() == [20_000, 15_000]
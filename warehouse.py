@@ -0,0 +1,196 @@
+# warehouse.py
+# Append-only history of every scrape: one row per property per scrape date.
+import sqlite3
+from datetime import date
+from typing import Optional
+import pandas as pd
+from listing_store import property_ids
+
+# ---- Settings ----
+WAREHOUSE_PATH = "listing_warehouse.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    property_id     TEXT NOT NULL,
+    scrape_date     TEXT NOT NULL,          -- YYYY-MM-DD
+    province        TEXT,
+    price           REAL,
+    lot             REAL,
+    title           TEXT,
+    lot_description TEXT,
+    lat             REAL,
+    long            REAL,
+    link            TEXT,
+    PRIMARY KEY (property_id, scrape_date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS snapshots_by_date ON snapshots (scrape_date, property_id);
+
+-- One row per price change, written when the snapshot is appended
+CREATE TABLE IF NOT EXISTS price_changes (
+    property_id TEXT NOT NULL,
+    scrape_date TEXT NOT NULL,
+    old_price   REAL,
+    new_price   REAL,
+    PRIMARY KEY (property_id, scrape_date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS price_changes_by_date ON price_changes (scrape_date);
+
+-- Median price/sqm per province per scrape date, computed once on append
+CREATE TABLE IF NOT EXISTS province_daily (
+    province             TEXT NOT NULL,
+    scrape_date          TEXT NOT NULL,
+    listings             INTEGER NOT NULL,
+    median_price_per_sqm REAL,
+    PRIMARY KEY (province, scrape_date)
+) WITHOUT ROWID;
+"""
+
+# DataFrame column -> snapshots column
+COLUMNS = {
+    "Address": "province", "Price": "price", "Lot": "lot", "Title": "title",
+    "Lot Description": "lot_description", "lat": "lat", "long": "long", "Link": "link",
+}
+
+
+def open_warehouse(path: str = WAREHOUSE_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _none_if_na(value):
+    return None if pd.isna(value) else value
+
+
+def _previous_date(conn: sqlite3.Connection, scrape_date: str) -> Optional[str]:
+    row = conn.execute("SELECT MAX(scrape_date) FROM snapshots WHERE scrape_date < ?",
+                       (scrape_date,)).fetchone()
+    return row[0]
+
+
+def append_snapshot(conn: sqlite3.Connection, df: pd.DataFrame,
+                    scrape_date: Optional[str] = None) -> int:
+    """
+    Store today's listings as one snapshot. Re-running on the same date replaces
+    that date's snapshot. Price changes against each property's latest earlier
+    snapshot and the per-province medians are derived here, once, so the queries
+    below are plain index lookups. Returns the number of listings stored.
+    """
+    scrape_date = scrape_date or date.today().isoformat()
+    snap = df.reindex(columns=list(COLUMNS)).rename(columns=COLUMNS)
+    snap.insert(0, "property_id", property_ids(df["Link"]).values)
+    snap = snap.dropna(subset=["property_id"]).drop_duplicates("property_id")
+    snap["province"] = snap["province"].astype(object)
+
+    # Latest earlier price of every property in this snapshot: one primary-key
+    # seek each, so the cost follows the snapshot size, not the length of history
+    previous = [
+        conn.execute("SELECT price FROM snapshots WHERE property_id = ? AND scrape_date < ? "
+                     "ORDER BY scrape_date DESC LIMIT 1", (pid, scrape_date)).fetchone()
+        for pid in snap["property_id"]
+    ]
+    old = pd.Series([row[0] if row else None for row in previous],
+                    index=snap.index, dtype="Float64")
+    new = snap["price"].astype("Float64")
+    changed = old.notna() & new.notna() & (old != new).fillna(False).astype(bool)
+    changes = snap.loc[changed, ["property_id"]].assign(old_price=old[changed], new_price=new[changed])
+
+    ppsqm = (snap["price"].astype(float) / snap["lot"].astype(float)).where(snap["lot"].astype(float) > 0)
+    daily = (snap.assign(ppsqm=ppsqm).dropna(subset=["province"])
+             .groupby("province").agg(listings=("property_id", "size"),
+                                      median_price_per_sqm=("ppsqm", "median")))
+
+    rows = [tuple(_none_if_na(v) for v in (pid, scrape_date, *values))
+            for pid, *values in snap.itertuples(index=False)]
+    with conn:
+        for table in ("snapshots", "price_changes", "province_daily"):
+            conn.execute(f"DELETE FROM {table} WHERE scrape_date = ?", (scrape_date,))
+        conn.executemany(
+            f"INSERT INTO snapshots (property_id, scrape_date, {', '.join(COLUMNS.values())}) "
+            f"VALUES ({', '.join('?' * (len(COLUMNS) + 2))})",
+            rows,
+        )
+        conn.executemany(
+            "INSERT INTO price_changes VALUES (?, ?, ?, ?)",
+            [(pid, scrape_date, float(o), float(n)) for pid, o, n in changes.itertuples(index=False)],
+        )
+        conn.executemany(
+            "INSERT INTO province_daily VALUES (?, ?, ?, ?)",
+            [(p, scrape_date, int(n), _none_if_na(m)) for p, n, m in daily.itertuples()],
+        )
+    return len(rows)
+
+
+def scrape_dates(conn: sqlite3.Connection) -> list:
+    return [d for (d,) in conn.execute("SELECT DISTINCT scrape_date FROM snapshots ORDER BY 1")]
+
+
+def snapshot(conn: sqlite3.Connection, scrape_date: Optional[str] = None) -> pd.DataFrame:
+    """
+    Listings as scraped on scrape_date (default: the latest snapshot), with the
+    pipeline's column names so they can go straight into listing_statistics.
+    """
+    if scrape_date is None:
+        scrape_date = conn.execute("SELECT MAX(scrape_date) FROM snapshots").fetchone()[0]
+    df = pd.read_sql_query(
+        f"SELECT property_id, {', '.join(COLUMNS.values())} FROM snapshots WHERE scrape_date = ?",
+        conn, params=(scrape_date,)
+    )
+    return df.rename(columns={v: k for k, v in COLUMNS.items()})
+
+
+def price_history(conn: sqlite3.Connection, property_id: str) -> pd.DataFrame:
+    """Every snapshot of one property: scrape_date, price, lot."""
+    return pd.read_sql_query(
+        "SELECT scrape_date, price, lot FROM snapshots WHERE property_id = ? ORDER BY scrape_date",
+        conn, params=(str(property_id),)
+    )
+
+
+def price_changes(conn: sqlite3.Connection, since: str, drops_only: bool = False) -> pd.DataFrame:
+    """Price changes recorded on or after `since` (YYYY-MM-DD), newest first."""
+    query = "SELECT * FROM price_changes WHERE scrape_date >= ?"
+    if drops_only:
+        query += " AND new_price < old_price"
+    return pd.read_sql_query(query + " ORDER BY scrape_date DESC", conn, params=(since,))
+
+
+def _set_difference(conn: sqlite3.Connection, in_date: str, not_in_date: Optional[str]) -> pd.DataFrame:
+    return pd.read_sql_query(
+        "SELECT * FROM snapshots s WHERE s.scrape_date = ? AND NOT EXISTS "
+        "(SELECT 1 FROM snapshots o WHERE o.property_id = s.property_id AND o.scrape_date = ?)",
+        conn, params=(in_date, not_in_date or "")
+    )
+
+
+def newly_listed(conn: sqlite3.Connection, scrape_date: str) -> pd.DataFrame:
+    """Listings in the scrape_date snapshot that were not in the previous one."""
+    return _set_difference(conn, scrape_date, _previous_date(conn, scrape_date))
+
+
+def delisted(conn: sqlite3.Connection, scrape_date: str) -> pd.DataFrame:
+    """Listings in the previous snapshot that are gone on scrape_date (their last row)."""
+    return _set_difference(conn, _previous_date(conn, scrape_date) or "", scrape_date)
+
+
+def days_listed(conn: sqlite3.Connection, property_id: str) -> int:
+    """Days between a property's first and latest snapshot."""
+    row = conn.execute(
+        "SELECT julianday(MAX(scrape_date)) - julianday(MIN(scrape_date)) "
+        "FROM snapshots WHERE property_id = ?", (str(property_id),)
+    ).fetchone()
+    return int(row[0]) if row[0] is not None else 0
+
+
+def province_trends(conn: sqlite3.Connection, provinces: Optional[list] = None,
+                    since: str = "") -> pd.DataFrame:
+    """
+    Median price/sqm per province per scrape date, pivoted to one column per province.
+    """
+    query = "SELECT province, scrape_date, median_price_per_sqm FROM province_daily WHERE scrape_date >= ?"
+    params = [since]
+    if provinces:
+        query += f" AND province IN ({', '.join('?' * len(provinces))})"
+        params += list(provinces)
+    df = pd.read_sql_query(query, conn, params=params)
+    return df.pivot(index="scrape_date", columns="province", values="median_price_per_sqm")